@@ -2,16 +2,27 @@
 # Adaptador para analizar proyectos Java
 import os
 
+from analysis.file_reader import FileReader
+
 class JavaAdapter:
     def __init__(self, ruta):
         self.ruta = ruta
+        self.omitidos = []  # [(ruta, motivo)]: generados enormes, binarios con extensión .java
 
     def analizar_estructura(self):
         print(f"Analizando proyecto Java en: {self.ruta}")
         archivos = []
+        lector = FileReader()
         for root, dirs, files in os.walk(self.ruta):
             for file in files:
                 if file.endswith('.java'):
-                    archivos.append(os.path.join(root, file))
+                    ruta_archivo = os.path.join(root, file)
+                    motivo, _ = lector.check(ruta_archivo)
+                    if motivo is None:
+                        archivos.append(ruta_archivo)
+                    else:
+                        self.omitidos.append((ruta_archivo, motivo))
         print(f"Archivos Java encontrados: {len(archivos)}")
+        if self.omitidos:
+            print(f"Archivos Java omitidos: {len(self.omitidos)}")
         return archivos
@@ -0,0 +1,127 @@
+"""
+file_reader.py
+Capa de lectura compartida por los analizadores (indexer, entrenadores, CodeGenerator,
+EntrenadorAgente, JavaAdapter).
+
+Antes de cargar un archivo se miran su tamaño y sus primeros KB: los binarios, los minificados
+(bundles .min.js, JSON de una sola línea) y los que superan el tope no se cargan como string y
+quedan registrados con el motivo. Los archivos grandes que sí interesa escanear (detección de
+frameworks en un pom.xml o un JSON enorme) se recorren por ventanas con mmap, una ventana
+mapeada a la vez, así la memoria residente no depende del tamaño del archivo.
+
+Topes configurables: AGENTESTING_MAX_FILE_BYTES (lectura completa, 1 MB por defecto) y
+AGENTESTING_MAX_SCAN_BYTES (escaneo por ventanas, 64 MB por defecto).
+"""
+import mmap
+import os
+from collections import Counter
+
+MAX_FILE_BYTES = int(os.environ.get('AGENTESTING_MAX_FILE_BYTES', 1024 * 1024))
+MAX_SCAN_BYTES = int(os.environ.get('AGENTESTING_MAX_SCAN_BYTES', 64 * 1024 * 1024))
+WINDOW_BYTES = 1024 * 1024   # debe ser múltiplo de mmap.ALLOCATIONGRANULARITY (offset de cada ventana)
+SNIFF_BYTES = 8192
+# Minificado: cabecera de al menos MINIFIED_MIN_BYTES con líneas de más de MINIFIED_LINE_LENGTH en promedio
+MINIFIED_MIN_BYTES = 4096
+MINIFIED_LINE_LENGTH = 500
+MINIFIED_SUFFIXES = ('.min.js', '.min.css', '.bundle.js', '.min.map', '.js.map')
+
+SKIP_TOO_LARGE = 'too_large'
+SKIP_BINARY = 'binary'
+SKIP_MINIFIED = 'minified'
+SKIP_UNREADABLE = 'unreadable'
+
+# Bytes esperables en texto (los demás controles delatan un binario)
+_TEXT_BYTES = bytes([7, 8, 9, 10, 12, 13, 27]) + bytes(range(32, 256))
+
+
+def sniff(head, file_name=''):
+    """Motivo para no analizar un contenido por sus primeros bytes (None si parece código fuente)"""
+    if b'\x00' in head:
+        return SKIP_BINARY
+    control = len(head.translate(None, _TEXT_BYTES))
+    if head and control * 10 > len(head):
+        return SKIP_BINARY
+    if file_name.lower().endswith(MINIFIED_SUFFIXES):
+        return SKIP_MINIFIED
+    if len(head) >= MINIFIED_MIN_BYTES and len(head) > MINIFIED_LINE_LENGTH * (head.count(b'\n') + 1):
+        return SKIP_MINIFIED
+    return None
+
+
+class FileReader:
+    def __init__(self, max_bytes=None, max_scan_bytes=None, window_bytes=WINDOW_BYTES):
+        self.max_bytes = MAX_FILE_BYTES if max_bytes is None else max_bytes
+        self.max_scan_bytes = MAX_SCAN_BYTES if max_scan_bytes is None else max_scan_bytes
+        self.window_bytes = window_bytes
+        self.skipped = []  # [(ruta, motivo)]
+
+    def check(self, path):
+        """(motivo, tamaño): motivo None si el archivo se puede leer completo"""
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return SKIP_UNREADABLE, 0
+        reason = sniff(head, os.path.basename(path))
+        if reason is None and size > self.max_bytes:
+            reason = SKIP_TOO_LARGE
+        return reason, size
+
+    def read(self, path):
+        """(texto, motivo): texto None y el motivo registrado en `skipped` si no se carga"""
+        reason, size = self.check(path)
+        if reason is None:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    return f.read(), None
+            except OSError:
+                reason = SKIP_UNREADABLE
+        self.skipped.append((path, reason))
+        return None, reason
+
+    def read_text(self, path):
+        return self.read(path)[0]
+
+    def read_head(self, path, limit):
+        """Primeros `limit` caracteres de un archivo de texto (None si se omite, como en read)"""
+        reason, size = self.check(path)
+        if reason is not None:
+            self.skipped.append((path, reason))
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(limit)
+        except OSError:
+            self.skipped.append((path, SKIP_UNREADABLE))
+            return None
+
+    def can_scan(self, reason, size):
+        """Un archivo descartado solo por tamaño se puede escanear por ventanas hasta max_scan_bytes"""
+        return reason == SKIP_TOO_LARGE and size <= self.max_scan_bytes
+
+    def iter_windows(self, path, overlap=0):
+        """
+        Recorre el archivo por ventanas mapeadas con mmap: yield (texto, hasta). `texto` incluye
+        `overlap` bytes de la ventana siguiente para no perder coincidencias en el borde; solo las
+        que empiezan antes de `hasta` pertenecen a esta ventana.
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            for offset in range(0, min(size, self.max_scan_bytes), self.window_bytes):
+                length = min(self.window_bytes + overlap, size - offset)
+                # Se mapea y libera una ventana por vez: la memoria residente queda acotada
+                with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as window:
+                    main_length = min(self.window_bytes, length)
+                    main = window[:main_length].decode('utf-8', errors='ignore')
+                    tail = window[main_length:length]
+                    yield main + tail.decode('utf-8', errors='ignore'), len(main)
+
+    def summary(self):
+        """Archivos omitidos por motivo"""
+        return Counter(reason for _, reason in self.skipped)
+
+# Uso:
+# reader = FileReader()
+# content, reason = reader.read(path)          # content None -> omitido (reader.skipped)
+# for text, until in reader.iter_windows(path, overlap=16): ...
@@ -0,0 +1,145 @@
+"""
+indicators.py
+Motor compartido de indicadores (web, móvil, frameworks) para clasificar archivos.
+
+El texto se pasa a minúsculas una sola vez y cada palabra clave se cuenta con str.count (búsqueda
+en C), así que se obtienen todas las apariciones de todas las palabras, también las que se solapan
+('webdriver.get' acredita 'webdriver' y 'driver.get'), en lugar de un `in` por palabra que corta
+en el primer acierto. Con los puntajes por categoría la clasificación es ponderada: gana la
+categoría con más peso, no la primera que aparece.
+"""
+
+
+class IndicatorHits:
+    """Resultado de un escaneo: aciertos por palabra, por categoría y puntaje ponderado"""
+
+    def __init__(self, keywords, counts, scores):
+        self.keywords = keywords
+        self.counts = counts
+        self.scores = scores
+
+    def __contains__(self, category):
+        return self.counts.get(category, 0) > 0
+
+    def found(self, categories=None):
+        """Categorías con al menos un acierto (en el orden de `categories` si se indica)"""
+        categories = self.counts if categories is None else categories
+        return [c for c in categories if self.counts.get(c, 0) > 0]
+
+    def best(self, *categories):
+        """Categoría de mayor puntaje entre las indicadas (empate: la primera); None si ninguna"""
+        best = None
+        for category in categories:
+            score = self.scores.get(category, 0)
+            if score > 0 and (best is None or score > self.scores[best]):
+                best = category
+        return best
+
+
+class IndicatorMatcher:
+    def __init__(self, categories, ignore_case=True):
+        """categories: {categoria: [palabras]} o {categoria: {palabra: peso}}"""
+        self.categories = list(categories)
+        self.ignore_case = ignore_case
+        self._credits = {}  # palabra -> [(categoria, peso)]
+        for category, keywords in categories.items():
+            weights = keywords if isinstance(keywords, dict) else dict.fromkeys(keywords, 1)
+            for keyword, weight in weights.items():
+                key = keyword.lower() if ignore_case else keyword
+                self._credits.setdefault(key, []).append((category, weight))
+        self._words = list(self._credits)
+        # Una palabra que contiene a otra solo puede aparecer si la contenida apareció: se cuentan
+        # primero las cortas y se salta la búsqueda de las largas cuya palabra contenida no está
+        self._plan = [
+            (word, max((w for w in self._words if w != word and w in word), key=len, default=None))
+            for word in sorted(self._words, key=len)
+        ]
+        self._zero = dict.fromkeys(self.categories, 0)
+        # Solape necesario entre ventanas para no cortar una palabra en el borde
+        self.overlap = max(len(word) for word in self._words) - 1
+
+    def scan(self, text, lowered=False):
+        """Todas las apariciones de cada palabra; `lowered=True` si ya viene en minúsculas (evita otra copia)"""
+        if self.ignore_case and not lowered:
+            text = text.lower()
+        keywords = {}
+        for word, contained in self._plan:
+            if contained is not None and contained not in keywords:
+                continue
+            times = text.count(word)
+            if times:
+                keywords[word] = times
+        return self._hits(keywords)
+
+    def scan_windows(self, windows):
+        """Escaneo por ventanas (FileReader.iter_windows): yield (texto, hasta) con solape `overlap`"""
+        keywords = {}  # solo conteos: la memoria no crece con el tamaño del archivo
+        for text, until in windows:
+            if self.ignore_case:
+                text = text.lower()
+            for word in self._words:
+                # Solo las apariciones que empiezan antes de `hasta` pertenecen a esta ventana
+                times = text.count(word, 0, until + len(word) - 1)
+                if times:
+                    keywords[word] = keywords.get(word, 0) + times
+        return self._hits(keywords)
+
+    def _hits(self, keywords):
+        """keywords: {palabra: veces}; counts y scores traen todas las categorías (en cero si no hubo aciertos)"""
+        counts = self._zero.copy()
+        scores = self._zero.copy()
+        for word, times in keywords.items():
+            for category, weight in self._credits[word]:
+                counts[category] += times
+                scores[category] += weight * times
+        return IndicatorHits(keywords, counts, scores)
+
+
+# Indicadores de tipo de proyecto (un archivo con cualquiera de ellos cuenta para el tipo)
+MOBILE_PROJECT = ['appium', 'android', 'ios', 'mobile', 'device', 'androiddriver']
+WEB_PROJECT = ['selenium', 'webdriver', 'browser', 'chrome', 'firefox', 'chromedriver']
+
+# Clasificación web/móvil de cada archivo: las señales específicas de la librería pesan más y
+# las subcadenas frecuentes en código que no es móvil ('com.' de cualquier paquete, 'ios' de
+# 'scenarios') pesan menos
+WEB_FILE = {
+    'webdriver': 1, 'selenium': 1, 'browser': 1, 'chrome': 1, 'firefox': 1,
+    'page.java': 1, 'webpage': 1, 'webelement': 2, 'by.id': 1, 'by.xpath': 1,
+    'driver.get': 2, 'driver.navigate': 2
+}
+MOBILE_FILE = {
+    'appium': 2, 'android': 1, 'ios': 0.5, 'mobile': 1, 'screen.java': 1,
+    'com.': 0.5, ':id/': 2, 'androiddriver': 2, 'iosdriver': 2,
+    'appiumdriver': 2, 'mobileelement': 2
+}
+
+TRAINING_FRAMEWORKS = {
+    'Cucumber': ['cucumber'],
+    'JUnit': ['junit'],
+    'Appium': ['appium'],
+    'Selenium': ['selenium']
+}
+
+HYBRID_INDICATORS = IndicatorMatcher(dict(
+    {'mobile': MOBILE_PROJECT, 'web': WEB_PROJECT, 'mobile_file': MOBILE_FILE, 'web_file': WEB_FILE},
+    **TRAINING_FRAMEWORKS
+))
+
+# Frameworks del índice del workspace (nombre de archivo y primeros KB de contenido)
+WORKSPACE_FRAMEWORKS = {
+    'Cucumber': ['.feature'],
+    'Selenium': ['webdriver', 'selenium'],
+    'Pytest': ['pytest', 'test_'],
+    'JUnit': ['junit'],
+    'TestNG': ['testng'],
+    'Playwright': ['playwright'],
+    'Cypress': ['cypress'],
+    'Robot Framework': ['.robot'],
+    'Jest': ['jest', '.spec.js', '.test.js'],
+    'Mocha': ['mocha', 'describe('],
+}
+FRAMEWORK_INDICATORS = IndicatorMatcher(WORKSPACE_FRAMEWORKS)
+
+# Uso:
+# hits = HYBRID_INDICATORS.scan(content)
+# hits.counts['mobile'], hits.found(TRAINING_FRAMEWORKS), hits.best('web_file', 'mobile_file')
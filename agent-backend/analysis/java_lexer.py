@@ -0,0 +1,424 @@
+"""
+java_lexer.py
+Tokenizador y extractor de símbolos Java de una sola pasada.
+
+Una expresión regular maestra recorre el archivo una vez (comentarios, strings, anotaciones,
+identificadores y operadores) y un recorrido lineal de los tokens arma la estructura que usan
+todos los extractores de patrones: clases, campos con su tipo, métodos (con anotaciones y
+Javadoc), anotaciones con sus argumentos, string literals, instanciaciones `new X()` y
+llamadas con string literal (By.id("...")). Nada se busca dentro de comentarios ni strings.
+"""
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', ['kind', 'text', 'pos'])
+Annotation = namedtuple('Annotation', ['name', 'args'])                    # args: string literals
+JavaClass = namedtuple('JavaClass', ['name', 'kind', 'extends', 'implements', 'annotations'])
+JavaField = namedtuple('JavaField', ['name', 'type', 'modifiers', 'annotations', 'class_name', 'new_class', 'strings'])
+JavaMethod = namedtuple('JavaMethod', ['name', 'return_type', 'modifiers', 'annotations', 'params', 'javadoc', 'class_name'])
+Instantiation = namedtuple('Instantiation', ['declared_type', 'variable', 'class_name', 'has_args'])
+MethodCall = namedtuple('MethodCall', ['receiver', 'name', 'string_arg'])  # [receiver.]name("literal", ...)
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<javadoc>/\*\*(?!/)[\s\S]*?(?:\*/|\Z))
+  | (?P<comment>/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*)
+  | (?P<textblock>"""[\s\S]*?(?:"""|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?)
+  | (?P<char>'(?:[^'\\\n]|\\.)*'?)
+  | (?P<annotation>@\s*[A-Za-z_$][\w$]*(?:\s*\.\s*[A-Za-z_$][\w$]*)*)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>.)
+''', re.VERBOSE | re.DOTALL)
+
+MODIFIERS = {
+    'public', 'protected', 'private', 'static', 'final', 'abstract', 'synchronized',
+    'native', 'transient', 'volatile', 'strictfp', 'default', 'sealed', 'non-sealed'
+}
+CLASS_KEYWORDS = {'class', 'interface', 'enum', 'record'}
+# Palabras reservadas seguidas de '(' que no son llamadas
+CONTROL_KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'synchronized', 'return', 'try', 'super', 'this', 'new'}
+_UNESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _unquote(text):
+    body = text[1:-1] if len(text) >= 2 and text.endswith(text[0]) else text[1:]
+    return re.sub(r'\\(.)', lambda m: _UNESCAPES.get(m.group(1), m.group(1)), body)
+
+
+def tokenize(source):
+    """Tokens significativos (sin espacios ni comentarios comunes; el Javadoc se conserva)"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        if kind in ('ws', 'comment'):
+            continue
+        text = match.group()
+        if kind == 'textblock':
+            kind, text = 'string', '"' + text[3:-3] + '"'
+        elif kind == 'annotation':
+            text = re.sub(r'\s+', '', text)
+        tokens.append(Token(kind, text, match.start()))
+    return tokens
+
+
+class JavaSymbols:
+    """Estructura de un archivo Java: lo que antes sacaba cada extractor con su propio findall"""
+
+    def __init__(self):
+        self.package = None
+        self.imports = []
+        self.classes = []
+        self.fields = []
+        self.methods = []
+        self.annotations = []
+        self.strings = []
+        self.instantiations = []
+        self.calls = []
+
+    @property
+    def class_names(self):
+        return [c.name for c in self.classes]
+
+    def methods_annotated(self, *names):
+        return [m for m in self.methods if any(a.name in names for a in m.annotations)]
+
+    def calls_to(self, receiver, suffix=False):
+        """
+        Llamadas sobre `receiver`. Con suffix=True basta que el último segmento del receptor termine
+        en `receiver`: calls_to('By', suffix=True) incluye AppiumBy, MobileBy y org.openqa.selenium.By.
+        """
+        if not suffix:
+            return [c for c in self.calls if c.receiver == receiver]
+        return [c for c in self.calls if c.receiver and c.receiver.rsplit('.', 1)[-1].endswith(receiver)]
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.symbols = JavaSymbols()
+        self.stack = []                 # ('class', nombre) | ('block', None)
+        self.pending_annotations = []
+        self.pending_javadoc = None
+
+    def _text(self, i):
+        return self.tokens[i].text if i < len(self.tokens) else None
+
+    def _kind(self, i):
+        return self.tokens[i].kind if i < len(self.tokens) else None
+
+    def _skip_balanced(self, i, open_char, close_char):
+        """Desde tokens[i] == open_char retorna el índice posterior a su cierre"""
+        depth = 0
+        while i < len(self.tokens):
+            text = self.tokens[i].text
+            if self.tokens[i].kind == 'op':
+                if text == open_char:
+                    depth += 1
+                elif text == close_char:
+                    depth -= 1
+                    if depth == 0:
+                        return i + 1
+            i += 1
+        return i
+
+    def _current_class(self):
+        for kind, name in reversed(self.stack):
+            if kind == 'class':
+                return name
+        return None
+
+    def _in_class_body(self):
+        return bool(self.stack) and self.stack[-1][0] == 'class'
+
+    def parse(self):
+        i = 0
+        tokens = self.tokens
+        while i < len(tokens):
+            token = tokens[i]
+            if token.kind == 'javadoc':
+                self.pending_javadoc = token.text
+                i += 1
+            elif token.kind == 'annotation':
+                i = self._parse_annotation(i)
+            elif token.kind == 'string':
+                self.symbols.strings.append(_unquote(token.text))
+                i += 1
+            elif token.kind == 'ident' and token.text in ('package', 'import') and not self.stack:
+                i = self._parse_import(i)
+            elif (token.kind == 'ident' and token.text in CLASS_KEYWORDS and self._kind(i + 1) == 'ident'
+                  and self._text(i - 1) != '.'):
+                i = self._parse_class(i)
+            elif token.kind == 'op' and token.text == '{':
+                self.stack.append(('block', None))
+                self._reset_pending()
+                i += 1
+            elif token.kind == 'op' and token.text == '}':
+                if self.stack:
+                    self.stack.pop()
+                self._reset_pending()
+                i += 1
+            elif token.kind == 'op' and token.text == ';':
+                self._reset_pending()
+                i += 1
+            elif token.kind == 'ident' and self._in_class_body():
+                end = self._parse_member(i)
+                i = end if end is not None else self._parse_expression_token(i)
+            else:
+                i = self._parse_expression_token(i)
+        return self.symbols
+
+    def _reset_pending(self):
+        self.pending_annotations = []
+        self.pending_javadoc = None
+
+    def _parse_annotation(self, i):
+        name = self.tokens[i].text[1:]
+        args = []
+        i += 1
+        if self._text(i) == '(':
+            end = self._skip_balanced(i, '(', ')')
+            args = [_unquote(t.text) for t in self.tokens[i:end] if t.kind == 'string']
+            self.symbols.strings.extend(args)
+            i = end
+        annotation = Annotation(name.split('.')[-1], args)
+        self.symbols.annotations.append(annotation)
+        self.pending_annotations.append(annotation)
+        return i
+
+    def _parse_import(self, i):
+        keyword = self.tokens[i].text
+        j = i + 1
+        parts = []
+        while j < len(self.tokens) and self.tokens[j].text != ';':
+            if self.tokens[j].text != 'static':
+                parts.append(self.tokens[j].text)
+            j += 1
+        name = ''.join(parts)
+        if keyword == 'package':
+            self.symbols.package = name
+        else:
+            self.symbols.imports.append(name)
+        return j + 1
+
+    def _parse_class(self, i):
+        kind = self.tokens[i].text
+        name = self.tokens[i + 1].text
+        extends = None
+        implements = []
+        j = i + 2
+        mode = None
+        while j < len(self.tokens) and self.tokens[j].text not in ('{', ';'):
+            token = self.tokens[j]
+            if token.text == '<':
+                j = self._skip_balanced(j, '<', '>')
+                continue
+            if token.text == '(':           # componentes de un record
+                j = self._skip_balanced(j, '(', ')')
+                continue
+            if token.text in ('extends', 'implements', 'permits'):
+                mode = token.text
+            elif token.kind == 'ident' and self._text(j - 1) != '.':
+                qualified = token.text
+                while self._text(j + 1) == '.' and self._kind(j + 2) == 'ident':
+                    qualified += '.' + self.tokens[j + 2].text
+                    j += 2
+                if mode == 'extends' and kind == 'class' and extends is None:
+                    extends = qualified
+                elif mode in ('implements', 'extends'):
+                    implements.append(qualified)
+            j += 1
+        self.symbols.classes.append(JavaClass(name, kind, extends, implements, self.pending_annotations))
+        self._reset_pending()
+        if self._text(j) == '{':
+            self.stack.append(('class', name))
+        return j + 1
+
+    def _parse_type(self, j):
+        """Tipo en tokens[j]: Nombre(.Nombre)*<...>[]... ; retorna (texto, índice siguiente) o (None, j)"""
+        if self._kind(j) != 'ident':
+            return None, j
+        start = j
+        j += 1
+        while self._text(j) == '.' and self._kind(j + 1) == 'ident':
+            j += 2
+        if self._text(j) == '<':
+            j = self._skip_balanced(j, '<', '>')
+        while self._text(j) == '[' and self._text(j + 1) == ']':
+            j += 2
+        if self._text(j) == '.' and self._text(j + 1) == '.' and self._text(j + 2) == '.':
+            j += 3  # varargs
+        return ''.join(t.text for t in self.tokens[start:j]), j
+
+    def _parse_member(self, i):
+        """Declaración de campo, método o constructor en el cuerpo de una clase (None si no lo es)"""
+        j = i
+        modifiers = []
+        while self._kind(j) in ('ident', 'annotation'):
+            if self._kind(j) == 'annotation':
+                j = self._parse_annotation(j)
+            elif self.tokens[j].text in MODIFIERS:
+                modifiers.append(self.tokens[j].text)
+                j += 1
+            else:
+                break
+        if self._text(j) == '<':   # parámetros de tipo de un método genérico
+            j = self._skip_balanced(j, '<', '>')
+        if self._kind(j) != 'ident' or self.tokens[j].text in CLASS_KEYWORDS:
+            return None
+
+        class_name = self._current_class()
+        if self.tokens[j].text == class_name and self._text(j + 1) == '(':
+            return self._parse_method(j, None, class_name, modifiers)
+        member_type, k = self._parse_type(j)
+        if member_type is None or self._kind(k) != 'ident':
+            return None
+        if self._text(k + 1) == '(':
+            return self._parse_method(k, member_type, class_name, modifiers)
+        if self._text(k + 1) in ('=', ';', ',', '['):
+            return self._parse_fields(k, member_type, class_name, modifiers)
+        return None
+
+    def _parse_method(self, k, return_type, class_name, modifiers):
+        name = self.tokens[k].text
+        params_end = self._skip_balanced(k + 1, '(', ')')
+        params = []
+        current = []
+        generic_depth = 0
+        for token in self.tokens[k + 2:params_end - 1]:
+            if token.text == '<':
+                generic_depth += 1
+            elif token.text == '>':
+                generic_depth -= 1
+            if token.text == ',' and generic_depth == 0 and current:
+                params.append(current)
+                current = []
+            elif token.kind != 'annotation' and token.text != 'final':
+                current.append(token.text)
+        if current:
+            params.append(current)
+        parameters = [(''.join(p[:-1]), p[-1]) for p in params if len(p) >= 2]
+        javadoc = self.pending_javadoc
+        self.symbols.methods.append(JavaMethod(
+            name, return_type, modifiers, self.pending_annotations, parameters,
+            _clean_javadoc(javadoc) if javadoc else None, class_name
+        ))
+        self._reset_pending()
+        # El cuerpo ('{') lo recorre el bucle principal como bloque
+        j = params_end
+        while j < len(self.tokens) and self.tokens[j].text not in ('{', ';'):
+            j += 1
+        return j
+
+    def _parse_fields(self, k, field_type, class_name, modifiers):
+        annotations = self.pending_annotations
+        j = k
+        while j < len(self.tokens):
+            name = self.tokens[j].text
+            j += 1
+            while self._text(j) == '[' and self._text(j + 1) == ']':
+                j += 2
+            new_class = None
+            strings = []
+            if self._text(j) == '=':
+                start = j + 1
+                j = self._skip_initializer(start)
+                new_class, strings = self._scan_expression(start, j)
+            self.symbols.fields.append(JavaField(name, field_type, modifiers, annotations, class_name, new_class, strings))
+            if self._text(j) == ',' and self._kind(j + 1) == 'ident':
+                j += 1
+                continue
+            break
+        self._reset_pending()
+        return j + 1 if self._text(j) == ';' else j
+
+    def _skip_initializer(self, j):
+        """Fin de un inicializador: ',' o ';' fuera de paréntesis/llaves/corchetes"""
+        depth = 0
+        while j < len(self.tokens):
+            text = self.tokens[j].text
+            if self.tokens[j].kind == 'op':
+                if text in '([{':
+                    depth += 1
+                elif text in ')]}':
+                    if depth == 0:
+                        return j
+                    depth -= 1
+                elif text in ',;' and depth == 0:
+                    return j
+            j += 1
+        return j
+
+    def _scan_expression(self, start, end):
+        """Registra strings, llamadas e instanciaciones de un rango; retorna (primer new, strings)"""
+        first_new = None
+        strings = []
+        i = start
+        while i < end:
+            token = self.tokens[i]
+            if token.kind == 'string':
+                value = _unquote(token.text)
+                strings.append(value)
+                self.symbols.strings.append(value)
+                i += 1
+            else:
+                if token.kind == 'ident' and token.text == 'new' and first_new is None and self._kind(i + 1) == 'ident':
+                    first_new = self.tokens[i + 1].text
+                i = self._parse_expression_token(i, record_strings=False)
+        return first_new, strings
+
+    def _parse_expression_token(self, i, record_strings=True):
+        """Tokens dentro de expresiones/bloques: instanciaciones y llamadas (con su string literal)"""
+        token = self.tokens[i]
+        if token.kind == 'string':
+            if record_strings:
+                self.symbols.strings.append(_unquote(token.text))
+            return i + 1
+        if token.kind != 'ident':
+            return i + 1
+        if token.text == 'new' and self._kind(i + 1) == 'ident':
+            class_name, j = self._parse_type(i + 1)
+            class_name = re.sub(r'<.*', '', class_name)
+            has_args = self._text(j) == '(' and self._text(j + 1) != ')'
+            declared_type = variable = None
+            # Type variable = new Clase(...)
+            if self._text(i - 1) == '=' and self._kind(i - 2) == 'ident' and i >= 3 and self._kind(i - 3) == 'ident':
+                variable = self.tokens[i - 2].text
+                declared_type = self.tokens[i - 3].text
+                if declared_type in MODIFIERS or declared_type in ('return', 'this'):
+                    declared_type = None
+            self.symbols.instantiations.append(Instantiation(declared_type, variable, class_name.split('.')[-1], has_args))
+            return i + 1
+        if self._text(i - 1) in ('.', 'new'):
+            return i + 1
+        # receptor.metodo(...) o con nombre calificado: org.openqa.selenium.By.id(...)
+        j = i
+        while self._text(j + 1) == '.' and self._kind(j + 2) == 'ident':
+            j += 2
+        if j > i and self._text(j + 1) == '(':
+            receiver = ''.join(t.text for t in self.tokens[i:j - 1])
+            self.symbols.calls.append(MethodCall(receiver, self.tokens[j].text, self._string_arg(j + 2)))
+        elif self._text(i + 1) == '(' and token.text not in CONTROL_KEYWORDS:
+            # Llamada sin receptor: assertEquals(...), verify(...)
+            self.symbols.calls.append(MethodCall(None, token.text, self._string_arg(i + 2)))
+        return i + 1
+
+    def _string_arg(self, i):
+        return _unquote(self.tokens[i].text) if self._kind(i) == 'string' else None
+
+
+def _clean_javadoc(text):
+    """Texto de un Javadoc sin delimitadores ni asteriscos, en una línea"""
+    body = text[3:-2] if text.endswith('*/') else text[3:]
+    return ' '.join(body.replace('*', '').split())
+
+
+def extract_symbols(source):
+    """Tokeniza y extrae la estructura de un archivo Java en una pasada (costo lineal)"""
+    return _Parser(tokenize(source)).parse()
+
+# Uso:
+# symbols = extract_symbols(contenido)
+# symbols.class_names, [m.name for m in symbols.methods_annotated('Test')]
+# [c.string_arg for c in symbols.calls_to('By', suffix=True)], [(f.type, f.name) for f in symbols.fields]
@@ -0,0 +1,240 @@
+"""
+bench_backend.py
+Benchmark de arranque en frío y latencia por fase del backend (cli.py).
+
+Cada corrida es un proceso nuevo que mide: import de cli, indexación del workspace (en frío
+y con cache), construcción del modelo (_base_context), armado de mensajes y espera al LLM
+(primer fragmento y total) contra un LLM local de mentira. Se reportan p50/p95 por fase,
+el pico de memoria (RSS) y se guarda un JSON comparable entre commits.
+
+    python benchmarks/bench_backend.py --files 500 --runs 10 --output antes.json
+    python benchmarks/bench_backend.py --files 500 --runs 10 --output despues.json --compare antes.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_PROMPT = 'automatizar login con selenium'
+PHASES = [
+    'process_total', 'import_cli', 'index_cold', 'index_warm', 'model_init',
+    'base_context', 'build_messages', 'llm_first_chunk', 'llm_total'
+]
+
+
+def peak_rss_kb():
+    """Pico de memoria residente del proceso actual en KB (None si la plataforma no lo expone)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS reporta bytes
+
+
+def percentile(samples, fraction):
+    """Percentil con interpolación lineal (samples no vacío)"""
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    return {
+        'p50': round(percentile(samples, 0.50), 3),
+        'p95': round(percentile(samples, 0.95), 3),
+        'mean': round(sum(samples) / len(samples), 3),
+        'min': round(min(samples), 3),
+        'max': round(max(samples), 3),
+        'samples': [round(s, 3) for s in samples]
+    }
+
+
+def run_once(workspace, prompt, first_token_latency, chunk_latency):
+    """Una corrida completa dentro del proceso actual (recién iniciado). Retorna ms por fase."""
+    timings = {}
+
+    start = time.perf_counter()
+    import cli
+    timings['import_cli'] = (time.perf_counter() - start) * 1000
+
+    cache_file = os.path.join(workspace, '.agentesting_cache.json')
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+    start = time.perf_counter()
+    indexer = cli.WorkspaceIndexer(workspace)
+    indexer.index_workspace()
+    index = indexer.get_index()
+    timings['index_cold'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    warm = cli.WorkspaceIndexer(workspace)
+    warm.index_workspace()
+    warm.get_index()
+    timings['index_warm'] = (time.perf_counter() - start) * 1000
+
+    from benchmarks.stub_llm import StubLLM
+    from model.response_cache import ResponseCache
+    llm = StubLLM(first_token_latency=first_token_latency, chunk_latency=chunk_latency)
+    start = time.perf_counter()
+    model = cli.ContextualModel(
+        index,
+        model_path=os.path.join(workspace, 'context_model.pkl'),
+        response_cache=ResponseCache(':memory:'),  # siempre fallo de cache: se mide el LLM
+        llm=llm
+    )
+    timings['model_init'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    model._build_base_context()
+    timings['base_context'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    model._build_messages(prompt)
+    timings['build_messages'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    first = None
+    for _ in model.generate_response_stream(prompt):
+        if first is None:
+            first = time.perf_counter()
+    end = time.perf_counter()
+    timings['llm_first_chunk'] = ((first or end) - start) * 1000
+    timings['llm_total'] = (end - start) * 1000
+
+    return {'timings': timings, 'peak_rss_kb': peak_rss_kb(), 'llm_calls': llm.calls}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmark(files=200, runs=5, prompt=DEFAULT_PROMPT, first_token_latency=0.05,
+                  chunk_latency=0.002, workspace=None):
+    """Genera el workspace, lanza `runs` procesos en frío y agrega los resultados"""
+    from benchmarks.synthetic_workspace import generate_workspace
+
+    tmp = tempfile.mkdtemp(prefix='agentesting-bench-')
+    try:
+        if workspace is None:
+            workspace = os.path.join(tmp, 'workspace')
+            workspace_bytes = generate_workspace(workspace, files=files)
+        else:
+            workspace_bytes = None
+        env = dict(os.environ, AGENTESTING_CACHE_DIR=os.path.join(tmp, 'cache'), PYTHONDONTWRITEBYTECODE='1')
+        env.pop('OPENAI_API_KEY', None)
+
+        samples = {phase: [] for phase in PHASES}
+        peak_rss = []
+        for _ in range(runs):
+            command = [
+                sys.executable, os.path.abspath(__file__), '--run-once',
+                '--workspace', workspace, '--prompt', prompt,
+                '--first-token-latency', str(first_token_latency),
+                '--chunk-latency', str(chunk_latency)
+            ]
+            start = time.perf_counter()
+            result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+            elapsed = (time.perf_counter() - start) * 1000
+            if result.returncode != 0:
+                raise RuntimeError(f"La corrida falló:\n{result.stderr[-2000:]}")
+            # La última línea de stdout es el JSON de la corrida (lo demás son diagnósticos)
+            data = json.loads(result.stdout.strip().splitlines()[-1])
+            samples['process_total'].append(elapsed)
+            for phase, value in data['timings'].items():
+                samples[phase].append(value)
+            if data['peak_rss_kb'] is not None:
+                peak_rss.append(data['peak_rss_kb'])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'files': files,
+            'workspace_bytes': workspace_bytes,
+            'runs': runs,
+            'prompt': prompt,
+            'first_token_latency_ms': first_token_latency * 1000,
+            'chunk_latency_ms': chunk_latency * 1000
+        },
+        'phases_ms': {phase: summarize(values) for phase, values in samples.items() if values},
+        'peak_rss_kb': max(peak_rss) if peak_rss else None
+    }
+
+
+def print_report(report, baseline=None):
+    meta = report['meta']
+    print(f"[BENCH] commit={meta['commit']} files={meta['files']} runs={meta['runs']} python={meta['python']}")
+    header = f"  {'fase':<16} {'p50 ms':>10} {'p95 ms':>10}"
+    if baseline:
+        header += f" {'p50 antes':>10} {'delta':>8}"
+    print(header)
+    for phase, stats in report['phases_ms'].items():
+        line = f"  {phase:<16} {stats['p50']:>10.2f} {stats['p95']:>10.2f}"
+        previous = (baseline or {}).get('phases_ms', {}).get(phase)
+        if previous:
+            delta = 100.0 * (stats['p50'] - previous['p50']) / previous['p50'] if previous['p50'] else 0.0
+            line += f" {previous['p50']:>10.2f} {delta:>+7.1f}%"
+        print(line)
+    if report['peak_rss_kb'] is not None:
+        line = f"  {'peak_rss':<16} {report['peak_rss_kb'] / 1024:>9.1f}M"
+        if baseline and baseline.get('peak_rss_kb'):
+            line += f" (antes {baseline['peak_rss_kb'] / 1024:.1f}M)"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de arranque y latencia por fase del backend')
+    parser.add_argument('--files', type=int, default=200, help='archivos del workspace sintético')
+    parser.add_argument('--runs', type=int, default=5, help='corridas (procesos en frío)')
+    parser.add_argument('--prompt', default=DEFAULT_PROMPT)
+    parser.add_argument('--workspace', help='workspace real en lugar del sintético')
+    parser.add_argument('--first-token-latency', type=float, default=0.05, help='segundos hasta el primer fragmento')
+    parser.add_argument('--chunk-latency', type=float, default=0.002, help='segundos entre fragmentos')
+    parser.add_argument('--output', help='guardar el resultado en JSON')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para mostrar deltas')
+    parser.add_argument('--run-once', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_once:
+        result = run_once(args.workspace, args.prompt, args.first_token_latency, args.chunk_latency)
+        sys.stdout.write(json.dumps(result) + '\n')
+        return result
+
+    report = run_benchmark(args.files, args.runs, args.prompt, args.first_token_latency,
+                           args.chunk_latency, args.workspace)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Resultado guardado en {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
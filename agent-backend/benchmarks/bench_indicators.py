@@ -0,0 +1,121 @@
+"""
+bench_indicators.py
+Benchmark de la clasificación por indicadores de HybridTrainingEngine: el escaneo único de
+IndicatorMatcher (analysis/indicators.py) contra las cadenas de `in` que usaba antes el motor
+(_collect_indicators + _is_web_file + _is_mobile_file, reproducidas aquí tal como eran).
+
+Mide solo la clasificación sobre contenido ya leído (sin disco), por archivo, en el proyecto
+sintético de synthetic_project.py y opcionalmente en otro directorio.
+
+    python benchmarks/bench_indicators.py --files 1000 --runs 7
+    python benchmarks/bench_indicators.py --path ../otro-proyecto
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from analysis.indicators import HYBRID_INDICATORS, TRAINING_FRAMEWORKS
+
+# Listas del motor anterior, en el mismo orden (el orden importa: `any` corta en el primer acierto)
+LEGACY_MOBILE_PROJECT = ['appium', 'android', 'ios', 'mobile', 'device', 'androiddriver']
+LEGACY_WEB_PROJECT = ['selenium', 'webdriver', 'browser', 'chrome', 'firefox', 'chromedriver']
+LEGACY_FRAMEWORKS = [('cucumber', 'Cucumber'), ('junit', 'JUnit'), ('appium', 'Appium'), ('selenium', 'Selenium')]
+LEGACY_WEB_FILE = ['webdriver', 'selenium', 'browser', 'chrome', 'firefox', 'page.java', 'webpage',
+                   'webelement', 'by.id', 'by.xpath', 'driver.get', 'driver.navigate']
+LEGACY_MOBILE_FILE = ['appium', 'android', 'ios', 'mobile', 'screen.java', 'com.', ':id/', 'androiddriver',
+                      'iosdriver', 'appiumdriver', 'mobileelement']
+
+
+def classify_legacy(content):
+    """Clasificación anterior: una copia en minúsculas y cinco cadenas de `in`"""
+    content_lower = content.lower()
+    mobile = any(keyword in content_lower for keyword in LEGACY_MOBILE_PROJECT)
+    web = any(keyword in content_lower for keyword in LEGACY_WEB_PROJECT)
+    frameworks = [framework for keyword, framework in LEGACY_FRAMEWORKS if keyword in content_lower]
+    is_web = any(indicator in content_lower for indicator in LEGACY_WEB_FILE)
+    is_mobile = any(indicator in content_lower for indicator in LEGACY_MOBILE_FILE)
+    return mobile, web, frameworks, 'web_file' if is_web else 'mobile_file' if is_mobile else None
+
+
+def classify_matcher(content):
+    """Clasificación actual: un escaneo con conteos completos y decisión ponderada"""
+    hits = HYBRID_INDICATORS.scan(content)
+    return 'mobile' in hits, 'web' in hits, hits.found(TRAINING_FRAMEWORKS), hits.best('web_file', 'mobile_file')
+
+
+def load_contents(root):
+    """Contenido de los archivos de texto bajo `root` (mismo filtro de extensiones que el motor)"""
+    sys.path.insert(0, os.path.join(BACKEND_DIR, 'training'))
+    from training_engine import SKIP_DIRS
+
+    contents = []
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in files:
+            if name.endswith(('.java', '.py', '.js', '.ts', '.feature', '.kt')):
+                with open(os.path.join(current, name), 'r', encoding='utf-8', errors='ignore') as f:
+                    contents.append(f.read())
+    return contents
+
+
+def measure(classify, contents, runs):
+    """Mejor tiempo (s) de `runs` pasadas completas sobre `contents`"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for content in contents:
+            classify(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(files=1000, runs=7, paths=()):
+    from benchmarks.synthetic_project import generate_project
+
+    results = []
+    tmp = tempfile.mkdtemp(prefix='agentesting-indicators-bench-')
+    try:
+        project = os.path.join(tmp, 'proyecto')
+        generate_project(project, files=files)
+        for label, root in [(f'sintético-{files}', project)] + [(p, p) for p in paths]:
+            contents = load_contents(root)
+            legacy = measure(classify_legacy, contents, runs)
+            matcher = measure(classify_matcher, contents, runs)
+            changed = sum(classify_legacy(c)[3] != classify_matcher(c)[3] for c in contents)
+            results.append({
+                'source': label,
+                'files': len(contents),
+                'bytes': sum(len(c) for c in contents),
+                'legacy_us_per_file': round(1e6 * legacy / len(contents), 2),
+                'matcher_us_per_file': round(1e6 * matcher / len(contents), 2),
+                'ratio': round(matcher / legacy, 2),
+                'web_mobile_changed': changed
+            })
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de la clasificación por indicadores')
+    parser.add_argument('--files', type=int, default=1000, help='archivos del proyecto sintético')
+    parser.add_argument('--runs', type=int, default=7, help='pasadas por variante (se toma la mejor)')
+    parser.add_argument('--path', action='append', default=[], help='directorio adicional a medir')
+    args = parser.parse_args(argv)
+
+    print(f"  {'origen':<24} {'archivos':>8} {'KB':>8} {'antes µs':>9} {'ahora µs':>9} {'ratio':>6} {'web/móvil distinto':>19}")
+    for r in run_benchmark(args.files, args.runs, args.path):
+        print(f"  {r['source'][-24:]:<24} {r['files']:>8} {r['bytes'] / 1024:>8.0f} {r['legacy_us_per_file']:>9.2f} "
+              f"{r['matcher_us_per_file']:>9.2f} {r['ratio']:>6.2f} {r['web_mobile_changed']:>19}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+bench_training.py
+Benchmark de escalamiento de los motores de entrenamiento (QATrainingEngine y HybridTrainingEngine).
+
+Para cada tamaño genera un proyecto sintético Task-Screen-Control (synthetic_project.py) y, en un
+proceso nuevo por corrida, analiza el proyecto y guarda el artefacto de entrenamiento. Reporta
+archivos/s, MB/s, pico de memoria (RSS) y tamaño del artefacto, y guarda un JSON comparable entre
+commits para detectar regresiones de escalamiento.
+
+    python benchmarks/bench_training.py --sizes 200,1000,5000 --runs 3 --output antes.json
+    python benchmarks/bench_training.py --sizes 200,1000,5000 --runs 3 --compare antes.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.bench_backend import git_commit, peak_rss_kb, percentile
+
+ENGINES = ['QATrainingEngine', 'HybridTrainingEngine']
+
+
+def artifact_size(path):
+    """Bytes del artefacto: el manifiesto más sus shards (training/artifact.py)"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    shards = os.path.splitext(path)[0] + '.shards'
+    return os.path.getsize(path) + (artifact_size(shards) if os.path.isdir(shards) else 0)
+
+
+def run_once(engine_name, project, output, jobs=1):
+    """Una corrida en el proceso actual (recién iniciado): análisis + guardado del artefacto"""
+    sys.path.insert(0, os.path.join(BACKEND_DIR, 'training'))
+    from hybrid_trainer import HybridTrainingEngine, QATrainingEngine
+
+    engine_class = HybridTrainingEngine if engine_name == 'HybridTrainingEngine' else QATrainingEngine
+    rss_before = peak_rss_kb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        engine = engine_class(project)
+        result = engine.analyze_project(jobs=jobs)
+        analyzed = time.perf_counter()
+        if engine_name == 'HybridTrainingEngine':
+            engine.save_hybrid_training_data(result, output)
+        else:
+            engine.save_training_data(output)
+        end = time.perf_counter()
+    return {
+        'analyze_s': analyzed - start,
+        'save_s': end - analyzed,
+        'total_s': end - start,
+        'peak_rss_kb': peak_rss_kb(),
+        'baseline_rss_kb': rss_before,
+        'artifact_bytes': artifact_size(output),
+        'skipped_files': len(engine.skipped_files)
+    }
+
+
+def run_benchmark(sizes=(200, 1000), runs=3, jobs=1, engines=ENGINES):
+    """Genera un proyecto por tamaño y mide cada motor en `runs` procesos nuevos"""
+    from benchmarks.synthetic_project import generate_project
+
+    results = []
+    tmp = tempfile.mkdtemp(prefix='agentesting-train-bench-')
+    try:
+        for size in sizes:
+            project = os.path.join(tmp, f'proyecto-{size}')
+            generated = generate_project(project, files=size)
+            for engine_name in engines:
+                samples = []
+                for run in range(runs):
+                    output = os.path.join(tmp, f'training-{size}-{engine_name}-{run}.json')
+                    command = [
+                        sys.executable, os.path.abspath(__file__), '--run-once', '--engine', engine_name,
+                        '--project', project, '--artifact', output, '--jobs', str(jobs)
+                    ]
+                    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True,
+                                               env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1'))
+                    if completed.returncode != 0:
+                        raise RuntimeError(f"La corrida falló:\n{completed.stderr[-2000:]}")
+                    samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+                total = percentile([s['total_s'] for s in samples], 0.5)
+                analyze = percentile([s['analyze_s'] for s in samples], 0.5)
+                results.append({
+                    'engine': engine_name,
+                    'files': generated['files'],
+                    'bytes': generated['bytes'],
+                    'analyze_s_p50': round(analyze, 4),
+                    'save_s_p50': round(percentile([s['save_s'] for s in samples], 0.5), 4),
+                    'total_s_p50': round(total, 4),
+                    'files_per_s': round(generated['files'] / analyze, 1) if analyze else None,
+                    'mb_per_s': round(generated['bytes'] / 1024 / 1024 / analyze, 3) if analyze else None,
+                    'peak_rss_kb': max(s['peak_rss_kb'] or 0 for s in samples) or None,
+                    'rss_growth_kb': max((s['peak_rss_kb'] or 0) - (s['baseline_rss_kb'] or 0) for s in samples),
+                    'artifact_bytes': samples[-1]['artifact_bytes'],
+                    'skipped_files': samples[-1]['skipped_files']
+                })
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': list(sizes),
+            'runs': runs,
+            'jobs': jobs
+        },
+        'results': results
+    }
+
+
+def print_report(report, baseline=None):
+    meta = report['meta']
+    print(f"[BENCH] commit={meta['commit']} runs={meta['runs']} jobs={meta['jobs']} python={meta['python']}")
+    previous = {(r['engine'], r['files']): r for r in (baseline or {}).get('results', [])}
+    print(f"  {'motor':<22} {'archivos':>8} {'arch/s':>9} {'MB/s':>7} {'RSS MB':>7} {'artefacto KB':>13}")
+    for r in report['results']:
+        line = (f"  {r['engine']:<22} {r['files']:>8} {r['files_per_s'] or 0:>9.1f} {r['mb_per_s'] or 0:>7.2f} "
+                f"{(r['peak_rss_kb'] or 0) / 1024:>7.1f} {r['artifact_bytes'] / 1024:>13.1f}")
+        before = previous.get((r['engine'], r['files']))
+        if before and before.get('files_per_s'):
+            delta = 100.0 * (r['files_per_s'] - before['files_per_s']) / before['files_per_s']
+            line += f"  arch/s {delta:+.1f}% (antes {before['files_per_s']:.1f})"
+            line += f", artefacto antes {before['artifact_bytes'] / 1024:.1f} KB"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de escalamiento de los motores de entrenamiento')
+    parser.add_argument('--sizes', default='200,1000', help='tamaños de proyecto (archivos), separados por coma')
+    parser.add_argument('--runs', type=int, default=3, help='corridas por motor y tamaño (procesos en frío)')
+    parser.add_argument('--jobs', type=int, default=1, help='procesos del análisis (jobs de analyze_project)')
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    parser.add_argument('--output', help='guardar el resultado en JSON')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para mostrar deltas')
+    parser.add_argument('--run-once', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--engine', help=argparse.SUPPRESS)
+    parser.add_argument('--project', help=argparse.SUPPRESS)
+    parser.add_argument('--artifact', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_once:
+        result = run_once(args.engine, args.project, args.artifact, args.jobs)
+        sys.stdout.write(json.dumps(result) + '\n')
+        return result
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    report = run_benchmark(sizes, args.runs, args.jobs, args.engines.split(','))
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Resultado guardado en {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
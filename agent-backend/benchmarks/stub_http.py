@@ -0,0 +1,103 @@
+"""
+stub_http.py
+Servidor HTTP local de mentira (127.0.0.1, puerto libre, HTTP/1.1 keep-alive) para probar y medir
+las integraciones (LLM, Jira, TestRail) sin red: responde lo que se encola o lo que indique
+`responder`, con demora opcional, y registra cada solicitud con el puerto del cliente para
+verificar la reutilización de conexiones.
+"""
+import json
+import threading
+import time
+from collections import deque, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+StubRequest = namedtuple('StubRequest', ['method', 'path', 'headers', 'body', 'client_port'])
+StubResponse = namedtuple('StubResponse', ['status', 'body', 'headers', 'delay'])
+
+
+def respuesta(status=200, body=None, headers=None, delay=0):
+    return StubResponse(status, body if body is not None else {}, headers or {}, delay)
+
+
+class StubHTTPServer:
+    def __init__(self, responder=None):
+        # responder(StubRequest) -> StubResponse; se usa cuando la cola está vacía
+        self.responder = responder or (lambda request: respuesta())
+        self.requests = []
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def encolar(self, status=200, body=None, headers=None, delay=0):
+        with self._lock:
+            self._queue.append(respuesta(status, body, headers, delay))
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _responder(self, request):
+        with self._lock:
+            self.requests.append(request)
+            scripted = self._queue.popleft() if self._queue else None
+        return scripted or self.responder(request)
+
+    def start(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = raw.decode('utf-8', 'replace')
+                result = stub._responder(StubRequest(self.command, self.path, dict(self.headers), body,
+                                                     self.client_address[1]))
+                if result.delay:
+                    time.sleep(result.delay)
+                payload = json.dumps(result.body).encode('utf-8')
+                try:
+                    self.send_response(result.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    for name, value in result.headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # el cliente abandonó por timeout
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# Uso:
+# with StubHTTPServer() as stub:
+#     stub.encolar(429, headers={'Retry-After': '1'}); stub.encolar(201, {'key': 'QA-1'})
+#     JiraExporter(transporte).exportar_feature(...)   # con JIRA_URL=stub.url
+#     stub.requests -> [StubRequest(method='POST', path='/rest/api/2/issue', ...), ...]
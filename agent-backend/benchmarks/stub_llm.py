@@ -0,0 +1,35 @@
+"""
+stub_llm.py
+LLM local de mentira con latencia configurable: misma interfaz que usa ContextualModel
+(stream / invoke) para medir el backend sin red ni costo de tokens.
+"""
+import time
+
+
+class StubChunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class StubLLM:
+    def __init__(self, first_token_latency=0.05, chunk_latency=0.002, chunks=40,
+                 text='driver.findElement(By.id("login")).click();\n'):
+        self.first_token_latency = first_token_latency
+        self.chunk_latency = chunk_latency
+        self.chunks = chunks
+        self.text = text
+        self.calls = 0
+
+    def stream(self, messages):
+        self.calls += 1
+        time.sleep(self.first_token_latency)
+        for i in range(self.chunks):
+            if i:
+                time.sleep(self.chunk_latency)
+            yield StubChunk(self.text)
+
+    def invoke(self, messages):
+        return StubChunk(''.join(chunk.content for chunk in self.stream(messages)))
+
+# Uso:
+# model = ContextualModel(index, llm=StubLLM(first_token_latency=0.2))
@@ -0,0 +1,192 @@
+"""
+synthetic_project.py
+Genera proyectos de automatización sintéticos con la arquitectura Task-Screen-Control para medir
+los motores de entrenamiento (QATrainingEngine / HybridTrainingEngine) a distintos tamaños.
+
+Por cada módulo se escriben: Screen móvil (controles con By.id("paquete:id/...")), Page web
+(WebTextBox/WebButton), Task que instancia su Screen con `new XScreen()`, step definitions de
+Cucumber, feature, test de pytest y spec de JavaScript. Con la misma semilla el contenido es idéntico.
+"""
+import os
+import random
+
+MODULES = ['login', 'carrito', 'checkout', 'perfil', 'busqueda', 'pagos', 'usuarios', 'reportes']
+KINDS = ['screen', 'page', 'task', 'steps', 'feature', 'pytest', 'spec']
+
+SCREEN_TEMPLATE = '''package com.demo.{module}.screens;
+
+import io.appium.java_client.AppiumDriver;
+import org.openqa.selenium.By;
+
+public class {name}Screen {{
+{controls}
+    public void tapIngresar{index}() {{
+        boton{index}.click();
+    }}
+
+    public String getTextoMensaje{index}() {{
+        return mensaje{index}.getText();
+    }}
+}}
+'''
+
+SCREEN_CONTROL = '    public {type} {field} = new {type}(By.id("com.demo.{module}:id/{field}"));\n'
+
+PAGE_TEMPLATE = '''package com.demo.{module}.pages;
+
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.By;
+
+public class {name}Page {{
+{controls}
+    public void navigateTo{name}(WebDriver driver) {{
+        driver.get("https://demo.test/{module}/{index}");
+    }}
+
+    public void clickEnviar{index}() {{
+        enviar{index}.click();
+    }}
+}}
+'''
+
+PAGE_CONTROL = '    public {type} {field} = new {type}(By.xpath("//*[@data-test=\'{field}\']"));\n'
+
+TASK_TEMPLATE = '''package com.demo.{module}.tasks;
+
+import com.demo.{module}.screens.{name}Screen;
+
+public class {name}Task {{
+    {name}Screen screen = new {name}Screen();
+
+    public void withCredentials(String usuario, String clave) {{
+        screen.campo{index}.setText(usuario);
+        screen.tapIngresar{index}();
+    }}
+
+    public void execute{name}() {{
+        screen.tapIngresar{index}();
+    }}
+}}
+'''
+
+STEPS_TEMPLATE = '''package com.demo.{module}.steps;
+
+import io.cucumber.java.en.Given;
+import io.cucumber.java.en.When;
+import io.cucumber.java.en.Then;
+import org.junit.Assert;
+
+public class {name}Steps {{
+    {name}Task task = new {name}Task();
+
+    @Given("el usuario abre {module} {index}")
+    public void abrir{index}() {{ }}
+
+    @When("ingresa las credenciales {index}")
+    public void ingresar{index}() {{
+        task.withCredentials("usuario", "clave");
+    }}
+
+    @Then("ve el mensaje {index}")
+    public void validar{index}() {{
+        Assert.assertTrue(true);
+    }}
+}}
+'''
+
+FEATURE_TEMPLATE = '''Feature: {name}
+  Scenario: Flujo {index} de {module}
+    Given el usuario abre {module} {index}
+    When ingresa las credenciales {index}
+    Then ve el mensaje {index}
+'''
+
+PYTEST_TEMPLATE = '''import pytest
+
+
+@pytest.fixture
+def pagina_{index}():
+    return {{"modulo": "{module}", "indice": {index}}}
+
+
+def test_{module}_{index}_carga(pagina_{index}):
+    assert pagina_{index}["modulo"] == "{module}"
+
+
+def test_{module}_{index}_indice(pagina_{index}):
+    assert pagina_{index}["indice"] == {index}
+'''
+
+SPEC_TEMPLATE = '''describe('{module} {index}', () => {{
+  beforeEach(() => {{
+    cy.visit('/{module}/{index}');
+  }});
+
+  it('muestra el formulario {index}', () => {{
+    cy.get('[data-test=campo{index}]').should('be.visible');
+    expect(true).to.equal(true);
+  }});
+}});
+'''
+
+MOBILE_CONTROLS = ['TextBox', 'Button', 'Label', 'CheckBox']
+WEB_CONTROLS = ['WebTextBox', 'WebButton', 'WebLabel', 'WebCheckBox']
+
+
+def _controls(rng, template, types, module, index, control_count):
+    lines = [template.format(type=types[0], field=f'campo{index}', module=module),
+             template.format(type=types[1], field=f'boton{index}', module=module),
+             template.format(type=types[1], field=f'enviar{index}', module=module),
+             template.format(type=types[2], field=f'mensaje{index}', module=module)]
+    for i in range(rng.randint(0, control_count)):
+        lines.append(template.format(type=rng.choice(types), field=f'extra{index}_{i}', module=module))
+    return ''.join(lines)
+
+
+def generate_project(root, files=300, seed=42, control_count=6):
+    """
+    Crea `files` archivos bajo `root` rotando entre Screen, Page, Task, steps, feature, pytest y
+    spec. Retorna {'files', 'bytes', 'by_kind'}.
+    """
+    rng = random.Random(seed)
+    by_kind = dict.fromkeys(KINDS, 0)
+    written = 0
+    for position in range(files):
+        kind = KINDS[position % len(KINDS)]
+        index = position // len(KINDS)
+        module = MODULES[index % len(MODULES)]
+        name = f"{module.capitalize()}{index}"
+        java_dir = os.path.join(root, 'src', 'test', 'java', 'com', 'demo', module)
+        if kind == 'screen':
+            directory, filename = os.path.join(java_dir, 'screens'), f"{name}Screen.java"
+            controls = _controls(rng, SCREEN_CONTROL, MOBILE_CONTROLS, module, index, control_count)
+            content = SCREEN_TEMPLATE.format(module=module, name=name, index=index, controls=controls)
+        elif kind == 'page':
+            directory, filename = os.path.join(java_dir, 'pages'), f"{name}Page.java"
+            controls = _controls(rng, PAGE_CONTROL, WEB_CONTROLS, module, index, control_count)
+            content = PAGE_TEMPLATE.format(module=module, name=name, index=index, controls=controls)
+        elif kind == 'task':
+            directory, filename = os.path.join(java_dir, 'tasks'), f"{name}Task.java"
+            content = TASK_TEMPLATE.format(module=module, name=name, index=index)
+        elif kind == 'steps':
+            directory, filename = os.path.join(java_dir, 'steps'), f"{name}Steps.java"
+            content = STEPS_TEMPLATE.format(module=module, name=name, index=index)
+        elif kind == 'feature':
+            directory = os.path.join(root, 'src', 'test', 'resources', 'features', module)
+            filename = f"{name.lower()}.feature"
+            content = FEATURE_TEMPLATE.format(module=module, name=name, index=index)
+        elif kind == 'pytest':
+            directory, filename = os.path.join(root, 'tests', module), f"test_{module}_{index}.py"
+            content = PYTEST_TEMPLATE.format(module=module, index=index)
+        else:
+            directory, filename = os.path.join(root, 'cypress', 'e2e', module), f"{module}_{index}.spec.js"
+            content = SPEC_TEMPLATE.format(module=module, index=index)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+        by_kind[kind] += 1
+        written += len(content.encode('utf-8'))
+    return {'files': files, 'bytes': written, 'by_kind': by_kind}
+
+# Uso:
+# generate_project('/tmp/proyecto', files=2000)  -> {'files': 2000, 'bytes': ..., 'by_kind': {...}}
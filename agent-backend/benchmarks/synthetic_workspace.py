@@ -0,0 +1,96 @@
+"""
+synthetic_workspace.py
+Genera un workspace sintético (Page Objects Java, step definitions y features de Cucumber)
+para medir el backend con tamaños controlados y reproducibles.
+"""
+import os
+import random
+
+MODULES = ['login', 'carrito', 'checkout', 'perfil', 'busqueda', 'pagos', 'usuarios', 'reportes']
+
+PAGE_TEMPLATE = '''package com.demo.{module}.pages;
+
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.By;
+import org.junit.Test;
+
+public class {name}Page {{
+    private final WebDriver driver;
+    private final By campo{index} = By.id("campo-{index}");
+    private final By boton{index} = By.cssSelector("button.enviar-{index}");
+
+    public {name}Page(WebDriver driver) {{
+        this.driver = driver;
+    }}
+
+    public void completarFormulario(String valor) {{
+        driver.findElement(campo{index}).sendKeys(valor);
+        driver.findElement(boton{index}).click();
+    }}
+{extra}}}
+'''
+
+EXTRA_METHOD = '''
+    public boolean validarMensaje{i}(String esperado) {{
+        return driver.findElement(By.xpath("//div[@id='msg-{i}']")).getText().contains(esperado);
+    }}
+'''
+
+STEPS_TEMPLATE = '''package com.demo.{module}.steps;
+
+import io.cucumber.java.en.Given;
+import io.cucumber.java.en.When;
+import io.cucumber.java.en.Then;
+
+public class {name}Steps {{
+    @Given("el usuario abre {module} {index}")
+    public void abrir() {{ }}
+
+    @When("completa el formulario {index} con {{string}}")
+    public void completar(String valor) {{ }}
+
+    @Then("ve el mensaje {index}")
+    public void validar() {{ }}
+}}
+'''
+
+FEATURE_TEMPLATE = '''Feature: {name}
+  Scenario: Flujo {index} de {module}
+    Given el usuario abre {module} {index}
+    When completa el formulario {index} con "dato-{index}"
+    Then ve el mensaje {index}
+'''
+
+
+def generate_workspace(root, files=200, seed=42, method_count=3):
+    """
+    Crea `files` archivos repartidos en Page Objects, steps (.java) y features bajo `root`.
+    Retorna el número de bytes escritos. Con la misma semilla el contenido es idéntico.
+    """
+    rng = random.Random(seed)
+    written = 0
+    for index in range(files):
+        module = MODULES[index % len(MODULES)]
+        name = f"{module.capitalize()}{index}"
+        kind = index % 3
+        if kind == 0:
+            directory = os.path.join(root, 'src', 'test', 'java', 'com', 'demo', module, 'pages')
+            extra = ''.join(EXTRA_METHOD.format(i=i) for i in range(rng.randint(1, method_count)))
+            content = PAGE_TEMPLATE.format(module=module, name=name, index=index, extra=extra)
+            filename = f"{name}Page.java"
+        elif kind == 1:
+            directory = os.path.join(root, 'src', 'test', 'java', 'com', 'demo', module, 'steps')
+            content = STEPS_TEMPLATE.format(module=module, name=name, index=index)
+            filename = f"{name}Steps.java"
+        else:
+            directory = os.path.join(root, 'src', 'test', 'resources', 'features', module)
+            content = FEATURE_TEMPLATE.format(module=module, name=name, index=index)
+            filename = f"{name.lower()}.feature"
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+        written += len(content.encode('utf-8'))
+    return written
+
+# Uso:
+# generate_workspace('/tmp/ws', files=500)
@@ -0,0 +1,67 @@
+"""
+checkpoint_exportacion.py
+Checkpoint reanudable de exportaciones masivas (Jira, TestRail): guarda en JSON qué ítem local ya
+tiene su par remoto (id del ítem -> clave del issue / id del caso). Se reescribe de forma atómica
+después de cada lote, así que un corte a mitad de la exportación no pierde lo ya creado y la
+siguiente corrida salta esos ítems.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+def ruta_checkpoint(destino, carpeta=None):
+    """Checkpoint por defecto de una exportación: junto a los features generados (CARPETA_SALIDA)"""
+    from config import CONFIG
+    return os.path.join(carpeta or CONFIG.get("CARPETA_SALIDA", "src/test/generated"), f".{destino}_checkpoint.json")
+
+
+def id_item(*partes):
+    """Id estable de un ítem a partir de su contenido (mismo contenido -> mismo id)"""
+    return hashlib.sha1('\0'.join(str(p) for p in partes).encode('utf-8')).hexdigest()[:16]
+
+
+class CheckpointExportacion:
+    def __init__(self, ruta=None):
+        self.ruta = ruta  # None: solo en memoria
+        self._lock = threading.Lock()
+        self._exportados = {}
+        if ruta and os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                self._exportados = json.load(f).get('exportados', {})
+
+    def remoto(self, item_id):
+        with self._lock:
+            return self._exportados.get(item_id)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._exportados)
+
+    def registrar(self, pares):
+        """pares: {item_id: id remoto}; persiste enseguida"""
+        if not pares:
+            return
+        with self._lock:
+            self._exportados.update(pares)
+            if self.ruta:
+                self._guardar()
+
+    def _guardar(self):
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directorio, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=directorio, prefix='.checkpoint-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'exportados': self._exportados}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporal, self.ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+# Uso:
+# checkpoint = CheckpointExportacion(ruta_checkpoint('jira'))   # salida/.jira_checkpoint.json
+# if checkpoint.remoto(item_id) is None: ... crear ...; checkpoint.registrar({item_id: 'QA-12'})
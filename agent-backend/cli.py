@@ -1,11 +1,22 @@
 import sys
 import os
+import io
+import contextlib
+import threading
 import traceback
-print("[DIAGNOSTIC] cli.py iniciado. sys.argv:", sys.argv)
 
 """
 cli.py
 Punto de entrada OPTIMIZADO del backend. Inicialización rápida con lazy loading y cache.
+
+Modos:
+    python cli.py "<prompt>" [api_key]   -> responde un prompt y termina
+    python cli.py --stream "<prompt>" [api_key] -> igual, pero emite la respuesta en frames JSON por línea
+    python cli.py --serve [api_key] [--workers N] -> proceso residente, protocolo JSON por línea (ver server/daemon.py)
+    python cli.py --startup-profile ["<prompt>"] -> costo de imports por paquete para ese prompt
+    python cli.py --cache-stats | --cache-clear  -> estado / limpieza de la cache persistente de respuestas
+
+Las dependencias pesadas (LangChain, Azure) se importan solo en el camino que las usa.
 """
 from indexer.workspace_indexer import WorkspaceIndexer
 from model.contextual_model import ContextualModel, safe_print
@@ -14,56 +25,200 @@ from generator.code_generator import CodeGenerator
 # Cache global para reutilizar entre llamadas
 _cached_model = None
 _cached_index = None
+_cached_generator = None
 _last_workspace_path = None
+_cached_indexer = None
+_watcher = None
+_watch_enabled = False  # --serve: el índice se mantiene vivo con el watcher en lugar de recalcularse
+# En --serve varios hilos piden el modelo a la vez: se construye una sola vez
+_cache_lock = threading.RLock()
 
-def get_cached_model(workspace_path):
+def default_workspace_path():
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+def get_cached_model(workspace_path, api_key=None):
     """Obtiene modelo cached o crea uno nuevo si es necesario"""
-    global _cached_model, _cached_index, _last_workspace_path
-    
+    with _cache_lock:
+        return _get_cached_model_locked(workspace_path, api_key)
+
+def _get_cached_model_locked(workspace_path, api_key=None):
+    global _cached_model, _cached_index, _cached_generator, _last_workspace_path, _cached_indexer, _watcher
+
     # Si el workspace cambió, invalidar cache
     if _last_workspace_path != workspace_path:
+        if _watcher is not None:
+            _watcher.stop()
+            _watcher = None
         _cached_model = None
         _cached_index = None
+        _cached_generator = None
+        _cached_indexer = None
         _last_workspace_path = workspace_path
-    
+
     # Si no hay cache, crear nuevo
     if _cached_model is None or _cached_index is None:
-        indexer = WorkspaceIndexer(workspace_path)
-        indexer.index_workspace()
-        _cached_index = indexer.get_index()
-        
-        _cached_model = ContextualModel(_cached_index)
+        _cached_indexer = WorkspaceIndexer(workspace_path)
+        _cached_indexer.index_workspace()
+        _cached_index = _cached_indexer.get_index()
+
+        _cached_model = ContextualModel(_cached_index, api_key=api_key)
         _cached_model.train_on_workspace()
-    
+
+        if _watch_enabled:
+            from indexer.workspace_watcher import WorkspaceWatcher
+            _watcher = WorkspaceWatcher(_cached_indexer).start()
+            safe_print(f"[WATCH] Índice en vivo ({_watcher.mode}): {workspace_path}")
+            if _watcher.mode == 'polling':
+                safe_print("[WATCH] Sin eventos del sistema de archivos: instala watchdog (pip install -r requirements.txt)")
+    elif _cached_indexer.generation != _cached_index.get('generation'):
+        # El watcher aplicó cambios: refrescar lo derivado del índice
+        _cached_index = _cached_indexer.get_index()
+        _cached_model.update_index(_cached_index)
+
     return _cached_model, _cached_index
 
+def get_cached_generator(index):
+    """Reutiliza el CodeGenerator (y su cliente LLM) mientras el índice no cambie"""
+    global _cached_generator
+    with _cache_lock:
+        if _cached_generator is None or _cached_generator.index is not index:
+            _cached_generator = CodeGenerator(index)
+        return _cached_generator
+
+def handle_prompt(prompt, workspace_path, api_key=None):
+    """Resuelve un prompt usando modelo, índice y generador cacheados"""
+    return ''.join(handle_prompt_stream(prompt, workspace_path, api_key))
+
+def handle_prompt_stream(prompt, workspace_path, api_key=None):
+    """Igual que handle_prompt, pero retorna un iterador de fragmentos de la respuesta"""
+    model, index = get_cached_model(workspace_path, api_key)
+
+    # OPTIMIZACIÓN: Respuesta directa sin inicializar generator para prompts simples
+    if prompt.lower().startswith('crear clase'):
+        # Solo para creación de clases cargar el generator
+        generator = get_cached_generator(index)
+        class_name = prompt.split(' ', 2)[-1]
+        framework = index['frameworks'][0] if index['frameworks'] else None
+        return iter([generator.create_class(class_name, framework)])
+    # Para otros prompts, respuesta directa
+    return model.generate_response_stream(prompt)
+
+def load_prompt_dependencies(prompt=''):
+    """Importa lo que necesita resolver `prompt` con IA configurada (usado por --startup-profile)"""
+    import langchain_openai  # ChatOpenAI en ContextualModel
+    import langchain_core.messages  # mensajes de generate_response
+    if prompt.lower().startswith('crear clase'):
+        import langchain.prompts  # PromptTemplate en CodeGenerator
+
+def startup_profile(prompt='', top=15):
+    """Resume `python -X importtime` por paquete raíz para que las regresiones de arranque sean visibles"""
+    import subprocess
+    code = f"import cli; cli.load_prompt_dependencies({prompt!r})"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    per_package = {}
+    total_us = 0
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            errors.append(line)
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # cabecera
+        self_us = int(parts[0])
+        package = parts[2].strip().split('.')[0]
+        per_package[package] = per_package.get(package, 0) + self_us
+        total_us += self_us
+
+    print(f"[STARTUP] Prompt: {prompt!r}")
+    print(f"[STARTUP] Tiempo total de imports: {total_us / 1000:.1f} ms ({len(per_package)} paquetes)")
+    for package, us in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {package:<32} {us / 1000:>9.1f} ms  {100.0 * us / max(total_us, 1):5.1f}%")
+    if result.returncode != 0:
+        print("[STARTUP] El proceso de perfilado falló:")
+        print('\n'.join(errors[-10:]))
+    return per_package
+
+def cache_command(action):
+    """--cache-stats / --cache-clear sin cargar índice ni modelo"""
+    import json
+    from model.response_cache import ResponseCache
+    cache = ResponseCache()
+    if action == '--cache-clear':
+        cache.clear()
+        print(f"[CACHE] Cache de respuestas vaciada: {cache.path}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+
+def serve(api_key=None, workers=None):
+    """Modo residente: mantiene índice, contexto base y cliente HTTP calientes entre solicitudes"""
+    global _watch_enabled
+    from server.daemon import BackendDaemon, DEFAULT_WORKERS
+    _watch_enabled = True
+
+    # stdout queda reservado para el protocolo; los diagnósticos (safe_print) van a stderr
+    protocol_in = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    protocol_out = sys.stdout
+
+    def handler(request):
+        workspace_path = os.path.abspath(request.get('workspace') or default_workspace_path())
+        return handle_prompt_stream(request['prompt'], workspace_path, api_key)
+
+    if workers is None:
+        workers = int(os.getenv('AGENTESTING_WORKERS', DEFAULT_WORKERS))
+    with contextlib.redirect_stdout(sys.stderr):
+        BackendDaemon(handler, protocol_in, protocol_out, max_workers=workers).serve_forever()
+
+def stream(prompt, api_key=None):
+    """Modo --stream: escribe cada fragmento como frame JSON apenas llega (mismos frames que --serve)"""
+    from server.daemon import BackendDaemon
+
+    protocol_out = sys.stdout
+    workspace_path = default_workspace_path()
+
+    def handler(request):
+        return handle_prompt_stream(request['prompt'], workspace_path, api_key)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        BackendDaemon(handler, None, protocol_out).handle_request({'id': None, 'prompt': prompt, 'stream': True})
+
 def main():
+    print("[DIAGNOSTIC] cli.py iniciado. sys.argv:", sys.argv)
     # OPTIMIZACIÓN: Usar cache y inicialización lazy
-    workspace_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    workspace_path = default_workspace_path()
     try:
-        model, index = get_cached_model(workspace_path)
-
         # Recibe el prompt desde la extensión
         if len(sys.argv) > 1:
             prompt = sys.argv[1]
-
-            # OPTIMIZACIÓN: Respuesta directa sin inicializar generator para prompts simples
-            if prompt.lower().startswith('crear clase'):
-                # Solo para creación de clases cargar el generator
-                generator = CodeGenerator(index)
-                class_name = prompt.split(' ', 2)[-1]
-                framework = index['frameworks'][0] if index['frameworks'] else None
-                code = generator.create_class(class_name, framework)
-                safe_print(code)
-            else:
-                # Para otros prompts, respuesta directa
-                response = model.generate_response(prompt)
-                safe_print(response)
+            api_key = sys.argv[2] if len(sys.argv) > 2 else None
+            safe_print(handle_prompt(prompt, workspace_path, api_key))
+        else:
+            get_cached_model(workspace_path)
     except Exception:
         safe_print("[ERROR] Traceback:\n" + traceback.format_exc())
         safe_print(f"[ERROR] sys.argv: {sys.argv}")
         safe_print(f"[ERROR] cwd: {os.getcwd()}")
 
 if __name__ == "__main__":
-    main()
-    print("[DIAGNOSTIC] cli.py iniciado. sys.argv:", sys.argv)
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        args = sys.argv[2:]
+        workers = None
+        if '--workers' in args:
+            position = args.index('--workers')
+            workers = int(args[position + 1])
+            del args[position:position + 2]
+        serve(args[0] if args else None, workers)
+    elif len(sys.argv) > 2 and sys.argv[1] == '--stream':
+        stream(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    elif len(sys.argv) > 1 and sys.argv[1] in ('--cache-stats', '--cache-clear'):
+        cache_command(sys.argv[1])
+    elif len(sys.argv) > 1 and sys.argv[1] == '--startup-profile':
+        startup_profile(sys.argv[2] if len(sys.argv) > 2 else '')
+    else:
+        main()
+        print("[DIAGNOSTIC] cli.py iniciado. sys.argv:", sys.argv)
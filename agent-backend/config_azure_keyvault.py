@@ -3,16 +3,23 @@ config_azure_keyvault.py
 Carga secretos desde Azure Key Vault y los expone como variables de entorno.
 """
 import os
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
 
 # Nombre del Key Vault (debe estar en variable de entorno AZURE_KEYVAULT_NAME)
 KEYVAULT_NAME = os.getenv("AZURE_KEYVAULT_NAME", "AgentestingMIA")
 KVUri = f"https://{KEYVAULT_NAME}.vault.azure.net"
 
-# Inicializa el cliente de Azure Key Vault
-credential = DefaultAzureCredential()
-client = SecretClient(vault_url=KVUri, credential=credential)
+# El cliente de Azure Key Vault se crea solo si algún secreto no está ya en el entorno:
+# importar azure.identity es costoso y no se necesita en la mayoría de ejecuciones.
+_client = None
+
+def _get_client():
+    global _client
+    if _client is None:
+        from azure.identity import DefaultAzureCredential
+        from azure.keyvault.secrets import SecretClient
+        credential = DefaultAzureCredential()
+        _client = SecretClient(vault_url=KVUri, credential=credential)
+    return _client
 
 # Mapeo de nombres de secretos en Key Vault a variables de entorno del agente
 
@@ -32,7 +39,7 @@ def cargar_secretos_keyvault():
             continue
         keyvault_name = secret_name.replace('_', '-').lower()  # Key Vault usa guion medio y minúsculas
         try:
-            secret = client.get_secret(keyvault_name)
+            secret = _get_client().get_secret(keyvault_name)
             os.environ[secret_name] = secret.value
         except Exception as e:
             print(f"[KeyVault] No se pudo cargar el secreto {keyvault_name}: {e}")
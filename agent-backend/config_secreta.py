@@ -5,11 +5,21 @@ Carga y expone credenciales y configuraciones sensibles usando python-dotenv.
 
 import os
 from config_azure_keyvault import cargar_secretos_keyvault
-cargar_secretos_keyvault()
+
+# Los secretos de Key Vault se cargan en la primera consulta de credenciales,
+# no al importar el módulo (evita pagar Azure en arranques que no los usan).
+_secretos_cargados = False
+
+def _asegurar_secretos():
+    global _secretos_cargados
+    if not _secretos_cargados:
+        _secretos_cargados = True
+        cargar_secretos_keyvault()
 
 # Función para obtener credenciales de Jira
 
 def get_jira_credentials():
+    _asegurar_secretos()
     return {
         'user': os.getenv('JIRA_USER'),
         'token': os.getenv('JIRA_TOKEN'),
@@ -20,12 +30,15 @@ def get_jira_credentials():
 
 # LLM (OpenAI, Azure, etc.)
 def get_llm_credentials():
+    _asegurar_secretos()
     return {
-        'api_key': os.getenv('OPENAI_API_KEY')
+        'api_key': os.getenv('OPENAI_API_KEY') or os.getenv('LLM_API_KEY'),
+        'api_url': os.getenv('LLM_API_URL')
     }
 
 # TestRail
 def get_testrail_credentials():
+    _asegurar_secretos()
     return {
         'user': os.getenv('TESTRAIL_USER'),
         'token': os.getenv('TESTRAIL_TOKEN'),
@@ -10,29 +10,31 @@ class EntrenadorAgente:
 
     def analizar_proyecto(self):
         import os
-        import re
+        from analysis.file_reader import FileReader
+        from analysis.java_lexer import extract_symbols
         log_event(f"Analizando y entrenando con el proyecto: {self.ruta_proyecto}", "INFO")
         clases = []
         metodos_test = []
         descripciones = []
+        lector = FileReader()
         for root, dirs, files in os.walk(self.ruta_proyecto):
             for file in files:
                 if file.endswith('.java'):
                     ruta_archivo = os.path.join(root, file)
                     try:
-                        with open(ruta_archivo, 'r', encoding='utf-8', errors='ignore') as f:
-                            contenido = f.read()
-                            # Buscar clases
-                            clases_encontradas = re.findall(r'class\s+(\w+)', contenido)
-                            clases.extend(clases_encontradas)
-                            # Buscar métodos de prueba (anotados con @Test)
-                            metodos = re.findall(r'@Test[\s\S]*?void\s+(\w+)\s*\(', contenido)
-                            metodos_test.extend(metodos)
-                            # Buscar comentarios Javadoc antes de métodos de prueba
-                            comentarios = re.findall(r'/\*\*([\s\S]*?)\*/[\s\n\r]*@Test[\s\S]*?void\s+(\w+)\s*\(', contenido)
-                            for comentario, metodo in comentarios:
-                                descripcion = comentario.replace('*', '').strip().replace('\n', ' ')
-                                descripciones.append({'metodo': metodo, 'descripcion': descripcion})
+                        contenido, motivo = lector.read(ruta_archivo)
+                        if contenido is None:
+                            log_event(f"Archivo omitido ({motivo}): {ruta_archivo}", "WARNING")
+                            continue
+                        # Una pasada del lexer: ignora código comentado y texto dentro de strings
+                        simbolos = extract_symbols(contenido)
+                        # Buscar clases
+                        clases.extend(simbolos.class_names)
+                        # Buscar métodos de prueba (anotados con @Test) y su Javadoc
+                        for metodo in simbolos.methods_annotated('Test'):
+                            metodos_test.append(metodo.name)
+                            if metodo.javadoc:
+                                descripciones.append({'metodo': metodo.name, 'descripcion': metodo.javadoc})
                         log_event(f"Archivo analizado: {ruta_archivo}", "INFO")
                     except Exception as e:
                         log_event(f"No se pudo analizar el archivo {ruta_archivo}: {e}", "ERROR")
@@ -42,7 +44,8 @@ class EntrenadorAgente:
         self.modelo = {
             'clases': clases,
             'metodos_test': metodos_test,
-            'descripciones': descripciones
+            'descripciones': descripciones,
+            'omitidos': lector.skipped
         }
 
     def entrenar(self):
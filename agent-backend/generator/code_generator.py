@@ -3,32 +3,42 @@ code_generator.py
 Genera clases, archivos y casos de prueba usando solo patrones del proyecto actual.
 """
 
-
-from langchain_openai import OpenAI
-from langchain.prompts import PromptTemplate
 import re
 
+from analysis.file_reader import FileReader
+from analysis.java_lexer import extract_symbols
+
 class CodeGenerator:
     def __init__(self, index):
         self.index = index
         self.frameworks = index.get('frameworks', [])
         self.files = index.get('files', [])
-        # Usar la clase actualizada de OpenAI
+        self.skipped_files = []  # [(ruta, motivo)] de la última extracción de patrones
+        # Usar la clase actualizada de OpenAI (import diferido: LangChain es costoso de cargar)
+        from langchain_openai import OpenAI
         self.llm = OpenAI(temperature=0.2)
 
     def extract_patterns(self):
         # Analiza los archivos del proyecto y extrae patrones de clases, métodos y estructuras
         patterns = []
+        reader = FileReader()
         for file_path in self.files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                # Extrae definiciones de clases y métodos (ejemplo para Java/Python)
-                class_matches = re.findall(r'class\s+(\w+)', content)
-                method_matches = re.findall(r'def\s+(\w+)', content)
+                content = reader.read_text(file_path)
+                if content is None:
+                    continue  # binario, minificado o sobre el tope: queda en skipped_files
+                # Extrae definiciones de clases y métodos (Java con el lexer, Python por regex)
+                if file_path.endswith('.java'):
+                    symbols = extract_symbols(content)
+                    class_matches = symbols.class_names
+                    method_matches = [m.name for m in symbols.methods]
+                else:
+                    class_matches = re.findall(r'class\s+(\w+)', content)
+                    method_matches = re.findall(r'def\s+(\w+)', content)
                 patterns.append({'file': file_path, 'classes': class_matches, 'methods': method_matches})
             except Exception:
                 continue
+        self.skipped_files = reader.skipped
         return patterns
 
     def detect_main_framework(self):
@@ -50,6 +60,7 @@ class CodeGenerator:
         return 'Generic'
 
     def create_class(self, class_name, framework=None):
+        from langchain.prompts import PromptTemplate
         # Si no se especifica framework, detecta automáticamente
         if not framework:
             framework = self.detect_main_framework()
@@ -28,87 +28,248 @@ from logger import log_event
 from config import CONFIG
 
 import glob
-def cargar_historias(ruta_carpeta=None):
-    historias = []
-    ruta = ruta_carpeta or CONFIG.get("CARPETA_HISTORIAS", "src/test/resources")
-    patrones = ["*.txt", "*.feature", "*.java", "*.karate", "*.story"]
-    archivos = []
-    for patron in patrones:
-        archivos.extend(glob.glob(os.path.join(ruta, "**", patron), recursive=True))
-    if not archivos:
-        log_event("No se encontraron archivos relevantes en la carpeta.", "WARNING")
-        return historias
-    for archivo in archivos:
+
+EXTENSIONES_HISTORIA = ('.txt', '.feature', '.java', '.karate', '.story')
+# Como en el indexer: salidas de build, dependencias y carpetas ocultas (.git, .idea) no tienen historias
+CARPETAS_OMITIDAS = {'node_modules', '__pycache__', 'target', 'build', 'dist', 'bin'}
+CODIFICACIONES = ('utf-8', 'cp1252', 'latin-1')  # latin-1 decodifica cualquier byte
+
+def _decodificar(datos):
+    for codificacion in CODIFICACIONES:
         try:
-            with open(archivo, 'r', encoding='utf-8') as f:
-                historias.append({'nombre': os.path.relpath(archivo, ruta), 'contenido': f.read()})
+            return datos.decode(codificacion), codificacion
+        except UnicodeDecodeError:
+            continue
+
+def iterar_historias(ruta, max_bytes=None):
+    """
+    Recorre `ruta` una sola vez (os.walk podado, en orden alfabético) y entrega las historias de a
+    una ({'nombre', 'contenido'}) a medida que las lee. Se omiten los binarios y, solo si se indica
+    `max_bytes`, los archivos más grandes que ese tope.
+    """
+    from analysis.file_reader import SNIFF_BYTES, SKIP_BINARY, sniff
+    for raiz, carpetas, archivos in os.walk(ruta):
+        carpetas[:] = sorted(c for c in carpetas if not c.startswith('.') and c not in CARPETAS_OMITIDAS)
+        for nombre in sorted(archivos):
+            if not nombre.endswith(EXTENSIONES_HISTORIA):
+                continue
+            archivo = os.path.join(raiz, nombre)
+            try:
+                if max_bytes and os.path.getsize(archivo) > max_bytes:
+                    log_event(f"Archivo omitido por tamaño (> {max_bytes} bytes): {archivo}", "WARNING")
+                    continue
+                with open(archivo, 'rb') as f:
+                    datos = f.read()
+            except OSError as e:
+                log_event(f"No se pudo leer el archivo {archivo}: {e}", "ERROR")
+                continue
+            # Solo la regla de binarios: una historia escrita en un único párrafo largo no es "minificada"
+            if sniff(datos[:SNIFF_BYTES]) == SKIP_BINARY:
+                log_event(f"Archivo omitido (binario): {archivo}", "WARNING")
+                continue
+            contenido, codificacion = _decodificar(datos)
+            if codificacion != 'utf-8':
+                log_event(f"Archivo leído como {codificacion}: {archivo}", "WARNING")
             log_event(f"Archivo relevante cargado: {archivo}", "INFO")
-        except Exception as e:
-            log_event(f"No se pudo leer el archivo {archivo}: {e}", "ERROR")
-    return historias
+            yield {'nombre': os.path.relpath(archivo, ruta), 'contenido': contenido}
+
+def _avisar_si_vacio(historias, mensaje):
+    vacio = True
+    for historia in historias:
+        vacio = False
+        yield historia
+    if vacio:
+        log_event(mensaje, "WARNING")
 
-def generar_artefactos_para_historias(ruta_carpeta=None, ruta_salida=None, llm=None, historia_caso=None, ruta_workspace=None):
+def cargar_historias(ruta_carpeta=None, max_bytes=None):
+    ruta = ruta_carpeta or CONFIG.get("CARPETA_HISTORIAS", "src/test/resources")
+    return list(_avisar_si_vacio(iterar_historias(ruta, max_bytes),
+                                 "No se encontraron archivos relevantes en la carpeta."))
+
+def items_desde_features(ruta_salida=None):
+    """Features generados en la carpeta de salida como ítems de exportación (Jira/TestRail)"""
+    salida = ruta_salida or CONFIG.get("CARPETA_SALIDA", "src/test/generated")
+    items = []
+    for archivo in sorted(glob.glob(os.path.join(salida, "**", "*.feature"), recursive=True)):
+        with open(archivo, 'r', encoding='utf-8') as f:
+            contenido = f.read()
+        titulo = next((linea.split(':', 1)[1].strip() for linea in contenido.splitlines()
+                       if linea.strip().startswith('Feature:')), '')
+        nombre = os.path.relpath(archivo, salida)
+        items.append({'id': nombre, 'resumen': titulo or nombre, 'descripcion': contenido})
+    return items
+
+# Llamadas simultáneas al LLM: su latencia domina el tiempo total y las historias son independientes
+LLM_CONCURRENCIA = int(os.getenv('AGENTESTING_LLM_CONCURRENCIA', '4'))
+COLA_PIPELINE = 8  # capacidad de cada cola entre etapas
+_FIN = object()
+
+def generar_artefactos_para_historias(ruta_carpeta=None, ruta_salida=None, llm=None, historia_caso=None, ruta_workspace=None,
+                                      concurrencia_llm=None):
     salida = ruta_salida or CONFIG.get("CARPETA_SALIDA", "src/test/generated")
     historias = []
     # Workspace global
     if ruta_workspace:
-        import glob
-        patrones = ["*.txt", "*.feature", "*.java", "*.karate", "*.story"]
-        archivos = []
-        for patron in patrones:
-            archivos.extend(glob.glob(os.path.join(ruta_workspace, "**", patron), recursive=True))
-        if not archivos:
-            log_event("No se encontraron archivos relevantes en el workspace.", "WARNING")
-        for archivo in archivos:
-            try:
-                with open(archivo, 'r', encoding='utf-8') as f:
-                    historias.append({'nombre': os.path.relpath(archivo, ruta_workspace), 'contenido': f.read()})
-                log_event(f"Archivo relevante cargado: {archivo}", "INFO")
-            except Exception as e:
-                log_event(f"No se pudo leer el archivo {archivo}: {e}", "ERROR")
+        historias = _avisar_si_vacio(iterar_historias(ruta_workspace),
+                                     "No se encontraron archivos relevantes en el workspace.")
     # Carpeta tradicional
     elif ruta_carpeta:
-        historias = cargar_historias(ruta_carpeta)
+        historias = _avisar_si_vacio(iterar_historias(ruta_carpeta),
+                                     "No se encontraron archivos relevantes en la carpeta.")
     # Caso individual
     elif historia_caso:
         historias = [historia_caso]
-    # Procesar historias
-    for historia in historias:
-        conocimiento = {
-            'descripciones': [{'metodo': historia['nombre'], 'descripcion': historia['contenido']}],
-            'metodos_test': [historia['nombre']]
-        }
-        generador = GeneradorCucumber(conocimiento)
-        features = generador.generar_feature(historia['nombre'])
-        steps = generador.generar_step_definitions(historia['nombre'])
-        # Enriquecer con LLM (OpenAI)
-        if llm:
-            try:
-                respuesta_llm = llm.analizar_historia(historia['contenido'])
-                if respuesta_llm:
-                    print(f"ARCHIVO: {historia['nombre']}_llm.txt\nCONTENIDO:\n{respuesta_llm}\n")
-                    nombre_base = historia['nombre']
-                    with open(os.path.join(salida, f"{nombre_base}_llm.txt"), 'w', encoding='utf-8') as f:
-                        f.write(respuesta_llm)
-                    log_event(f"Archivo enriquecido por LLM generado: {nombre_base}_llm.txt", "INFO")
-            except Exception as e:
-                log_event(f"No se pudo enriquecer la historia con LLM: {e}", "ERROR")
-        # Guardar archivos generados y mostrar en formato estándar
+    concurrencia = max(1, concurrencia_llm or LLM_CONCURRENCIA) if llm else 1
+    _procesar_en_pipeline(historias, salida, llm, concurrencia)
+
+def _procesar_en_pipeline(historias, salida, llm, concurrencia):
+    """
+    Etapas carga -> render -> LLM -> escritura unidas por colas acotadas. El LLM corre en
+    `concurrencia` hilos; la escritura (hilo llamador) reordena por número de historia, así la
+    salida y los archivos quedan en el mismo orden que en un procesamiento secuencial. El semáforo
+    limita las historias en vuelo: si una llamada al LLM se demora, la carga se detiene en vez de
+    acumular resultados en memoria. Si una etapa falla, las demás descartan lo pendiente, todas
+    terminan y la excepción se relanza en el hilo llamador.
+    """
+    import queue
+    import threading
+
+    cola_render = queue.Queue(COLA_PIPELINE)
+    cola_llm = queue.Queue(COLA_PIPELINE)
+    cola_escritura = queue.Queue(COLA_PIPELINE)
+    en_vuelo = threading.BoundedSemaphore(2 * COLA_PIPELINE + concurrencia)
+    detenido = threading.Event()
+    errores = []
+
+    def fallar(error):
+        errores.append(error)
+        detenido.set()
+
+    # Cada historia toma un lugar del semáforo al cargarse y lo libera al escribirse o descartarse
+    def cargar():
+        try:
+            for numero, historia in enumerate(historias):
+                en_vuelo.acquire()
+                if detenido.is_set():
+                    en_vuelo.release()
+                    break
+                cola_render.put((numero, historia))
+        except Exception as e:
+            fallar(e)
+        finally:
+            cola_render.put(_FIN)
+
+    def renderizar():
         try:
-            for idx, feature in enumerate(features):
-                nombre_feature = f"{historia['nombre'].replace('.txt','').replace('.feature','')}_gen{idx+1}.feature"
-                print(f"ARCHIVO: {nombre_feature}\nCONTENIDO:\n{feature}\n")
-                with open(os.path.join(salida, nombre_feature), 'w', encoding='utf-8') as f:
-                    f.write(feature + '\n')
-            log_event(f"Archivo feature generado: {nombre_feature}", "INFO")
+            while True:
+                trabajo = cola_render.get()
+                if trabajo is _FIN:
+                    break
+                if detenido.is_set():
+                    en_vuelo.release()
+                    continue
+                try:
+                    cola_llm.put(_renderizar(*trabajo))
+                except Exception as e:
+                    fallar(e)
+                    en_vuelo.release()
+        finally:
+            for _ in range(concurrencia):
+                cola_llm.put(_FIN)
+
+    def enriquecer():
+        try:
+            while True:
+                trabajo = cola_llm.get()
+                if trabajo is _FIN:
+                    break
+                if detenido.is_set():
+                    en_vuelo.release()
+                    continue
+                if llm:
+                    trabajo['llm'] = _enriquecer_con_llm(llm, trabajo['historia'])
+                cola_escritura.put(trabajo)
         except Exception as e:
-            log_event(f"No se pudo generar el archivo feature para {historia['nombre']}: {e}", "ERROR")
+            fallar(e)
+        finally:
+            cola_escritura.put(_FIN)
+
+    hilos = [threading.Thread(target=cargar, daemon=True), threading.Thread(target=renderizar, daemon=True)]
+    hilos += [threading.Thread(target=enriquecer, daemon=True) for _ in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+
+    pendientes = {}
+    siguiente = 0
+    terminados = 0
+    while terminados < concurrencia:
+        trabajo = cola_escritura.get()
+        if trabajo is _FIN:
+            terminados += 1
+            continue
+        pendientes[trabajo['numero']] = trabajo
+        while siguiente in pendientes and not detenido.is_set():
+            try:
+                _escribir_artefactos(pendientes.pop(siguiente), salida)
+            except Exception as e:
+                fallar(e)
+            en_vuelo.release()
+            siguiente += 1
+        if detenido.is_set():
+            for _ in pendientes:
+                en_vuelo.release()
+            pendientes.clear()
+    for hilo in hilos:
+        hilo.join()
+    if errores:
+        raise errores[0]
+
+def _renderizar(numero, historia):
+    conocimiento = {
+        'descripciones': [{'metodo': historia['nombre'], 'descripcion': historia['contenido']}],
+        'metodos_test': [historia['nombre']]
+    }
+    generador = GeneradorCucumber(conocimiento)
+    return {'numero': numero, 'historia': historia, 'llm': None,
+            'features': generador.generar_feature(historia['nombre']),
+            'steps': generador.generar_step_definitions(historia['nombre'])}
+
+def _enriquecer_con_llm(llm, historia):
+    # Enriquecer con LLM (OpenAI)
+    try:
+        return llm.analizar_historia(historia['contenido'])
+    except Exception as e:
+        log_event(f"No se pudo enriquecer la historia con LLM: {e}", "ERROR")
+        return None
+
+def _escribir_artefactos(trabajo, salida):
+    historia = trabajo['historia']
+    respuesta_llm = trabajo['llm']
+    if respuesta_llm:
         try:
-            for idx, step in enumerate(steps):
-                nombre_step = f"{historia['nombre'].replace('.txt','').replace('.feature','')}_gen{idx+1}_steps.java"
-                print(f"ARCHIVO: {nombre_step}\nCONTENIDO:\n{step}\n")
-                with open(os.path.join(salida, nombre_step), 'w', encoding='utf-8') as f:
-                    f.write(step + '\n')
-            log_event(f"Archivo steps generado: {nombre_step}", "INFO")
+            print(f"ARCHIVO: {historia['nombre']}_llm.txt\nCONTENIDO:\n{respuesta_llm}\n")
+            nombre_base = historia['nombre']
+            with open(os.path.join(salida, f"{nombre_base}_llm.txt"), 'w', encoding='utf-8') as f:
+                f.write(respuesta_llm)
+            log_event(f"Archivo enriquecido por LLM generado: {nombre_base}_llm.txt", "INFO")
         except Exception as e:
-            log_event(f"No se pudo generar el archivo steps para {historia['nombre']}: {e}", "ERROR")
+            log_event(f"No se pudo enriquecer la historia con LLM: {e}", "ERROR")
+    # Guardar archivos generados y mostrar en formato estándar
+    try:
+        for idx, feature in enumerate(trabajo['features']):
+            nombre_feature = f"{historia['nombre'].replace('.txt','').replace('.feature','')}_gen{idx+1}.feature"
+            print(f"ARCHIVO: {nombre_feature}\nCONTENIDO:\n{feature}\n")
+            with open(os.path.join(salida, nombre_feature), 'w', encoding='utf-8') as f:
+                f.write(feature + '\n')
+        log_event(f"Archivo feature generado: {nombre_feature}", "INFO")
+    except Exception as e:
+        log_event(f"No se pudo generar el archivo feature para {historia['nombre']}: {e}", "ERROR")
+    try:
+        for idx, step in enumerate(trabajo['steps']):
+            nombre_step = f"{historia['nombre'].replace('.txt','').replace('.feature','')}_gen{idx+1}_steps.java"
+            print(f"ARCHIVO: {nombre_step}\nCONTENIDO:\n{step}\n")
+            with open(os.path.join(salida, nombre_step), 'w', encoding='utf-8') as f:
+                f.write(step + '\n')
+        log_event(f"Archivo steps generado: {nombre_step}", "INFO")
+    except Exception as e:
+        log_event(f"No se pudo generar el archivo steps para {historia['nombre']}: {e}", "ERROR")
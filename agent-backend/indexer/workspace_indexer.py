@@ -1,13 +1,26 @@
 """
 workspace_indexer.py
 Indexa y analiza el workspace para detectar frameworks, clases y archivos relevantes.
-OPTIMIZADO: Cache, filtros inteligentes y indexación incremental.
+OPTIMIZADO: Cache, filtros inteligentes y indexación incremental (árbol de huellas por directorio).
 """
 import os
 import fnmatch
 import json
 import hashlib
-from pathlib import Path
+import threading
+import time
+
+from analysis.file_reader import FileReader
+from analysis.indicators import FRAMEWORK_INDICATORS
+
+CACHE_VERSION = 2
+SKIP_DIRS = {'node_modules', '__pycache__', 'target', 'build', 'dist', 'bin'}
+# Patrones de archivos relevantes para testing
+TEST_PATTERNS = ['*.java', '*.py', '*.feature', '*.js', '*.ts', '*.cs', '*.rb']
+# Un directorio modificado tan cerca del momento del escaneo puede volver a cambiar sin que
+# su mtime se mueva (granularidad del sistema de archivos): se reescanea en la próxima validación
+RACY_WINDOW_NS = 2 * 1000 ** 3
+FRAMEWORK_SAMPLE_SIZE = 20
 
 class WorkspaceIndexer:
     def __init__(self, root_path):
@@ -15,86 +28,233 @@ class WorkspaceIndexer:
         self.files = []
         self.frameworks = set()
         self.cache_file = os.path.join(root_path, '.agentesting_cache.json')
-        
+        # Árbol de huellas por directorio (ruta relativa -> entrada), persistido en la cache
+        self.dirs = {}
+        self.last_refresh = {'dirs_reused': 0, 'dirs_rescanned': 0, 'frameworks_detected': False}
+        self._framework_sample_cache = None
+        # Se incrementa cada vez que cambian files/frameworks (modo watch): las caches derivadas
+        # (contexto base, recuperación) comparan este número para saber cuándo recalcularse
+        self.generation = 0
+        self._lock = threading.RLock()
+
     def _get_workspace_hash(self):
-        """Genera hash del workspace para detectar cambios"""
-        relevant_files = []
-        try:
-            for dirpath, _, filenames in os.walk(self.root_path):
-                # Skip directorios innecesarios para velocidad
-                if any(skip in dirpath for skip in ['.git', 'node_modules', '.vscode', '__pycache__', 'target', 'build']):
-                    continue
-                    
-                for filename in filenames:
-                    if any(filename.endswith(ext) for ext in ['.java', '.py', '.feature', '.js', '.ts', '.cs']):
-                        file_path = os.path.join(dirpath, filename)
-                        try:
-                            stat = os.stat(file_path)
-                            relevant_files.append(f"{file_path}:{stat.st_mtime}")
-                        except:
-                            continue
-            
-            workspace_signature = ''.join(sorted(relevant_files))
-            return hashlib.md5(workspace_signature.encode()).hexdigest()
-        except:
-            return None
+        """Huella del workspace: hash Merkle del directorio raíz (sin recorrer el árbol de nuevo)"""
+        root = self.dirs.get('')
+        return root['hash'] if root else None
 
     def _load_cache(self):
-        """Carga cache si existe y es válido"""
+        """Carga la cache (versión actual); None si no existe o es de otro formato"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                current_hash = self._get_workspace_hash()
-                if cache_data.get('workspace_hash') == current_hash:
-                    self.files = cache_data.get('files', [])
-                    self.frameworks = set(cache_data.get('frameworks', []))
-                    return True
-        except:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+            if cache_data.get('version') == CACHE_VERSION:
+                return cache_data
+        except (OSError, ValueError):
             pass
-        return False
+        return None
 
-    def _save_cache(self):
+    def _save_cache(self, framework_sample):
         """Guarda cache del workspace"""
         try:
             cache_data = {
+                'version': CACHE_VERSION,
                 'workspace_hash': self._get_workspace_hash(),
+                'dirs': self.dirs,
                 'files': self.files,
-                'frameworks': list(self.frameworks)
+                'frameworks': sorted(self.frameworks),
+                'framework_sample': framework_sample
             }
+            # Se sobrescribe en el lugar: crear/renombrar archivos cambiaría el mtime de la raíz
+            # y la invalidaría en cada validación (un JSON truncado simplemente se reconstruye)
             with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
-        except:
+                json.dump(cache_data, f, separators=(',', ':'))
+        except OSError:
             pass
 
+    def _scan_dir(self, rel_path, full_path, mtime_ns, scanned_at_ns):
+        """Lista un directorio: archivos relevantes y subdirectorios a recorrer"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip directorios innecesarios para mejorar velocidad
+                            if not entry.name.startswith('.') and entry.name not in SKIP_DIRS:
+                                subdirs.append(entry.name)
+                        elif any(fnmatch.fnmatch(entry.name, pattern) for pattern in TEST_PATTERNS):
+                            # Solo incluir archivos que probablemente sean de testing
+                            if self._is_test_related(entry.path, entry.name):
+                                files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return {
+            'mtime_ns': mtime_ns,
+            'racy': mtime_ns >= scanned_at_ns - RACY_WINDOW_NS,
+            'files': sorted(files),
+            'subdirs': sorted(subdirs)
+        }
+
+    def _refresh_tree(self, previous_dirs):
+        """
+        Recorre el árbol reutilizando los directorios cuyo mtime no cambió: agregar, borrar o
+        renombrar archivos cambia el mtime del directorio que los contiene, así que solo esos se listan.
+        """
+        self.last_refresh['dirs_reused'] = self.last_refresh['dirs_rescanned'] = 0
+        self.dirs = self._walk('', previous_dirs)
+        self._rebuild()
+
+    def _walk(self, start, previous_dirs, force=()):
+        """Recorre el subárbol `start` (ruta relativa); los directorios en `force` siempre se listan"""
+        scanned_at_ns = time.time_ns()
+        dirs = {}
+        stack = [start]
+        while stack:
+            rel_path = stack.pop()
+            full_path = os.path.join(self.root_path, rel_path) if rel_path else self.root_path
+            try:
+                mtime_ns = os.stat(full_path).st_mtime_ns
+            except OSError:
+                continue
+            entry = previous_dirs.get(rel_path)
+            if entry and entry['mtime_ns'] == mtime_ns and not entry.get('racy') and rel_path not in force:
+                self.last_refresh['dirs_reused'] += 1
+            else:
+                entry = self._scan_dir(rel_path, full_path, mtime_ns, scanned_at_ns)
+                self.last_refresh['dirs_rescanned'] += 1
+            dirs[rel_path] = entry
+            for name in entry['subdirs']:
+                stack.append(os.path.join(rel_path, name) if rel_path else name)
+        return dirs
+
+    def _ordered_dirs(self):
+        """Directorios en preorden con subdirectorios alfabéticos (orden determinista de self.files)"""
+        order = []
+        stack = ['']
+        while stack:
+            rel_path = stack.pop()
+            entry = self.dirs.get(rel_path)
+            if entry is None:
+                continue
+            order.append(rel_path)
+            for name in reversed(entry['subdirs']):
+                stack.append(os.path.join(rel_path, name) if rel_path else name)
+        return order
+
+    def _rebuild(self):
+        """Recalcula huellas Merkle y la lista de archivos a partir de self.dirs (sin E/S)"""
+        order = self._ordered_dirs()
+        # Huellas de abajo hacia arriba: hash(archivos del directorio + huellas de los hijos)
+        for rel_path in reversed(order):
+            entry = self.dirs[rel_path]
+            children = []
+            for name in entry['subdirs']:
+                child = self.dirs.get(os.path.join(rel_path, name) if rel_path else name)
+                if child:
+                    children.append(f"{name}={child['hash']}")
+            signature = '\0'.join(entry['files']) + '\1' + '\0'.join(children)
+            entry['hash'] = hashlib.md5(signature.encode('utf-8')).hexdigest()
+
+        self.files = [
+            os.path.join(self.root_path, rel_path, name) if rel_path else os.path.join(self.root_path, name)
+            for rel_path in order for name in self.dirs[rel_path]['files']
+        ]
+
+    def _framework_sample(self):
+        """Identidad (mtime, tamaño) de los archivos que lee detect_frameworks"""
+        sample = {}
+        for file_path in self.files[:FRAMEWORK_SAMPLE_SIZE]:
+            try:
+                stat = os.stat(file_path)
+                sample[file_path] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                sample[file_path] = None
+        return sample
+
+    def _refresh_frameworks(self, previous_sample, previous_frameworks):
+        """Frameworks: solo se vuelven a detectar si cambiaron los archivos de la muestra"""
+        framework_sample = self._framework_sample()
+        if previous_sample == framework_sample:
+            self.frameworks = set(previous_frameworks)
+            self.last_refresh['frameworks_detected'] = False
+        else:
+            self.frameworks = set()
+            self.detect_frameworks()
+            self.last_refresh['frameworks_detected'] = True
+        self._framework_sample_cache = framework_sample
+        return framework_sample
+
     def index_workspace(self):
-        """Indexa workspace con cache inteligente"""
-        # Intenta cargar desde cache
-        if self._load_cache():
-            return
-        
-        # Si no hay cache válido, indexa desde cero
-        self.files = []
-        self.frameworks = set()
-        
-        # Patrones de archivos relevantes para testing
-        test_patterns = ['*.java', '*.py', '*.feature', '*.js', '*.ts', '*.cs', '*.rb']
-        
-        for dirpath, dirnames, filenames in os.walk(self.root_path):
-            # Skip directorios innecesarios para mejorar velocidad
-            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in 
-                          ['node_modules', '__pycache__', 'target', 'build', 'dist', 'bin']]
-            
-            for filename in filenames:
-                if any(fnmatch.fnmatch(filename, pattern) for pattern in test_patterns):
-                    full_path = os.path.join(dirpath, filename)
-                    # Solo incluir archivos que probablemente sean de testing
-                    if self._is_test_related(full_path, filename):
-                        self.files.append(full_path)
-        
-        self.detect_frameworks()
-        self._save_cache()
+        """Indexa workspace con cache incremental por directorio"""
+        with self._lock:
+            cache_data = self._load_cache() or {}
+            self._refresh_tree(cache_data.get('dirs', {}))
+            framework_sample = self._refresh_frameworks(
+                cache_data.get('framework_sample'), cache_data.get('frameworks', [])
+            )
+            # Una sola escritura, y solo si algo cambió
+            if (cache_data.get('dirs') != self.dirs or cache_data.get('files') != self.files
+                    or self.last_refresh['frameworks_detected']):
+                self._save_cache(framework_sample)
+
+    def refresh(self, changed_paths=None):
+        """
+        Actualiza el índice en memoria. Sin `changed_paths` revalida todo el árbol por mtime
+        (fallback por sondeo); con rutas, solo relista los directorios afectados.
+        Retorna True si cambiaron archivos o frameworks (y en ese caso incrementa `generation`).
+        """
+        with self._lock:
+            previous_files = self.files
+            previous_frameworks = set(self.frameworks)
+            self.last_refresh['dirs_reused'] = self.last_refresh['dirs_rescanned'] = 0
+            if changed_paths is None:
+                self.dirs = self._walk('', self.dirs)
+            else:
+                for rel_path in self._affected_dirs(changed_paths):
+                    # Reemplaza el subárbol: lo que ya no existe desaparece, lo nuevo se recorre
+                    prefix = rel_path + os.sep if rel_path else ''
+                    subtree = {k: v for k, v in self.dirs.items() if k == rel_path or k.startswith(prefix)}
+                    for key in subtree:
+                        del self.dirs[key]
+                    self.dirs.update(self._walk(rel_path, subtree, force={rel_path}))
+            self._rebuild()
+
+            # Un archivo de la muestra modificado cambia su (mtime, tamaño) y fuerza la detección
+            framework_sample = self._refresh_frameworks(self._framework_sample_cache, previous_frameworks)
+            changed = self.files != previous_files or self.frameworks != previous_frameworks
+            if changed:
+                self.generation += 1
+            if changed or self.last_refresh['dirs_rescanned']:
+                self._save_cache(framework_sample)
+            return changed
+
+    def _affected_dirs(self, changed_paths):
+        """Directorios indexados a relistar para un conjunto de rutas creadas/modificadas/borradas"""
+        affected = set()
+        root = os.path.abspath(self.root_path)
+        for path in changed_paths:
+            rel_path = os.path.relpath(os.path.abspath(path), root)
+            if rel_path == os.curdir:
+                rel_path = ''
+            if rel_path.startswith(os.pardir):
+                continue  # fuera del workspace
+            parts = rel_path.split(os.sep) if rel_path else []
+            if any(part.startswith('.') or part in SKIP_DIRS for part in parts):
+                continue  # .git, node_modules, target... (mvn clean, git checkout)
+            # El directorio que contiene el cambio; si aún no está indexado, el ancestro más cercano que sí
+            rel_path = os.sep.join(parts[:-1])
+            while rel_path not in self.dirs and rel_path:
+                rel_path = os.path.dirname(rel_path)
+            if rel_path in self.dirs or not rel_path:
+                affected.add(rel_path)
+        # Si un ancestro se relista, sus descendientes ya quedan cubiertos
+        return sorted(
+            a for a in affected
+            if not any(a != b and (b == '' or a.startswith(b + os.sep)) for b in affected)
+        )
 
     def _is_test_related(self, file_path, filename):
         """Determina si un archivo es relevante para testing"""
@@ -122,48 +282,31 @@ class WorkspaceIndexer:
 
     def detect_frameworks(self):
         """Detecta frameworks de testing basado en archivos y contenido"""
-        framework_indicators = {
-            'Cucumber': ['.feature'],
-            'Selenium': ['webdriver', 'selenium'],
-            'Pytest': ['pytest', 'test_'],
-            'JUnit': ['junit', '@Test'],
-            'TestNG': ['testng', '@Test'],
-            'Playwright': ['playwright'],
-            'Cypress': ['cypress'],
-            'Robot Framework': ['.robot'],
-            'Jest': ['jest', '.spec.js', '.test.js'],
-            'Mocha': ['mocha', 'describe('],
-        }
-        
-        for file_path in self.files[:20]:  # Solo revisar primeros 20 archivos para velocidad
+        reader = FileReader(max_bytes=50000)
+        for file_path in self.files[:FRAMEWORK_SAMPLE_SIZE]:  # Solo revisar primeros archivos para velocidad
             try:
                 filename = os.path.basename(file_path).lower()
                 
                 # Detectar por extensión/nombre
-                for framework, indicators in framework_indicators.items():
-                    if any(indicator in filename for indicator in indicators):
-                        self.frameworks.add(framework)
-                        continue
+                self.frameworks.update(FRAMEWORK_INDICATORS.scan(filename, lowered=True).found())
                 
-                # Para archivos Java/Python, revisar contenido brevemente
-                if file_path.endswith(('.java', '.py')) and os.path.getsize(file_path) < 50000:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content_sample = f.read(2000)  # Solo primeros 2KB
-                        content_lower = content_sample.lower()
-                        
-                        for framework, indicators in framework_indicators.items():
-                            if any(indicator in content_lower for indicator in indicators):
-                                self.frameworks.add(framework)
+                # Para archivos Java/Python, revisar contenido brevemente (un escaneo para todos los frameworks)
+                if file_path.endswith(('.java', '.py')):
+                    content_sample = reader.read_head(file_path, 2000)  # Solo primeros 2KB, sin binarios
+                    if content_sample:
+                        self.frameworks.update(FRAMEWORK_INDICATORS.scan(content_sample).found())
                                 
             except:
                 continue
 
     def get_index(self):
-        return {
-            'files': self.files[:50],  # Limitar archivos para mejor rendimiento
-            'frameworks': list(self.frameworks),
-            'total_files': len(self.files)
-        }
+        with self._lock:
+            return {
+                'files': self.files[:50],  # Limitar archivos para mejor rendimiento
+                'frameworks': list(self.frameworks),
+                'total_files': len(self.files),
+                'generation': self.generation
+            }
 
 # Uso:
 # indexer = WorkspaceIndexer(root_path)
@@ -0,0 +1,130 @@
+"""
+workspace_watcher.py
+Modo watch del índice: aplica creaciones/modificaciones/borrados de archivos al WorkspaceIndexer
+en memoria, sin recalcular el índice en cada prompt.
+
+Usa watchdog (inotify en Linux, FSEvents en macOS, ReadDirectoryChangesW en Windows) si está
+instalado; si no, revalida periódicamente el árbol de huellas por mtime de directorio.
+Las ráfagas (cambio de rama, mvn clean) se agrupan: se aplican cuando pasan `debounce`
+segundos sin eventos nuevos (o como máximo `max_delay` segundos después del primero).
+"""
+import threading
+import time
+
+# Con más rutas que esto en una ráfaga es más barato revalidar todo el árbol por mtime
+FULL_REFRESH_THRESHOLD = 500
+
+
+class WorkspaceWatcher:
+    def __init__(self, indexer, debounce=0.5, max_delay=5.0, poll_interval=2.0, on_change=None,
+                 use_watchdog=True):
+        self.indexer = indexer
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.on_change = on_change  # on_change(generation) tras aplicar cambios
+        self.use_watchdog = use_watchdog
+        self.mode = None            # 'watchdog' | 'polling'
+        self._pending = set()
+        self._first_event = None
+        self._last_event = None
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def start(self):
+        """Arranca el observador (o el sondeo) y el hilo que aplica los lotes de eventos"""
+        if self.use_watchdog and self._start_watchdog():
+            self.mode = 'watchdog'
+            target = self._apply_loop
+        else:
+            self.mode = 'polling'
+            target = self._poll_loop
+        self._thread = threading.Thread(target=target, name='agentesting-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _start_watchdog(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = [event.src_path, getattr(event, 'dest_path', None)]
+                watcher.notify([p for p in paths if p])
+
+        try:
+            self._observer = Observer()
+            self._observer.schedule(_Handler(), self.indexer.root_path, recursive=True)
+            self._observer.start()
+        except Exception:
+            self._observer = None
+            return False
+        return True
+
+    def notify(self, paths):
+        """Registra rutas cambiadas; se aplican al terminar la ráfaga"""
+        now = time.monotonic()
+        with self._condition:
+            if not self._pending:
+                self._first_event = now
+            self._pending.update(paths)
+            self._last_event = now
+            self._condition.notify_all()
+
+    def _next_batch(self):
+        """Espera a que la ráfaga se calme y retorna las rutas acumuladas (None al detenerse)"""
+        with self._condition:
+            while not self._stopped.is_set():
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                quiet_until = self._last_event + self.debounce
+                deadline = self._first_event + self.max_delay
+                if now >= quiet_until or now >= deadline:
+                    batch, self._pending = self._pending, set()
+                    return batch
+                self._condition.wait(min(quiet_until, deadline) - now)
+        return None
+
+    def _apply_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._apply(None if len(batch) > FULL_REFRESH_THRESHOLD else batch)
+
+    def _poll_loop(self):
+        while not self._stopped.wait(self.poll_interval):
+            self._apply(None)
+
+    def _apply(self, paths):
+        try:
+            changed = self.indexer.refresh(paths)
+        except Exception as e:
+            print(f"[WATCH] Error actualizando el índice: {e}")
+            return
+        if changed and self.on_change is not None:
+            self.on_change(self.indexer.generation)
+
+# Uso:
+# indexer = WorkspaceIndexer(root); indexer.index_workspace()
+# watcher = WorkspaceWatcher(indexer, on_change=lambda generation: ...).start()
+# indexer.get_index()['generation']  -> aumenta con cada cambio aplicado
@@ -1,23 +1,29 @@
 """
 integracion_jira.py
 Ejemplo de integración para exportar features a Jira usando credenciales seguras.
+Incluye exportación masiva por lotes (/rest/api/2/issue/bulk) con checkpoint reanudable.
 """
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from logger import log_event
 from config_secreta import get_jira_credentials
+from transporte_http import get_transporte
+from checkpoint_exportacion import CheckpointExportacion, id_item, ruta_checkpoint
+
+BULK_CHUNK_SIZE = int(os.getenv('AGENTESTING_JIRA_CHUNK', '50'))  # Jira acepta hasta 50 issues por llamada
+BULK_PARALELO = int(os.getenv('AGENTESTING_JIRA_PARALELO', '4'))
 
 class JiraExporter:
-    def __init__(self):
+    def __init__(self, transporte=None):
         creds = get_jira_credentials()
         self.url = creds['url']
         self.usuario = creds['user']
         self.token = creds['token']
+        self.http = transporte or get_transporte()
 
-    def exportar_feature(self, proyecto, resumen, descripcion):
-        endpoint = f"{self.url}/rest/api/2/issue"
-        headers = {"Content-Type": "application/json"}
-        auth = (self.usuario, self.token)
-        data = {
+    def _campos(self, proyecto, resumen, descripcion):
+        return {
             "fields": {
                 "project": {"key": proyecto},
                 "summary": resumen,
@@ -25,8 +31,14 @@ class JiraExporter:
                 "issuetype": {"name": "Test"}
             }
         }
+
+    def exportar_feature(self, proyecto, resumen, descripcion):
+        endpoint = f"{self.url}/rest/api/2/issue"
+        headers = {"Content-Type": "application/json"}
+        auth = (self.usuario, self.token)
+        data = self._campos(proyecto, resumen, descripcion)
         try:
-            response = requests.post(endpoint, json=data, headers=headers, auth=auth)
+            response = self.http.post(endpoint, json=data, headers=headers, auth=auth, endpoint='jira.issue')
             if response.status_code == 201:
                 log_event(f"Feature exportado a Jira: {resumen}", "INFO")
                 return response.json()
@@ -35,3 +47,86 @@ class JiraExporter:
         except Exception as e:
             log_event(f"Excepción al exportar a Jira: {e}", "ERROR")
         return None
+
+    def exportar_features(self, proyecto, items, chunk_size=BULK_CHUNK_SIZE, paralelo=BULK_PARALELO,
+                          checkpoint=None):
+        """
+        Exportación masiva: items = [{'resumen', 'descripcion', 'id' (opcional)}]. Crea los issues
+        con el endpoint bulk en lotes de `chunk_size`, hasta `paralelo` lotes a la vez. Retorna un
+        resultado por ítem, en el mismo orden: {'id', 'resumen', 'estado': 'creado' | 'omitido' |
+        'error', 'key', 'error'}. El checkpoint (ruta o CheckpointExportacion; por defecto
+        .jira_checkpoint.json en la carpeta de salida) hace que una nueva corrida omita los ítems
+        ya exportados.
+        """
+        if checkpoint is None:
+            checkpoint = ruta_checkpoint('jira')
+        if not isinstance(checkpoint, CheckpointExportacion):
+            checkpoint = CheckpointExportacion(checkpoint)
+        resultados = []
+        pendientes = []
+        for item in items:
+            item_id = item.get('id') or id_item(proyecto, item['resumen'], item['descripcion'])
+            resultado = {'id': item_id, 'resumen': item['resumen'], 'estado': None, 'key': None, 'error': None}
+            clave = checkpoint.remoto(item_id)
+            if clave is not None:
+                resultado.update(estado='omitido', key=clave)
+            else:
+                pendientes.append((resultado, item))
+            resultados.append(resultado)
+
+        def exportar(lote):
+            # El checkpoint se guarda al terminar cada lote, sin esperar a los lotes anteriores
+            checkpoint.registrar(self._exportar_lote(proyecto, lote))
+
+        lotes = [pendientes[i:i + chunk_size] for i in range(0, len(pendientes), chunk_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(paralelo, len(lotes) or 1))) as pool:
+            list(pool.map(exportar, lotes))
+
+        conteo = {}
+        for resultado in resultados:
+            conteo[resultado['estado']] = conteo.get(resultado['estado'], 0) + 1
+        log_event(f"Exportación masiva a Jira: {conteo}", "INFO" if not conteo.get('error') else "WARNING")
+        return resultados
+
+    def _exportar_lote(self, proyecto, lote):
+        """Un POST bulk; completa los resultados del lote y retorna {item_id: key} de los creados"""
+        endpoint = f"{self.url}/rest/api/2/issue/bulk"
+        data = {"issueUpdates": [self._campos(proyecto, item['resumen'], item['descripcion']) for _, item in lote]}
+        try:
+            response = self.http.post(endpoint, json=data, headers={"Content-Type": "application/json"},
+                                      auth=(self.usuario, self.token), endpoint='jira.issue.bulk')
+        except Exception as e:
+            return self._fallar_lote(lote, f"Excepción: {e}")
+        # 201: todos o algunos creados; 400: ninguno creado, con el detalle por ítem
+        if response.status_code not in (201, 400):
+            return self._fallar_lote(lote, f"HTTP {response.status_code}: {response.text[:300]}")
+        try:
+            cuerpo = response.json()
+        except ValueError:
+            return self._fallar_lote(lote, f"HTTP {response.status_code}: respuesta no JSON")
+
+        # Jira informa los fallidos por posición; los creados llegan en orden, sin los fallidos
+        fallidos = {}
+        for error in cuerpo.get('errors', []):
+            detalle = error.get('elementErrors', {})
+            mensajes = list(detalle.get('errors', {}).values()) + detalle.get('errorMessages', [])
+            fallidos[error.get('failedElementNumber')] = '; '.join(mensajes) or f"HTTP {error.get('status')}"
+        creados_remotos = iter(cuerpo.get('issues', []))
+        creados = {}
+        for posicion, (resultado, _) in enumerate(lote):
+            if posicion in fallidos:
+                resultado.update(estado='error', error=fallidos[posicion])
+                continue
+            issue = next(creados_remotos, None)
+            if issue is None:
+                resultado.update(estado='error', error='Jira no devolvió el issue creado')
+                continue
+            resultado.update(estado='creado', key=issue.get('key'))
+            creados[resultado['id']] = issue.get('key')
+        return creados
+
+    def _fallar_lote(self, lote, error):
+        for resultado, _ in lote:
+            resultado.update(estado='error', error=error)
+        log_event(f"Error en lote bulk de Jira ({len(lote)} issues): {error}", "ERROR")
+        return {}
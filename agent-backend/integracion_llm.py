@@ -2,15 +2,16 @@
 integracion_llm.py
 Módulo para integración con modelos de lenguaje (LLM) como OpenAI GPT.
 """
-import requests
 from logger import log_event
 from config_secreta import get_llm_credentials
+from transporte_http import get_transporte
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, transporte=None):
         creds = get_llm_credentials()
         self.api_key = creds['api_key']
         self.api_url = creds['api_url']
+        self.http = transporte or get_transporte()
 
     def analizar_historia(self, historia_usuario):
         """
@@ -24,8 +25,13 @@ class LLMClient:
             "prompt": f"Analiza la siguiente historia de usuario y sugiere escenarios y steps en formato Cucumber.\nHistoria: {historia_usuario}",
             "max_tokens": 512
         }
+        if not self.api_url:
+            log_event("LLM_API_URL no está configurada", "ERROR")
+            return None
         try:
-            response = requests.post(self.api_url, json=data, headers=headers)
+            # Completar texto no crea nada del lado del servidor: se reintenta también en 5xx y timeouts
+            response = self.http.post(self.api_url, json=data, headers=headers,
+                                      endpoint='llm.completions', idempotente=True)
             if response.status_code == 200:
                 resultado = response.json().get('choices', [{}])[0].get('text', '')
                 log_event("Respuesta LLM recibida", "INFO")
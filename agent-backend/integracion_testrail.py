@@ -1,17 +1,28 @@
 """
 integracion_testrail.py
 Ejemplo de integración para exportar features a TestRail usando configuración segura.
+Incluye exportación masiva concurrente con límite de tasa e idempotencia (no duplica casos).
 """
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from logger import log_event
 from config_secreta import get_testrail_credentials
+from transporte_http import get_transporte, LimitadorTasa
+from checkpoint_exportacion import CheckpointExportacion, id_item, ruta_checkpoint
+
+# TestRail Cloud admite 180 solicitudes por minuto por instancia
+TESTRAIL_RPM = int(os.getenv('AGENTESTING_TESTRAIL_RPM', '180'))
+TESTRAIL_PARALELO = int(os.getenv('AGENTESTING_TESTRAIL_PARALELO', '4'))
 
 class TestRailExporter:
-    def __init__(self):
+    def __init__(self, transporte=None, limitador=None):
         creds = get_testrail_credentials()
         self.url = creds['url']
         self.usuario = creds['user']
         self.token = creds['token']
+        self.http = transporte or get_transporte()
+        self.limitador = limitador or LimitadorTasa(TESTRAIL_RPM)
 
     def exportar_feature(self, proyecto_id, titulo, descripcion):
         endpoint = f"{self.url}/index.php?/api/v2/add_case/{proyecto_id}"
@@ -22,7 +33,7 @@ class TestRailExporter:
             "custom_description": descripcion
         }
         try:
-            response = requests.post(endpoint, json=data, headers=headers, auth=auth)
+            response = self.http.post(endpoint, json=data, headers=headers, auth=auth, endpoint='testrail.add_case')
             if response.status_code == 200:
                 log_event(f"Feature exportado a TestRail: {titulo}", "INFO")
                 return response.json()
@@ -31,3 +42,76 @@ class TestRailExporter:
         except Exception as e:
             log_event(f"Excepción al exportar a TestRail: {e}", "ERROR")
         return None
+
+    def exportar_features(self, seccion_id, items, paralelo=TESTRAIL_PARALELO, checkpoint=None):
+        """
+        Exportación masiva: items = [{'id', 'resumen', 'descripcion'}]. Hasta `paralelo` solicitudes
+        a la vez, sin pasar el límite de tasa. El checkpoint (ruta o CheckpointExportacion; por
+        defecto .testrail_checkpoint.json en la carpeta de salida) recuerda id del ítem ->
+        {'case_id', 'hash'}: los ítems sin cambios se omiten, los modificados van a update_case y
+        solo los nuevos a add_case. `id` debe ser estable (la ruta del feature, como en
+        items_desde_features); sin él se usa el título y un feature renombrado crea un caso nuevo.
+        Retorna un resultado por ítem, en orden: {'id', 'resumen', 'estado': 'creado' |
+        'actualizado' | 'omitido' | 'error', 'case_id', 'error'}.
+        """
+        if checkpoint is None:
+            checkpoint = ruta_checkpoint('testrail')
+        if not isinstance(checkpoint, CheckpointExportacion):
+            checkpoint = CheckpointExportacion(checkpoint)
+        items = list(items)
+        sin_id = sum(1 for item in items if not item.get('id'))
+        if sin_id:
+            log_event(f"{sin_id} ítems sin 'id' estable: si se renombran se crearán casos duplicados en TestRail",
+                      "WARNING")
+        resultados = []
+        pendientes = []
+        for item in items:
+            item_id = item.get('id') or id_item(seccion_id, item['resumen'])
+            huella = id_item(item['resumen'], item['descripcion'])
+            resultado = {'id': item_id, 'resumen': item['resumen'], 'estado': None, 'case_id': None, 'error': None}
+            previo = checkpoint.remoto(item_id)
+            if previo and previo.get('hash') == huella:
+                resultado.update(estado='omitido', case_id=previo['case_id'])
+            else:
+                pendientes.append((resultado, item, huella, previo and previo.get('case_id')))
+            resultados.append(resultado)
+
+        def exportar(pendiente):
+            resultado, item, huella, case_id = pendiente
+            if self._exportar_caso(seccion_id, resultado, item, case_id):
+                checkpoint.registrar({resultado['id']: {'case_id': resultado['case_id'], 'hash': huella}})
+
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=max(1, min(paralelo, len(pendientes)))) as pool:
+                list(pool.map(exportar, pendientes))
+
+        conteo = {}
+        for resultado in resultados:
+            conteo[resultado['estado']] = conteo.get(resultado['estado'], 0) + 1
+        log_event(f"Exportación masiva a TestRail: {conteo}", "INFO" if not conteo.get('error') else "WARNING")
+        return resultados
+
+    def _exportar_caso(self, seccion_id, resultado, item, case_id):
+        """add_case o update_case según haya caso previo; completa `resultado` y retorna si tuvo éxito"""
+        if case_id is None:
+            endpoint, nombre, estado = f"add_case/{seccion_id}", 'testrail.add_case', 'creado'
+        else:
+            endpoint, nombre, estado = f"update_case/{case_id}", 'testrail.update_case', 'actualizado'
+        data = {"title": item['resumen'], "custom_description": item['descripcion']}
+        self.limitador.adquirir()
+        try:
+            # update_case con el mismo contenido es idempotente: se puede reintentar ante 5xx
+            response = self.http.post(f"{self.url}/index.php?/api/v2/{endpoint}", json=data,
+                                      headers={"Content-Type": "application/json"},
+                                      auth=(self.usuario, self.token), endpoint=nombre,
+                                      idempotente=case_id is not None)
+            if response.status_code == 200:
+                resultado.update(estado=estado, case_id=response.json().get('id', case_id))
+                return True
+            error = f"HTTP {response.status_code}: {response.text[:300]}"
+        except Exception as e:
+            error = f"Excepción: {e}"
+        resultado.update(estado='error', case_id=case_id, error=error)
+        log_event(f"Error al exportar a TestRail '{item['resumen']}': {error}", "ERROR")
+        return False
+
@@ -5,10 +5,15 @@ Entrena y ajusta el modelo LLM usando LangChain y el código fuente indexado.
 
 import os
 import sys
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain_core.messages import HumanMessage
 import pickle
+import hashlib
+import threading
+
+from model.prompt_assembler import PromptAssembler, PromptSection, count_tokens, format_report, split_attachment
+from model.training_loader import TRAINING_LOADER, WEB_PATTERNS_FILE
+
+# LangChain se importa de forma diferida (ver ContextualModel.__init__ y generate_response):
+# su carga cuesta más que todo el resto del arranque y no se usa en modo limitado.
 
 
 def safe_print(message):
@@ -24,21 +29,30 @@ def safe_print(message):
 
 
 class ContextualModel:
-    def __init__(self, index, model_path='context_model.pkl'):
+    MODEL_NAME = "gpt-4-turbo"
+    TEMPERATURE = 0.1  # Menor temperatura = respuestas más rápidas y consistentes
+
+    def __init__(self, index, model_path='context_model.pkl', api_key=None, response_cache=None,
+                 similarity_threshold=None, llm=None):
         # Intenta obtener la API key de diferentes fuentes
-        openai_api_key = self._get_api_key()
+        openai_api_key = self._get_api_key(api_key)
         
-        if not openai_api_key:
+        if llm is not None:
+            # Cliente inyectado (benchmarks / pruebas): cualquier objeto con stream(messages)
+            self.demo_mode = False
+            self.llm = llm
+        elif not openai_api_key:
             # Sin API key, funciona en modo limitado
             self.demo_mode = True
             self.llm = None
             safe_print("[WARNING] AgentestingMIA funcionando en modo limitado - Configure su API key de OpenAI para funcionalidad completa")
         else:
             self.demo_mode = False
+            from langchain_openai import ChatOpenAI
             # OPTIMIZACIÓN: Configuración más rápida para GPT-3.5-turbo
             self.llm = ChatOpenAI(
-                temperature=0.1,  # Menor temperatura = respuestas más rápidas y consistentes
-                model_name="gpt-4-turbo",
+                temperature=self.TEMPERATURE,
+                model_name=self.MODEL_NAME,
                 openai_api_key=openai_api_key,
                 max_tokens=500,  # Limitar tokens para respuestas más rápidas
                 request_timeout=15  # Timeout de 15 segundos
@@ -46,27 +60,53 @@ class ContextualModel:
             safe_print("[SUCCESS] AgentestingMIA funcionando con IA completa")
         
         self.index = index
+        self.index_generation = index.get('generation', 0)
         self.frameworks = ', '.join(index.get('frameworks', []))
         self.model_path = model_path
         self.training_data = []
+        self._training_lock = threading.Lock()  # --serve guarda interacciones desde varios hilos
         self._load_training_data()
         
         # CACHE: Pre-construir contexto base para evitar recalcular
+        self._specialized_training = self._load_specialized_training()
         self._base_context = self._build_base_context()
 
-        # CACHE LOCAL DE RESPUESTAS
-        self._response_cache = {}
+        # CACHE PERSISTENTE DE RESPUESTAS (compartida entre procesos y sesiones)
+        self._response_cache = response_cache or self._open_response_cache()
+        self._cache_namespace = self._build_cache_namespace()
+        # Umbral para reutilizar respuestas de prompts casi iguales (>= 1 desactiva la búsqueda aproximada)
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv('AGENTESTING_SIMILARITY_THRESHOLD', '0.95'))
+        self.similarity_threshold = similarity_threshold if similarity_threshold < 1 else None
+        # Resultados de la última solicitud por hilo: --serve atiende varios prompts en paralelo con
+        # el mismo modelo (ver last_cache_match y last_prompt_report)
+        self._request_state = threading.local()
+        # Presupuesto de tokens para ejemplos, patrones e historial relevantes al prompt (ver _relevant_context)
+        self.retrieval_budget = int(os.getenv('AGENTESTING_RETRIEVAL_TOKENS', '1500'))
+        self.retrieval_k = int(os.getenv('AGENTESTING_RETRIEVAL_K', '6'))
+        # Presupuesto total del prompt: recorta por prioridad y registra los tokens por sección
+        self._prompt_assembler = PromptAssembler()
+
+    @property
+    def last_cache_match(self):
+        """Coincidencia de cache de la última solicitud atendida en este hilo (None si fue al LLM)"""
+        return getattr(self._request_state, 'cache_match', None)
+
+    @property
+    def last_prompt_report(self):
+        """Prompt armado (tokens por sección) de la última solicitud atendida en este hilo"""
+        return getattr(self._request_state, 'prompt_report', None)
     
-    def _get_api_key(self):
+    def _get_api_key(self, explicit_key=None):
         """Intenta obtener la API key de diferentes fuentes"""
         # 1. Variable de entorno
         api_key = os.getenv('OPENAI_API_KEY')
         if api_key:
             return api_key
         
-        # 2. Argumento pasado desde la extensión
-        if len(sys.argv) > 2:
-            return sys.argv[2]
+        # 2. Argumento pasado desde la extensión (cli.py lo entrega explícitamente)
+        if explicit_key:
+            return explicit_key
         
         # 3. Archivo de configuración local (si existe)
         config_file = os.path.join(os.path.dirname(__file__), '..', 'config.txt')
@@ -96,17 +136,45 @@ class ContextualModel:
         if not hasattr(self, '_base_context'):
             self._base_context = self._build_base_context()
 
+    def update_index(self, index):
+        """Nuevo índice (modo watch): recalcula frameworks, contexto base y namespace de la cache
+        (el namespace solo cambia si cambian los frameworks detectados)"""
+        self.index = index
+        self.frameworks = ', '.join(index.get('frameworks', []))
+        self._base_context = self._build_base_context()
+        self._cache_namespace = self._build_cache_namespace()
+        self.index_generation = index.get('generation', 0)
+
+    def _open_response_cache(self):
+        """Abre la cache SQLite del usuario; si no es posible (disco de solo lectura), usa una en memoria"""
+        from model.response_cache import ResponseCache
+        try:
+            return ResponseCache()
+        except Exception as e:
+            safe_print(f"[WARNING] Cache persistente no disponible, usando cache en memoria: {e}")
+            return ResponseCache(path=':memory:')
+
+    def _build_cache_namespace(self):
+        """Hash de contexto + modelo + temperatura: reentrenar o cambiar de modelo invalida las entradas"""
+        # El historial de interacciones no forma parte del contexto base: cambia en cada respuesta
+        context = self._base_context
+        signature = f"{self.MODEL_NAME}\0{self.TEMPERATURE}\0{context}"
+        return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
     def _build_base_context(self):
-        """Construye contexto base una sola vez para reutilizar"""
-        # Intentar cargar entrenamiento especializado
-        specialized_training = self._load_specialized_training()
-        
-        context_examples = '\n'.join([
-            f"Prompt: {ex['prompt']}\nRespuesta: {ex['response']}" 
-            for ex in self.training_data[-3:]  # Solo últimos 3 ejemplos
-        ])
-        
-        base_context = f"""Eres AgentestingMIA, un agente experto en QA Automation especializado en generar código de pruebas automáticas.
+        """Construye contexto base una sola vez para reutilizar (el historial se elige por prompt)"""
+        # Las secciones se guardan para que _build_messages aplique el presupuesto de tokens
+        self._base_sections = self._build_base_sections()
+        return "\n\n".join(section.text for section in self._base_sections if section.text)
+
+    def _build_base_sections(self):
+        """Secciones del contexto base con su prioridad para el presupuesto de tokens (ver prompt_assembler.py)"""
+        # Entrenamiento especializado (cargado una vez en __init__)
+        specialized_training, web_training = self._specialized_training
+        # Sin contadores del índice (archivos analizados): el contexto es parte del namespace de la
+        # cache y con --serve --watch cada archivo creado invalidaría todas las respuestas
+
+        identity = f"""Eres AgentestingMIA, un agente experto en QA Automation especializado en generar código de pruebas automáticas.
 
 🤖 COMPORTAMIENTO CLAVE: Cuando el usuario pide automatización, SIEMPRE debes:
 1. PRIMERO sugerir las clases específicas basadas en tu entrenamiento
@@ -114,12 +182,9 @@ class ContextualModel:
 3. SER PROACTIVO y específico, no genérico
 
 PROYECTO ACTUAL:
-- Frameworks detectados: {self.frameworks}
-- Archivos analizados: {self.index.get('total_files', 0)}
+- Frameworks detectados: {self.frameworks}"""
 
-{specialized_training}
-
-INSTRUCCIONES CRÍTICAS:
+        instructions = """INSTRUCCIONES CRÍTICAS:
 - Cuando pidan automatización para "carrito de compra", "login", etc. DEBES sugerir clases ESPECÍFICAS del entrenamiento
 - NUNCA des respuestas genéricas como "usa Appium" - sé específico con código real
 - SIEMPRE ofrece crear archivos automáticamente si el usuario confirma
@@ -130,7 +195,9 @@ ARCHIVO: ruta/del/archivo.ext
 CONTENIDO:
 [código aquí]
 
-EJEMPLO DE RESPUESTA CORRECTA:
+SIEMPRE sé específico y proactivo, no genérico."""
+
+        example_response = """EJEMPLO DE RESPUESTA CORRECTA:
 "Para automatización de carrito con login, necesitarás estas clases específicas:
 
 📱 Page Objects:
@@ -148,29 +215,25 @@ EJEMPLO DE RESPUESTA CORRECTA:
 - LoginStepDefinition.java
 - OrderCreateStepDefinition.java
 
-¿Quieres que cree estas clases automáticamente con el código específico?"
-
-CONTEXTO PREVIO:
-{context_examples}
+¿Quieres que cree estas clases automáticamente con el código específico?\""""
 
-SIEMPRE sé específico y proactivo, no genérico."""
-
-        return base_context
+        return [
+            PromptSection('identidad', identity, 100, True),
+            PromptSection('entrenamiento', specialized_training, 80),
+            PromptSection('patrones_web', web_training, 40),
+            PromptSection('instrucciones', instructions, 100, True),
+            PromptSection('ejemplo_respuesta', example_response, 20),
+        ]
     
     def _load_specialized_training(self):
-        """Carga entrenamiento especializado del proyecto (móvil/web/híbrido)"""
+        """Carga entrenamiento especializado del proyecto (móvil/web/híbrido): (entrenamiento, prompt web)"""
         try:
-            import json
-            training_file = os.path.join(os.path.dirname(__file__), '..', 'training', 'training_data.json')
-            web_patterns_file = os.path.join(os.path.dirname(__file__), '..', 'training', 'web_automation_patterns.json')
-            
             specialized_context = ""
+            web_prompt = ""
             
-            # Cargar entrenamiento principal
-            if os.path.exists(training_file):
-                with open(training_file, 'r', encoding='utf-8') as f:
-                    training_data = json.load(f)
-                    
+            # Cargar entrenamiento principal (solo el manifiesto: los shards de patrones no se leen)
+            training_data = TRAINING_LOADER.artifact()
+            if training_data is not None:
                 specialized_context += training_data.get('training_prompt', '')
                 project_type = training_data.get('project_type', 'mobile')
                 frameworks = training_data.get('frameworks', [])
@@ -181,25 +244,23 @@ SIEMPRE sé específico y proactivo, no genérico."""
                 specialized_context += f"Frameworks: {', '.join(frameworks)}\n"
                 
                 # Si tiene patrones web también
-                if 'web_pages' in training_data and training_data['web_pages']:
+                if training_data.count('web_pages'):
                     specialized_context += "\n🌐 PROYECTO HÍBRIDO DETECTADO - Móvil + Web\n"
                     specialized_context += "Usa la misma arquitectura Task-Page/Screen-Control para ambos tipos.\n"
             
             # Cargar patrones web base si existen
-            if os.path.exists(web_patterns_file):
-                with open(web_patterns_file, 'r', encoding='utf-8') as f:
-                    web_data = json.load(f)
-                    web_prompt = web_data.get('web_training_prompt', '')
-                    if web_prompt:
-                        specialized_context += f"\n\n{web_prompt}"
+            # (sección aparte: es la primera que se recorta si el prompt excede el presupuesto)
+            web_data = TRAINING_LOADER.json(WEB_PATTERNS_FILE)
+            if web_data:
+                web_prompt = web_data.get('web_training_prompt', '')
             
-            if specialized_context:
-                return specialized_context
+            if specialized_context or web_prompt:
+                return specialized_context, web_prompt
             else:
-                return self._create_basic_training()
+                return self._create_basic_training(), ""
             
         except Exception as e:
-            return "INSTRUCCIÓN: Genera código de automatización de pruebas siguiendo mejores prácticas."
+            return "INSTRUCCIÓN: Genera código de automatización de pruebas siguiendo mejores prácticas.", ""
     
     def _create_basic_training(self):
         """Crea entrenamiento básico basado en archivos detectados"""
@@ -240,70 +301,126 @@ INSTRUCCIONES:
         return training
 
     def generate_response(self, prompt):
+        return ''.join(self.generate_response_stream(prompt))
+
+    def generate_response_stream(self, prompt):
+        """Igual que generate_response, pero entrega la respuesta por fragmentos a medida que llega del LLM"""
+        self._request_state.cache_match = None
+        self._request_state.prompt_report = None
         # 1. Modo demo: guía para configurar API key
         if self.demo_mode:
-            return self._generate_setup_guidance(prompt)
+            yield self._generate_setup_guidance(prompt)
+            return
 
         # 2. Confirmación para crear archivos
         confirm_words = ['sí', 'si', 'procede', 'hazlo', 'crear', 'crea', 'ok', 'dale']
         if prompt.strip().lower() in confirm_words:
             created_files = self._create_suggested_files()
-            return f"✅ Archivos creados automáticamente:\n{created_files}"
+            yield f"✅ Archivos creados automáticamente:\n{created_files}"
+            return
 
         try:
-            # 3. Cache local
-            cache_key = prompt.strip().lower()
-            if cache_key in self._response_cache:
-                return self._response_cache[cache_key]
-
-            # 4. Si es automatización, prepara contexto y ejemplos
-            if self._is_automation_request(prompt):
-                import json
-                training_file = os.path.join(os.path.dirname(__file__), '..', 'training', 'training_data.json')
-                examples = []
-                if os.path.exists(training_file):
-                    with open(training_file, 'r', encoding='utf-8') as f:
-                        training_data = json.load(f)
-                        # Limitar a los 2 ejemplos más relevantes
-                        for ex in training_data.get('training_examples', [])[:2]:
-                            examples.append(f"### Ejemplo\nUsuario: {ex['prompt']}\nAsistente: {ex['response']}\n")
-                # Mensaje system con contexto y ejemplos, reforzando instrucción de respuesta
-                system_message = (
-                    self._base_context + "\n\n" + "\n".join(examples) +
-                    "\n\nIMPORTANTE: Responde únicamente con el código necesario para la automatización de la entidad solicitada en el prompt. NO incluyas ejemplos previos ni explicaciones."
-                )
-                messages = [
-                    HumanMessage(role="system", content=system_message),
-                    HumanMessage(role="user", content=prompt)
-                ]
-            else:
-                messages = [HumanMessage(content=prompt)]
+            # 3. Cache persistente (exacta o por similitud)
+            match = self._response_cache.lookup(prompt, self._cache_namespace, self.similarity_threshold)
+            self._request_state.cache_match = match
+            if match is not None:
+                if match.score < 1.0:
+                    safe_print(f"[CACHE] Respuesta reutilizada de un prompt similar (similitud {match.score:.2f}): \"{match.prompt}\"")
+                yield match.response
+                return
+
+            messages = self._build_messages(prompt)
 
             # 5. Mostrar mensajes enviados al modelo para depuración
             safe_print("[DEBUG] Mensajes enviados al modelo:")
             for msg in messages:
                 safe_print(f"Role: {getattr(msg, 'role', 'N/A')}, Content: {msg.content}")
-            # 6. Llamada a LangChain/OpenAI con roles explícitos
-            response = self.llm.invoke(messages)
-
-            # 6. Guardar interacción para aprendizaje futuro
-            self._save_interaction(prompt, response.content if hasattr(response, 'content') else str(response))
-
-            # 7. Extracción robusta del resultado
-            result = response.content if hasattr(response, 'content') else str(response)
-            self._response_cache[cache_key] = result
-            return result
+            # 6. Llamada a LangChain/OpenAI con roles explícitos, en streaming
+            chunks = []
+            for chunk in self.llm.stream(messages):
+                # 7. Extracción robusta de cada fragmento
+                text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if text:
+                    chunks.append(text)
+                    yield text
+            result = ''.join(chunks)
+
+            # 8. Guardar interacción para aprendizaje futuro y cachear solo respuestas completas
+            self._save_interaction(prompt, result)
+            self._response_cache.put(prompt, self._cache_namespace, result)
         except Exception as e:
-            # 8. Manejo de errores
-            return f"Error al generar respuesta: {str(e)}"
+            # 9. Manejo de errores
+            yield f"Error al generar respuesta: {str(e)}"
+
+    def _build_messages(self, prompt):
+        """Arma los mensajes para el LLM (contexto y ejemplos solo si es una solicitud de automatización)"""
+        from langchain_core.messages import HumanMessage
+
+        # 4. Si es automatización, prepara contexto y ejemplos
+        # El adjunto de la extensión llega pegado al prompt: va como sección propia, recortable
+        request, attachment = split_attachment(prompt)
+        sections = [
+            PromptSection('pedido', request, 100, True, 'user'),
+            PromptSection('adjunto', attachment, 70, False, 'user'),
+        ]
+        if self._is_automation_request(prompt):
+            # Mensaje system con contexto y ejemplos relevantes, reforzando instrucción de respuesta
+            sections = self._base_sections + [
+                PromptSection('recuperados', self._relevant_context(request), 60),
+                PromptSection('cierre', "IMPORTANTE: Responde únicamente con el código necesario para la automatización de la entidad solicitada en el prompt. NO incluyas ejemplos previos ni explicaciones.", 100, True),
+            ] + sections
+        assembled = self._prompt_assembler.assemble(sections)
+        self._request_state.prompt_report = assembled
+        safe_print(format_report(assembled))
+        if assembled.system:
+            return [
+                HumanMessage(role="system", content=assembled.system),
+                HumanMessage(role="user", content=assembled.user)
+            ]
+        return [HumanMessage(content=assembled.user)]
+
+    def _relevant_context(self, prompt):
+        """Ejemplos, clases del proyecto e interacciones previas más relevantes al prompt (BM25)"""
+        from training.retrieval import RetrievalIndex, render_item, select_within_budget
+
+        candidates = []  # (sección, texto) en orden de relevancia
+        index = TRAINING_LOADER.retrieval()
+        if index is not None:
+            for _, kind, position in index.search(prompt, k=self.retrieval_k):
+                section = 'examples' if kind == 'training_examples' else 'patterns'
+                candidates.append((section, render_item(kind, TRAINING_LOADER.item(kind, position))))
+        if not any(section == 'examples' for section, _ in candidates):
+            # Sin coincidencias: los primeros ejemplos sirven igual como guía de formato
+            artifact = TRAINING_LOADER.artifact()
+            for ex in (artifact.get('training_examples', []) if artifact is not None else [])[:2]:
+                candidates.append(('examples', render_item('training_examples', ex)))
+
+        with self._training_lock:
+            interactions = list(self.training_data)
+        history = RetrievalIndex.build(
+            ('history', i, f"{ex['prompt']} {ex['response']}") for i, ex in enumerate(interactions))
+        for _, _, position in history.search(prompt, k=3):
+            candidates.append(('history', render_item('history', interactions[position])))
+
+        selected, used = select_within_budget(candidates, self.retrieval_budget,
+                                              count=lambda candidate: count_tokens(candidate[1]))
+        safe_print(f"[RETRIEVAL] {len(selected)}/{len(candidates)} elementos relevantes (~{used} tokens)")
+        by_section = {}
+        for section, text in selected:
+            by_section.setdefault(section, []).append(text)
+        parts = by_section.get('examples', [])
+        if by_section.get('patterns'):
+            parts.append("CLASES RELEVANTES DEL PROYECTO:\n" + "\n".join(by_section['patterns']))
+        if by_section.get('history'):
+            parts.append("CONTEXTO PREVIO:\n" + "\n".join(by_section['history']))
+        return "\n".join(parts)
 
     def _create_suggested_files(self):
         import re
         files = []
-        # Usar SOLO la última respuesta relevante (último prompt)
-        if self._response_cache:
-            last_key = list(self._response_cache.keys())[-1]
-            response = self._response_cache[last_key]
+        # Usar SOLO la última respuesta relevante (último prompt, aunque haya llegado en otro proceso)
+        response = self._response_cache.last_response(self._cache_namespace)
+        if response:
 
             # Extraer archivos Java, StepDefinition, Task, Feature
             # Soporta: Archivo: Nombre.java\n```java\n...```, Archivo: Nombre.feature\n```feature\n...```
@@ -377,14 +494,15 @@ INSTRUCCIONES:
         try:
             # Solo guardar interacciones útiles (no saludos)
             if not self._is_simple_greeting(prompt) and len(response) > 50:
-                self.training_data.append({
-                    'prompt': prompt[:100],  # Truncar para eficiencia
-                    'response': response[:200]
-                })
-                # Mantener solo últimos 10 ejemplos
-                if len(self.training_data) > 10:
-                    self.training_data = self.training_data[-10:]
-                self._save_training_data()
+                with self._training_lock:
+                    self.training_data.append({
+                        'prompt': prompt[:100],  # Truncar para eficiencia
+                        'response': response[:200]
+                    })
+                    # Mantener solo últimos 10 ejemplos
+                    if len(self.training_data) > 10:
+                        self.training_data = self.training_data[-10:]
+                    self._save_training_data()
         except:
             pass
     
@@ -461,66 +579,62 @@ Asegúrate de que tu API key comience con "sk-" y tenga suficiente crédito en t
         """Genera respuesta específica basada en el entrenamiento móvil"""
         try:
             # Cargar training data para respuestas específicas
-            import json
-            training_file = os.path.join(os.path.dirname(__file__), '..', 'training', 'training_data.json')
+            training_data = TRAINING_LOADER.artifact()
             
-            if os.path.exists(training_file):
-                with open(training_file, 'r', encoding='utf-8') as f:
-                    training_data = json.load(f)
-                    
-                    # Extraer clases específicas del entrenamiento
-                    page_objects = training_data.get('patterns', {}).get('page_objects', [])
-                    step_definitions = training_data.get('patterns', {}).get('step_definitions', [])
-                    utilities = training_data.get('patterns', {}).get('utilities', [])
-                    
-                    # Generar respuesta específica para carrito/login
-                    response = f"""🎯 **Para automatización {self._extract_scenario(prompt)}, necesitarás estas clases específicas basadas en tu entrenamiento móvil:**
+            if training_data is not None:
+                # Extraer clases específicas del entrenamiento (solo los shards que se usan)
+                page_objects = TRAINING_LOADER.patterns('page_objects')
+                step_definitions = TRAINING_LOADER.patterns('step_definitions', limit=3)
+                utilities = TRAINING_LOADER.patterns('utilities', limit=4)
+                
+                # Generar respuesta específica para carrito/login
+                response = f"""🎯 **Para automatización {self._extract_scenario(prompt)}, necesitarás estas clases específicas basadas en tu entrenamiento móvil:**
 
 📱 **Page Objects (Screens):**"""
+                
+                # Filtrar Page Objects relevantes
+                relevant_pages = []
+                prompt_lower = prompt.lower()
+                
+                for page in page_objects:
+                    class_name = page.get('class_name', '')
+                    if ('login' in prompt_lower and 'Login' in class_name) or \
+                       ('carrito' in prompt_lower or 'order' in prompt_lower and 'Order' in class_name) or \
+                       ('product' in prompt_lower and 'Product' in class_name) or \
+                       ('customer' in prompt_lower and 'Customer' in class_name):
+                        relevant_pages.append(page)
+                
+                # Si no hay específicos, tomar los principales
+                if not relevant_pages:
+                    relevant_pages = page_objects[:4]  # Tomar los primeros 4
+                
+                for page in relevant_pages[:5]:  # Máximo 5
+                    class_name = page.get('class_name', 'Screen')
+                    sample_controls = page.get('mobile_controls', [])[:3]  # 3 controles ejemplo
                     
-                    # Filtrar Page Objects relevantes
-                    relevant_pages = []
-                    prompt_lower = prompt.lower()
-                    
-                    for page in page_objects:
-                        class_name = page.get('class_name', '')
-                        if ('login' in prompt_lower and 'Login' in class_name) or \
-                           ('carrito' in prompt_lower or 'order' in prompt_lower and 'Order' in class_name) or \
-                           ('product' in prompt_lower and 'Product' in class_name) or \
-                           ('customer' in prompt_lower and 'Customer' in class_name):
-                            relevant_pages.append(page)
-                    
-                    # Si no hay específicos, tomar los principales
-                    if not relevant_pages:
-                        relevant_pages = page_objects[:4]  # Tomar los primeros 4
-                    
-                    for page in relevant_pages[:5]:  # Máximo 5
-                        class_name = page.get('class_name', 'Screen')
-                        sample_controls = page.get('mobile_controls', [])[:3]  # 3 controles ejemplo
-                        
-                        response += f"\n- **{class_name}** - Controles: "
-                        if sample_controls:
-                            controls_str = ', '.join([f"{c.get('name', '')} ({c.get('type', '')})" for c in sample_controls])
-                            response += controls_str
-                        else:
-                            response += "pantalla móvil"
-                    
-                    response += f"\n\n📋 **Tasks (Lógica de negocio):**"
-                    for utility in utilities[:4]:  # Máximo 4 tasks
-                        if utility.get('utility_type') == 'task':
-                            file_name = utility.get('file', 'Task')
-                            methods = utility.get('utility_methods', [])[:2]  # 2 métodos ejemplo
-                            response += f"\n- **{file_name}** - Métodos: {', '.join(methods) if methods else 'lógica de negocio'}"
-                    
-                    response += f"\n\n🧪 **Step Definitions (Cucumber):**"
-                    for step in step_definitions[:3]:  # Máximo 3 step definitions
-                        file_name = step.get('file', 'StepDefinition')
-                        sample_steps = step.get('steps', [])[:2]  # 2 steps ejemplo
-                        response += f"\n- **{file_name}**"
-                        if sample_steps:
-                            response += f" - Steps: {', '.join(sample_steps)}"
-                    
-                    response += f"""\n\n🔧 **Arquitectura del proyecto:**
+                    response += f"\n- **{class_name}** - Controles: "
+                    if sample_controls:
+                        controls_str = ', '.join([f"{c.get('name', '')} ({c.get('type', '')})" for c in sample_controls])
+                        response += controls_str
+                    else:
+                        response += "pantalla móvil"
+                
+                response += f"\n\n📋 **Tasks (Lógica de negocio):**"
+                for utility in utilities[:4]:  # Máximo 4 tasks
+                    if utility.get('utility_type') == 'task':
+                        file_name = utility.get('file', 'Task')
+                        methods = utility.get('utility_methods', [])[:2]  # 2 métodos ejemplo
+                        response += f"\n- **{file_name}** - Métodos: {', '.join(methods) if methods else 'lógica de negocio'}"
+                
+                response += f"\n\n🧪 **Step Definitions (Cucumber):**"
+                for step in step_definitions[:3]:  # Máximo 3 step definitions
+                    file_name = step.get('file', 'StepDefinition')
+                    sample_steps = step.get('steps', [])[:2]  # 2 steps ejemplo
+                    response += f"\n- **{file_name}**"
+                    if sample_steps:
+                        response += f" - Steps: {', '.join(sample_steps)}"
+                
+                response += f"""\n\n🔧 **Arquitectura del proyecto:**
 - **Frameworks:** Appium + Cucumber + JUnit
 - **Patrón:** Task-Screen-Control (móvil)
 - **Locators:** Android com.uniflex.flexbusinessandroid:id/...
@@ -529,9 +643,9 @@ Asegúrate de que tu API key comience con "sk-" y tenga suficiente crédito en t
 💡 **¿Quieres que cree estas clases automáticamente con código específico?**
 
 Solo responde "sí" o especifica qué clases necesitas primero, y generaré el código completo usando los patrones exactos de tu entrenamiento móvil."""
-                    
-                    return response
-            
+                
+                return response
+        
         except Exception as e:
             pass
         
@@ -0,0 +1,125 @@
+"""
+prompt_assembler.py
+Armado del prompt con presupuesto de tokens. Cada sección (instrucciones, entrenamiento, patrones
+web, ejemplos recuperados, adjunto, pedido del usuario) se mide; si el total supera el presupuesto
+se recortan primero las de menor prioridad, y el tamaño de cada una queda registrado para ver a
+dónde van los tokens de entrada.
+
+Cuenta tokens con tiktoken (cl100k_base, el de gpt-4-turbo) si está instalado y tiene la
+codificación en cache; si no, con una aproximación por bytes UTF-8.
+"""
+import os
+from collections import namedtuple
+
+DEFAULT_PROMPT_TOKENS = 8000
+MIN_SECTION_TOKENS = 40          # por debajo de esto una sección recortada no aporta: se quita
+TRIM_MARKER = '\n[... recortado por presupuesto de tokens ...]'
+ATTACHMENT_MARKER = '📁 **ARCHIVO ADJUNTO:'
+
+# required: nunca se recorta (instrucciones y pedido del usuario); role: 'system' o 'user'
+PromptSection = namedtuple('PromptSection', ['name', 'text', 'priority', 'required', 'role'],
+                           defaults=(False, 'system'))
+AssembledPrompt = namedtuple('AssembledPrompt', ['system', 'user', 'sections', 'total', 'budget'])
+
+_encoding = None
+
+
+def _tiktoken_encoding():
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if os.getenv('AGENTESTING_TOKENIZER', 'auto') != 'approx':
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception:
+                pass  # sin tiktoken o sin la codificación descargada: aproximación
+    return _encoding or None
+
+
+def approximate_tokens(text):
+    """~4 bytes UTF-8 por token: sobreestima un poco el español acentuado y los emojis"""
+    return (len(text.encode('utf-8')) + 3) // 4
+
+
+def count_tokens(text):
+    encoding = _tiktoken_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return approximate_tokens(text)
+
+
+def tokenizer_name():
+    return 'tiktoken/cl100k_base' if _tiktoken_encoding() is not None else 'aprox-utf8/4'
+
+
+def split_attachment(prompt):
+    """Separa el pedido del archivo adjunto que la extensión agrega al final del prompt"""
+    position = prompt.find(ATTACHMENT_MARKER)
+    if position < 0:
+        return prompt, ''
+    return prompt[:position].rstrip(), prompt[position:]
+
+
+def trim_to_tokens(text, max_tokens, count=count_tokens):
+    """Conserva el inicio del texto (cortando en un salto de línea) dentro de max_tokens"""
+    if count(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count(text[:middle] + TRIM_MARKER) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text.rfind('\n', 0, low)
+    if cut > low // 2:
+        low = cut
+    return text[:low] + TRIM_MARKER if low else ''
+
+
+class PromptAssembler:
+    def __init__(self, budget=None, count=count_tokens):
+        if budget is None:
+            budget = int(os.getenv('AGENTESTING_PROMPT_TOKENS', str(DEFAULT_PROMPT_TOKENS)))
+        self.budget = budget
+        self.count = count
+
+    def assemble(self, sections):
+        """Recorta por prioridad (a igual prioridad, primero la sección más tardía) y arma system/user"""
+        sections = [s for s in sections if s.text]
+        texts = [s.text for s in sections]
+        sizes = [self.count(text) for text in texts]
+        before = list(sizes)
+        excess = sum(sizes) - self.budget
+        optional = sorted((i for i, s in enumerate(sections) if not s.required),
+                          key=lambda i: (sections[i].priority, -i))
+        for i in optional:
+            if excess <= 0:
+                break
+            allowed = sizes[i] - excess
+            texts[i] = trim_to_tokens(texts[i], allowed, self.count) if allowed >= MIN_SECTION_TOKENS else ''
+            new_size = self.count(texts[i]) if texts[i] else 0
+            excess -= sizes[i] - new_size
+            sizes[i] = new_size
+
+        def join(role):
+            return '\n\n'.join(t for s, t in zip(sections, texts) if s.role == role and t)
+
+        report = [(s.name, before[i], sizes[i]) for i, s in enumerate(sections)]
+        return AssembledPrompt(join('system'), join('user'), report, sum(sizes), self.budget)
+
+
+def format_report(assembled):
+    """Línea de log: total/presupuesto y tokens por sección (antes→después si se recortó)"""
+    parts = []
+    for name, before, after in assembled.sections:
+        parts.append(f"{name}={before}" if before == after else f"{name}={before}→{after}")
+    return f"[PROMPT] {assembled.total}/{assembled.budget} tokens ({tokenizer_name()}): " + ' '.join(parts)
+
+# Uso:
+# assembler = PromptAssembler(budget=6000)
+# prompt = assembler.assemble([PromptSection('instrucciones', texto, 100, True),
+#                              PromptSection('ejemplos', ejemplos, 50),
+#                              PromptSection('pedido', pedido, 100, True, 'user')])
+# prompt.system, prompt.user, format_report(prompt)
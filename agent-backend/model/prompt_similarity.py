@@ -0,0 +1,139 @@
+"""
+prompt_similarity.py
+Normalización de prompts y firmas MinHash con bandas LSH para encontrar prompts casi
+duplicados ("automatiza el login" ~ "automatizar login por favor") sin recorrer la cache.
+Los identificadores (LoginScreen, login2, campo_usuario) y los números no se reducen a raíz:
+son rasgos exactos, y la cache solo reutiliza una respuesta si coinciden todos (anchors).
+"""
+import hashlib
+import re
+import struct
+import unicodedata
+
+NUM_PERMUTATIONS = 64
+BANDS = 16                      # 16 bandas x 4 filas: candidatos desde ~0.5 de similitud
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# Sufijos que se quitan para llegar a la raíz (el más largo primero): automatiza / automatizar /
+# automatización -> automatiz, pero productos -> product y productividad -> productiv
+SUFFIXES = ('amientos', 'imientos', 'aciones', 'amiento', 'imiento', 'idades', 'acion', 'idad', 'ando',
+            'iendo', 'ados', 'adas', 'idos', 'idas', 'ado', 'ada', 'ido', 'ida', 'ar', 'er', 'ir',
+            'a', 'e', 'o')
+MIN_STEM_LENGTH = 4
+
+STOPWORDS = {
+    # español
+    'a', 'al', 'algo', 'como', 'con', 'de', 'del', 'el', 'ella', 'en', 'es', 'esta', 'este', 'esto',
+    'la', 'las', 'le', 'lo', 'los', 'me', 'mi', 'mis', 'necesito', 'o', 'para', 'podrias', 'por',
+    'puedes', 'que', 'quiero', 'se', 'sus', 'su', 'favor', 'porfa', 'un', 'una', 'unos', 'unas', 'y',
+    'hola', 'gracias', 'ahora', 'tambien',
+    # inglés
+    'an', 'and', 'for', 'i', 'is', 'it', 'me', 'my', 'of', 'please', 'the', 'to', 'with', 'you',
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _stable_hash(text):
+    """Hash estable entre procesos (hash() de Python se aleatoriza por proceso)"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+# Permutaciones (a*x + b) mod p generadas de forma determinista
+_PERMUTATIONS = [
+    (_stable_hash(f'a{i}') % (_MERSENNE_PRIME - 1) + 1, _stable_hash(f'b{i}') % _MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+
+
+def strip_accents(text):
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def stem(word):
+    """Raíz aproximada: quita plurales y un sufijo verbal/nominal (sin truncar la palabra)"""
+    if len(word) > 4 and word.endswith('es') and word[-3] in 'rlndjz':
+        word = word[:-2]  # vendedores -> vendedor, acciones -> accion
+    elif len(word) > 3 and word.endswith('s'):
+        word = word[:-1]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def is_identifier(word):
+    """camelCase/PascalCase, con dígitos o con guion bajo: nombra una entidad concreta"""
+    return any(c.isdigit() or c == '_' for c in word) or re.search(r'[a-z][A-Z]', word) is not None
+
+
+def _words(text):
+    return re.findall(r'[A-Za-z0-9_]+', strip_accents(text))
+
+
+def tokenize(text):
+    """Tokens normalizados: sin acentos, sin stopwords, con plurales y formas verbales reducidas"""
+    words = re.findall(r'[a-z0-9]+', strip_accents(text.lower()))
+    return [stem(w) for w in words if w not in STOPWORDS]
+
+
+def anchors(text):
+    """Identificadores y números del prompt, completos y en minúsculas"""
+    return sorted({w.lower() for w in _words(text) if is_identifier(w)})
+
+
+def features(text):
+    """Conjunto de rasgos: raíces de palabras + sus trigramas de caracteres; identificadores completos"""
+    result = set()
+    for word in _words(text):
+        if is_identifier(word):
+            result.add(f'i:{word.lower()}')  # sin trigramas: LoginScreen no se parece a LoginScreenTest
+            continue
+        word = word.lower()
+        if word in STOPWORDS:
+            continue
+        token = stem(word)
+        result.add(f'w:{token}')
+        padded = f'#{token}#'
+        for i in range(len(padded) - 2):
+            result.add(f'c:{padded[i:i + 3]}')
+    return result
+
+
+def minhash(feature_set):
+    """Firma MinHash de NUM_PERMUTATIONS valores de 32 bits (None si no hay rasgos)"""
+    if not feature_set:
+        return None
+    hashes = [_stable_hash(f) for f in feature_set]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(signature):
+    """Claves LSH: prompts con alguna banda idéntica son candidatos a casi duplicados"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<{ROWS_PER_BAND}I', *rows), digest_size=8).hexdigest()
+        keys.append(f'{band}:{digest}')
+    return keys
+
+
+def similarity(signature_a, signature_b):
+    """Estimación de Jaccard: fracción de posiciones iguales entre firmas"""
+    equal = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return equal / NUM_PERMUTATIONS
+
+
+def pack_signature(signature):
+    return struct.pack(f'<{NUM_PERMUTATIONS}I', *signature)
+
+
+def unpack_signature(blob):
+    return list(struct.unpack(f'<{NUM_PERMUTATIONS}I', blob))
+
+# Uso:
+# sig = minhash(features("automatiza el login"))
+# similarity(sig, minhash(features("automatizar login por favor")))  -> 1.0
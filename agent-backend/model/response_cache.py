@@ -0,0 +1,258 @@
+"""
+response_cache.py
+Cache persistente de respuestas del LLM en SQLite (directorio de cache del usuario).
+Evicción LRU + TTL con tope de entradas y de tamaño, y contadores de aciertos/fallos
+compartidos entre procesos. Además de la clave exacta, indexa cada prompt por bandas
+MinHash (ver prompt_similarity.py) para reutilizar respuestas de prompts casi iguales.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from model import prompt_similarity
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600      # una semana
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024     # 20 MB de respuestas
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+# Resultado de lookup(): score 1.0 para coincidencia exacta
+CacheMatch = namedtuple('CacheMatch', ['response', 'score', 'prompt'])
+
+
+def default_cache_dir():
+    """Directorio de cache del usuario (AGENTESTING_CACHE_DIR tiene prioridad)"""
+    override = os.getenv('AGENTESTING_CACHE_DIR')
+    if override:
+        return override
+    if os.name == 'nt':
+        base = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'agentestingmia')
+
+
+def normalize_prompt(prompt):
+    """Normalización de la clave exacta: minúsculas y espacios colapsados"""
+    return ' '.join(prompt.strip().lower().split())
+
+
+class ResponseCache:
+    SCHEMA_VERSION = 3
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(default_cache_dir(), 'responses.sqlite3')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Una conexión compartida protegida por lock (el modo --serve atiende en varios hilos)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if self.path != ':memory:':
+            try:
+                # WAL permite que varios procesos (una ventana de VS Code cada uno) lean mientras otro escribe
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                pass
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                # Es una cache: ante un esquema distinto se descarta completa
+                self._conn.execute('DROP TABLE IF EXISTS bands')
+                self._conn.execute('DROP TABLE IF EXISTS responses')
+                self._conn.execute('DROP TABLE IF EXISTS stats')
+                self._conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                signature BLOB,
+                anchors TEXT NOT NULL DEFAULT '',
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_created ON responses (created)')
+            # Bandas LSH: una fila por (entrada, banda); la búsqueda es un lookup indexado por bucket
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS bands (
+                namespace TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL REFERENCES responses (key) ON DELETE CASCADE
+            )''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS bands_bucket ON bands (namespace, bucket)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS bands_key ON bands (key)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self._conn.execute(
+                "INSERT OR IGNORE INTO stats (name, value) VALUES "
+                "('hits', 0), ('similar_hits', 0), ('misses', 0), ('entries', 0), ('bytes', 0)"
+            )
+            # Totales mantenidos por triggers: la evicción no necesita COUNT/SUM sobre toda la tabla
+            self._conn.execute('''CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+                UPDATE stats SET value = value + 1 WHERE name = 'entries';
+                UPDATE stats SET value = value + NEW.size WHERE name = 'bytes';
+            END''')
+            self._conn.execute('''CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+                UPDATE stats SET value = value - 1 WHERE name = 'entries';
+                UPDATE stats SET value = value - OLD.size WHERE name = 'bytes';
+            END''')
+
+    @staticmethod
+    def make_key(prompt, namespace):
+        """Clave = prompt normalizado + namespace (hash de contexto, modelo y temperatura)"""
+        return hashlib.sha256(f"{namespace}\0{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+    def get(self, prompt, namespace):
+        """Retorna la respuesta cacheada (solo coincidencia exacta) o None; actualiza LRU y contadores"""
+        match = self.lookup(prompt, namespace, similarity_threshold=None)
+        return match.response if match else None
+
+    def lookup(self, prompt, namespace, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Busca primero por clave exacta y, si falla, el prompt más parecido del mismo namespace
+        con similitud >= similarity_threshold y los mismos identificadores y números (None desactiva
+        la búsqueda aproximada).
+        Retorna CacheMatch o None.
+        """
+        key = self.make_key(prompt, namespace)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT response, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self._touch(key, now, 'hits')
+                return CacheMatch(row[0], 1.0, normalize_prompt(prompt))
+            if row:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+            if similarity_threshold is not None:
+                match = self._lookup_similar(prompt, namespace, similarity_threshold, now)
+                if match:
+                    return match
+            self._conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+            return None
+
+    def _lookup_similar(self, prompt, namespace, threshold, now):
+        signature = prompt_similarity.minhash(prompt_similarity.features(prompt))
+        if signature is None:
+            return None
+        buckets = prompt_similarity.band_keys(signature)
+        placeholders = ','.join('?' * len(buckets))
+        candidates = self._conn.execute(
+            f'SELECT DISTINCT r.key, r.prompt, r.response, r.signature FROM bands b '
+            f'JOIN responses r ON r.key = b.key '
+            f'WHERE b.namespace = ? AND b.bucket IN ({placeholders}) AND r.created >= ? AND r.anchors = ?',
+            [namespace] + buckets + [now - self.ttl, ' '.join(prompt_similarity.anchors(prompt))]
+        ).fetchall()
+        best = None
+        for key, cached_prompt, response, blob in candidates:
+            score = prompt_similarity.similarity(signature, prompt_similarity.unpack_signature(blob))
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, key, cached_prompt, response)
+        if best is None:
+            return None
+        score, key, cached_prompt, response = best
+        self._touch(key, now, 'similar_hits')
+        return CacheMatch(response, round(score, 3), cached_prompt)
+
+    def _touch(self, key, now, counter):
+        self._conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        self._conn.execute('UPDATE stats SET value = value + 1 WHERE name = ?', (counter,))
+
+    def put(self, prompt, namespace, response):
+        key = self.make_key(prompt, namespace)
+        now = time.time()
+        signature = prompt_similarity.minhash(prompt_similarity.features(prompt))
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.execute(
+                'INSERT INTO responses (key, namespace, prompt, response, signature, anchors, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, namespace, normalize_prompt(prompt), response,
+                 prompt_similarity.pack_signature(signature) if signature else None,
+                 ' '.join(prompt_similarity.anchors(prompt)),
+                 len(response.encode('utf-8')), now, now)
+            )
+            if signature:
+                self._conn.executemany(
+                    'INSERT INTO bands (namespace, bucket, key) VALUES (?, ?, ?)',
+                    [(namespace, bucket, key) for bucket in prompt_similarity.band_keys(signature)]
+                )
+            self._evict(now)
+
+    def _evict(self, now):
+        """Elimina expirados y luego los menos usados hasta respetar los topes"""
+        self._conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,))
+        count, total = self._totals()
+        while count > self.max_entries or (total > self.max_bytes and count > 1):
+            excess = max(count - self.max_entries, 1)
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)',
+                (excess,)
+            )
+            count, total = self._totals()
+
+    def _totals(self):
+        counters = dict(self._conn.execute(
+            "SELECT name, value FROM stats WHERE name IN ('entries', 'bytes')"
+        ).fetchall())
+        return counters.get('entries', 0), counters.get('bytes', 0)
+
+    def last_response(self, namespace=None):
+        """Última respuesta usada (la que confirma el usuario con 'sí'), aunque venga de otro proceso"""
+        with self._lock:
+            if namespace is None:
+                row = self._conn.execute('SELECT response FROM responses ORDER BY accessed DESC LIMIT 1').fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT response FROM responses WHERE namespace = ? ORDER BY accessed DESC LIMIT 1',
+                    (namespace,)
+                ).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._conn.execute('SELECT name, value FROM stats').fetchall())
+        count, total = counters.get('entries', 0), counters.get('bytes', 0)
+        hits = counters.get('hits', 0)
+        similar_hits = counters.get('similar_hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            'path': self.path,
+            'entries': count,
+            'bytes': total,
+            'hits': hits,
+            'similar_hits': similar_hits,
+            'misses': misses,
+            'hit_rate': round((hits + similar_hits) / (hits + similar_hits + misses), 3)
+                        if hits + similar_hits + misses else 0.0,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl
+        }
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM bands')
+            self._conn.execute('DELETE FROM responses')
+            self._conn.execute("UPDATE stats SET value = 0 WHERE name IN ('hits', 'similar_hits', 'misses')")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Uso:
+# cache = ResponseCache()
+# cache.put('automatizar login', namespace, respuesta)
+# cache.get('Automatizar  login', namespace)  -> respuesta
+# cache.lookup('automatiza el login por favor', namespace)  -> CacheMatch(respuesta, 1.0, 'automatizar login')
@@ -0,0 +1,104 @@
+"""
+training_loader.py
+Carga compartida de los archivos de entrenamiento (training_data.json y web_automation_patterns.json).
+Cada archivo se parsea una sola vez y queda en memoria; se vuelve a leer solo cuando cambia su
+firma (mtime, tamaño o inode: el entrenamiento reemplaza el manifiesto con os.replace).
+En modo residente esto evita parsear el entrenamiento en cada prompt de automatización.
+"""
+import json
+import os
+import threading
+
+from training.artifact import TrainingArtifact
+
+TRAINING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'training'))
+TRAINING_FILE = os.path.join(TRAINING_DIR, 'training_data.json')
+WEB_PATTERNS_FILE = os.path.join(TRAINING_DIR, 'web_automation_patterns.json')
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TrainingDataLoader:
+    """Los valores retornados se comparten entre hilos y llamadas: no modificarlos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # ruta -> {'signature', 'value', 'memo' (shards e índice ya leídos)}
+        self.stats = {'loads': 0, 'hits': 0}
+
+    def _get(self, path, parse):
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        with self._lock:
+            if signature is None:
+                self._entries.pop(path, None)
+                return None
+            entry = self._entries.get(path)
+            if entry is not None and entry['signature'] == signature:
+                self.stats['hits'] += 1
+                return entry
+            entry = {'signature': signature, 'value': parse(path), 'memo': {}}
+            self._entries[path] = entry
+            self.stats['loads'] += 1
+            return entry
+
+    def artifact(self, path=TRAINING_FILE):
+        """TrainingArtifact del manifiesto (None si no hay entrenamiento)"""
+        entry = self._get(path, TrainingArtifact.open)
+        return entry['value'] if entry else None
+
+    def json(self, path=WEB_PATTERNS_FILE):
+        """JSON completo (web_automation_patterns.json u otro archivo chico)"""
+        entry = self._get(path, _read_json)
+        return entry['value'] if entry else None
+
+    def patterns(self, kind, limit=None, path=TRAINING_FILE):
+        """Patrones de un shard, leídos una vez por versión del artefacto"""
+        return self._memo(path, ('patterns', kind, limit), lambda artifact: artifact.patterns(kind, limit=limit)) or []
+
+    def retrieval(self, path=TRAINING_FILE):
+        """Índice BM25 del artefacto (training/retrieval.py), uno por versión del archivo"""
+        return self._memo(path, 'retrieval', lambda artifact: artifact.retrieval_index())
+
+    def item(self, kind, index, path=TRAINING_FILE):
+        """Ejemplo o patrón puntual referenciado por el índice de búsqueda"""
+        return self._memo(path, ('item', kind, index), lambda artifact: artifact.item(kind, index))
+
+    def _memo(self, path, key, compute):
+        entry = self._get(path, TrainingArtifact.open)
+        if entry is None:
+            return None
+        with self._lock:
+            cached = entry['memo'].get(key)
+        if cached is None:
+            cached = compute(entry['value'])
+            with self._lock:
+                entry['memo'][key] = cached
+        return cached
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+
+# Instancia compartida por todos los ContextualModel del proceso
+TRAINING_LOADER = TrainingDataLoader()
+
+# Uso:
+# from model.training_loader import TRAINING_LOADER
+# artifact = TRAINING_LOADER.artifact()          # None si no existe training_data.json
+# TRAINING_LOADER.patterns('page_objects')        # se relee solo si el archivo cambió
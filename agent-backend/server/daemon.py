@@ -0,0 +1,206 @@
+"""
+daemon.py
+Modo residente del backend: atiende solicitudes JSON (una por línea) y responde
+con JSON identificado por id, manteniendo índice, contexto y cliente LLM en memoria.
+
+Protocolo (stdin -> stdout, una línea JSON por mensaje):
+    {"id": "1", "prompt": "automatizar login"}          -> {"id": "1", "type": "response", "response": "..."}
+    {"id": "1", "prompt": "...", "stream": true}         -> {"id": "1", "type": "chunk", "data": "..."} ... {"id": "1", "type": "done"}
+    {"id": "1", "op": "cancel"}                          -> {"id": "1", "type": "cancelled"}
+    {"id": "2", "op": "ping"}                            -> {"id": "2", "type": "pong"}
+    {"id": "3", "op": "shutdown"}                        -> {"id": "3", "type": "bye"}
+Los errores se reportan como {"id": ..., "type": "error", "error": "..."}.
+
+Los prompts se atienden en paralelo (pool acotado de hilos). Prompts idénticos en vuelo
+(mismo workspace y prompt normalizado) comparten una sola llamada al LLM; cancelar un id
+lo desuscribe y, si nadie más espera esa respuesta, corta la generación entre fragmentos.
+"""
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+
+
+def default_dedupe_key(request):
+    """Solicitudes con la misma clave se resuelven con una sola llamada upstream"""
+    prompt = ' '.join(str(request.get('prompt', '')).lower().split())
+    return (request.get('workspace'), prompt)
+
+
+class _InFlight:
+    """Una llamada upstream en curso y los ids de solicitud que esperan su resultado"""
+
+    def __init__(self, key):
+        self.key = key
+        self.subscribers = []          # [(request_id, stream)]
+        self.chunks = []               # fragmentos ya emitidos (para suscriptores tardíos)
+        self.cancel_event = threading.Event()
+
+
+class BackendDaemon:
+    def __init__(self, handler, input_stream, output_stream, max_workers=DEFAULT_WORKERS,
+                 dedupe_key=default_dedupe_key):
+        # handler(request) -> iterable de fragmentos (o str) con la respuesta para una solicitud 'prompt'
+        self.handler = handler
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.max_workers = max(1, max_workers)
+        self.dedupe_key = dedupe_key
+        self._write_lock = threading.Lock()
+        # Estado de solicitudes en vuelo: clave -> _InFlight, id -> _InFlight
+        self._flights_lock = threading.Lock()
+        self._flights = {}
+        self._by_id = {}
+        self._executor = None
+
+    def send(self, message):
+        """Escribe un mensaje del protocolo (una línea JSON) y hace flush inmediato"""
+        line = json.dumps(message, ensure_ascii=True)
+        with self._write_lock:
+            self.output_stream.write(line + '\n')
+            self.output_stream.flush()
+
+    def serve_forever(self):
+        """Lee solicitudes hasta EOF o hasta recibir 'shutdown'"""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='agentesting')
+        self.send({'id': None, 'type': 'ready', 'pid': os.getpid(), 'workers': self.max_workers})
+        try:
+            for line in self.input_stream:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('la solicitud debe ser un objeto JSON')
+                except ValueError as e:
+                    self.send({'id': None, 'type': 'error', 'error': f'Solicitud inválida: {e}'})
+                    continue
+                if not self.handle_request(request):
+                    break
+        finally:
+            # EOF o shutdown: se terminan las solicitudes ya aceptadas antes de salir
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def handle_request(self, request):
+        """
+        Procesa una solicitud. Retorna False cuando el daemon debe terminar.
+        Dentro de serve_forever los prompts se encolan en el pool; fuera (p. ej. --stream)
+        se resuelven en el hilo actual.
+        """
+        request_id = request.get('id')
+        op = request.get('op', 'prompt')
+
+        if op == 'shutdown':
+            self.send({'id': request_id, 'type': 'bye'})
+            return False
+        if op == 'ping':
+            self.send({'id': request_id, 'type': 'pong'})
+            return True
+        if op == 'cancel':
+            self.cancel(request_id)
+            return True
+        if op != 'prompt':
+            self.send({'id': request_id, 'type': 'error', 'error': f'Operación desconocida: {op}'})
+            return True
+        if not request.get('prompt'):
+            self.send({'id': request_id, 'type': 'error', 'error': "Falta el campo 'prompt'"})
+            return True
+
+        flight = self._subscribe(request)
+        if flight is not None:
+            if self._executor is not None:
+                self._executor.submit(self._run_flight, flight, request)
+            else:
+                self._run_flight(flight, request)
+        return True
+
+    def cancel(self, request_id):
+        """Desuscribe un id; si la llamada upstream queda sin interesados, se detiene"""
+        with self._flights_lock:
+            flight = self._by_id.pop(request_id, None)
+            if flight is not None:
+                flight.subscribers = [s for s in flight.subscribers if s[0] != request_id]
+                if not flight.subscribers:
+                    flight.cancel_event.set()
+                    self._flights.pop(flight.key, None)
+        if flight is None:
+            self.send({'id': request_id, 'type': 'error', 'error': 'No hay una solicitud en curso con ese id'})
+        else:
+            self.send({'id': request_id, 'type': 'cancelled'})
+
+    def _subscribe(self, request):
+        """Une la solicitud a una llamada en vuelo idéntica; retorna la nueva _InFlight si hay que lanzarla"""
+        request_id = request.get('id')
+        stream = bool(request.get('stream'))
+        key = self.dedupe_key(request)
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.subscribers.append((request_id, stream))
+                self._by_id[request_id] = flight
+                if stream:
+                    # Reenviar lo ya generado dentro del lock: ningún fragmento nuevo se intercala
+                    for chunk in flight.chunks:
+                        self.send({'id': request_id, 'type': 'chunk', 'data': chunk})
+                return None
+            flight = _InFlight(key)
+            flight.subscribers.append((request_id, stream))
+            self._flights[key] = flight
+            self._by_id[request_id] = flight
+            return flight
+
+    def _finish(self, flight):
+        """Retira la llamada de las tablas y retorna los suscriptores que quedaban"""
+        with self._flights_lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            subscribers = list(flight.subscribers)
+            for request_id, _ in subscribers:
+                if self._by_id.get(request_id) is flight:
+                    del self._by_id[request_id]
+            flight.subscribers = []
+        return subscribers
+
+    def _run_flight(self, flight, request):
+        if flight.cancel_event.is_set():
+            return  # cancelada mientras esperaba un hilo libre
+        chunks = None
+        try:
+            chunks = self.handler(request)
+            if isinstance(chunks, str):
+                chunks = [chunks]
+            for chunk in chunks:
+                if flight.cancel_event.is_set():
+                    break
+                with self._flights_lock:
+                    flight.chunks.append(chunk)
+                    # Cada fragmento sale apenas llega: el cliente renderiza progresivamente
+                    for request_id, stream in flight.subscribers:
+                        if stream:
+                            self.send({'id': request_id, 'type': 'chunk', 'data': chunk})
+        except Exception as e:
+            message = {'type': 'error', 'error': str(e), 'traceback': traceback.format_exc()}
+            for request_id, _ in self._finish(flight):
+                self.send(dict({'id': request_id}, **message))
+            return
+        finally:
+            # Cerrar el generador corta el streaming HTTP subyacente si se canceló
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+        response = ''.join(flight.chunks)
+        for request_id, stream in self._finish(flight):
+            if stream:
+                self.send({'id': request_id, 'type': 'done'})
+            else:
+                self.send({'id': request_id, 'type': 'response', 'response': response})
+
+# Uso:
+# daemon = BackendDaemon(lambda request: '...', sys.stdin, sys.stdout, max_workers=4)
+# daemon.serve_forever()
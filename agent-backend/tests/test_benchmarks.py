@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.bench_backend import percentile, run_once
+from benchmarks.synthetic_workspace import generate_workspace
+from benchmarks.synthetic_project import generate_project
+from benchmarks import bench_training
+
+class TestBenchmarks(unittest.TestCase):
+    def test_percentiles(self):
+        self.assertEqual(percentile([5, 1, 3], 0.5), 3)
+        self.assertAlmostEqual(percentile([10, 20], 0.95), 19.5)
+
+    def test_workspace_sintetico_es_reproducible(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            self.assertEqual(generate_workspace(a, files=12), generate_workspace(b, files=12))
+            archivos = [f for _, _, fs in os.walk(a) for f in fs]
+            self.assertEqual(len(archivos), 12)
+
+    def test_corrida_mide_todas_las_fases(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_workspace(tmp, files=9)
+            resultado = run_once(tmp, 'automatizar login', 0, 0)
+        self.assertEqual(resultado['llm_calls'], 1)
+        for fase in ['import_cli', 'index_cold', 'index_warm', 'model_init', 'build_messages', 'llm_total']:
+            self.assertIn(fase, resultado['timings'])
+
+    def test_proyecto_de_entrenamiento_y_corrida(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            proyecto = os.path.join(tmp, 'proyecto')
+            generado = generate_project(proyecto, files=21)
+            self.assertEqual(generado['by_kind']['screen'], 3)
+            self.assertEqual(generate_project(os.path.join(tmp, 'otro'), files=21)['bytes'], generado['bytes'])
+            artefacto = os.path.join(tmp, 'training_data.json')
+            resultado = bench_training.run_once('HybridTrainingEngine', proyecto, artefacto)
+        self.assertGreater(resultado['artifact_bytes'], 0)
+        self.assertEqual(resultado['skipped_files'], 0)
+        self.assertGreaterEqual(resultado['total_s'], resultado['analyze_s'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.stub_llm import StubLLM
+from model.contextual_model import ContextualModel
+from model.response_cache import ResponseCache
+
+
+class TestContextualModelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.model = ContextualModel(
+            {'frameworks': ['Selenium'], 'total_files': 10, 'generation': 1},
+            model_path=os.path.join(self.tmp, 'context_model.pkl'),
+            response_cache=ResponseCache(':memory:'),
+            llm=StubLLM(first_token_latency=0, chunk_latency=0, chunks=2)
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_archivos_nuevos_no_invalidan_la_cache(self):
+        namespace = self.model._cache_namespace
+        # El watcher suma archivos (por ejemplo los que crea _create_suggested_files)
+        self.model.update_index({'frameworks': ['Selenium'], 'total_files': 11, 'generation': 2})
+        self.assertEqual(self.model._cache_namespace, namespace)
+        self.assertEqual(self.model.index_generation, 2)
+        # Un framework nuevo sí cambia el contexto y por lo tanto el namespace
+        self.model.update_index({'frameworks': ['Selenium', 'Appium'], 'total_files': 11, 'generation': 3})
+        self.assertNotEqual(self.model._cache_namespace, namespace)
+
+    def test_resultados_por_solicitud_no_se_mezclan_entre_hilos(self):
+        self.model._response_cache.put('explica los waits', self.model._cache_namespace, 'respuesta cacheada')
+        barrera = threading.Barrier(2)
+        vistos = {}
+
+        def atender(prompt):
+            respuesta = self.model.generate_response(prompt)
+            barrera.wait(timeout=10)  # las dos solicitudes terminan antes de leer sus resultados
+            vistos[prompt] = (respuesta, self.model.last_cache_match, self.model.last_prompt_report)
+
+        hilos = [threading.Thread(target=atender, args=(p,)) for p in ('explica los waits', 'explica los locators')]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=10)
+
+        respuesta, match, reporte = vistos['explica los waits']
+        self.assertEqual(respuesta, 'respuesta cacheada')
+        self.assertEqual(match.response, 'respuesta cacheada')
+        self.assertIsNone(reporte)
+        respuesta, match, reporte = vistos['explica los locators']
+        self.assertIsNone(match)
+        self.assertIn('explica los locators', reporte.user)
+        # El hilo principal no atendió ninguna solicitud
+        self.assertIsNone(self.model.last_cache_match)
+
+
+if __name__ == '__main__':
+    unittest.main()
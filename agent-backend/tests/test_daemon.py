@@ -0,0 +1,154 @@
+import unittest
+import io
+import json
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from server.daemon import BackendDaemon
+
+def ejecutar_daemon(lineas, handler, max_workers=4):
+    entrada = io.StringIO(''.join(json.dumps(l) + '\n' if not isinstance(l, str) else l for l in lineas))
+    salida = io.StringIO()
+    BackendDaemon(handler, entrada, salida, max_workers=max_workers).serve_forever()
+    return [json.loads(l) for l in salida.getvalue().splitlines()]
+
+def por_id(mensajes):
+    resultado = {}
+    for m in mensajes:
+        resultado.setdefault(m['id'], []).append(m)
+    return resultado
+
+class EntradaControlada:
+    """stdin simulado: entrega cada línea solo cuando el test lo permite"""
+    def __init__(self):
+        self.lineas = []
+        self.disponible = threading.Condition()
+        self.cerrada = False
+
+    def enviar(self, mensaje):
+        with self.disponible:
+            self.lineas.append(json.dumps(mensaje) + '\n')
+            self.disponible.notify()
+
+    def cerrar(self):
+        with self.disponible:
+            self.cerrada = True
+            self.disponible.notify()
+
+    def __iter__(self):
+        while True:
+            with self.disponible:
+                while not self.lineas and not self.cerrada:
+                    self.disponible.wait()
+                if not self.lineas:
+                    return
+                linea = self.lineas.pop(0)
+            yield linea
+
+class TestBackendDaemon(unittest.TestCase):
+    def test_responde_con_id(self):
+        mensajes = ejecutar_daemon(
+            [{'id': 'a', 'prompt': 'login'}, {'id': 'b', 'prompt': 'carrito'}],
+            lambda request: f"respuesta: {request['prompt']}"
+        )
+        self.assertEqual(mensajes[0]['type'], 'ready')
+        respuestas = por_id(mensajes[1:])
+        self.assertEqual(respuestas['a'], [{'id': 'a', 'type': 'response', 'response': 'respuesta: login'}])
+        self.assertEqual(respuestas['b'], [{'id': 'b', 'type': 'response', 'response': 'respuesta: carrito'}])
+
+    def test_errores_no_detienen_el_daemon(self):
+        def handler(request):
+            raise RuntimeError('fallo LLM')
+        mensajes = ejecutar_daemon(
+            ['no es json\n', {'id': 1, 'prompt': 'x'}, {'id': 2, 'op': 'ping'}],
+            handler
+        )
+        self.assertEqual(mensajes[1]['type'], 'error')
+        respuestas = por_id(mensajes[2:])
+        self.assertEqual(respuestas[1][0]['type'], 'error')
+        self.assertIn('fallo LLM', respuestas[1][0]['error'])
+        self.assertEqual(respuestas[2], [{'id': 2, 'type': 'pong'}])
+
+    def test_stream_emite_fragmentos(self):
+        mensajes = ejecutar_daemon(
+            [{'id': 's', 'prompt': 'login', 'stream': True}],
+            lambda request: iter(['public class ', 'LoginScreen {}'])
+        )
+        self.assertEqual(mensajes[1:], [
+            {'id': 's', 'type': 'chunk', 'data': 'public class '},
+            {'id': 's', 'type': 'chunk', 'data': 'LoginScreen {}'},
+            {'id': 's', 'type': 'done'}
+        ])
+
+    def test_prompts_identicos_comparten_llamada(self):
+        llamadas = []
+        liberar = threading.Event()
+        def handler(request):
+            llamadas.append(request['id'])
+            yield 'parte 1 '
+            liberar.wait(5)
+            yield 'parte 2'
+
+        entrada = EntradaControlada()
+        salida = io.StringIO()
+        daemon = BackendDaemon(handler, entrada, salida)
+        hilo = threading.Thread(target=daemon.serve_forever)
+        hilo.start()
+        entrada.enviar({'id': 'a', 'prompt': 'Automatizar login', 'stream': True})
+        while not llamadas:
+            time.sleep(0.01)
+        entrada.enviar({'id': 'b', 'prompt': 'automatizar   LOGIN'})
+        entrada.enviar({'id': 'c', 'prompt': 'automatizar login', 'stream': True})
+        entrada.enviar({'id': 'p', 'op': 'ping'})
+        while 'pong' not in salida.getvalue():
+            time.sleep(0.01)
+        liberar.set()
+        entrada.cerrar()
+        hilo.join(5)
+
+        respuestas = por_id(json.loads(l) for l in salida.getvalue().splitlines())
+        self.assertEqual(llamadas, ['a'])
+        self.assertEqual(respuestas['b'], [{'id': 'b', 'type': 'response', 'response': 'parte 1 parte 2'}])
+        self.assertEqual([m.get('data') for m in respuestas['c']], ['parte 1 ', 'parte 2', None])
+        self.assertEqual(respuestas['c'][-1]['type'], 'done')
+
+    def test_cancelar_detiene_la_generacion(self):
+        emitidos = []
+        primer_fragmento = threading.Event()
+        cancelado = threading.Event()
+        def handler(request):
+            for i in range(100):
+                emitidos.append(i)
+                yield f'{i} '
+                primer_fragmento.set()
+                cancelado.wait(5)
+
+        entrada = EntradaControlada()
+        salida = io.StringIO()
+        hilo = threading.Thread(target=BackendDaemon(handler, entrada, salida).serve_forever)
+        hilo.start()
+        entrada.enviar({'id': 'x', 'prompt': 'generar suite completa', 'stream': True})
+        primer_fragmento.wait(5)
+        entrada.enviar({'id': 'x', 'op': 'cancel'})
+        while 'cancelled' not in salida.getvalue():
+            time.sleep(0.01)
+        cancelado.set()
+        entrada.cerrar()
+        hilo.join(5)
+
+        mensajes = [json.loads(l) for l in salida.getvalue().splitlines()]
+        self.assertIn({'id': 'x', 'type': 'cancelled'}, mensajes)
+        self.assertNotIn({'id': 'x', 'type': 'done'}, mensajes)
+        self.assertLessEqual(len(emitidos), 2)
+
+    def test_shutdown(self):
+        mensajes = ejecutar_daemon(
+            [{'id': 1, 'op': 'shutdown'}, {'id': 2, 'prompt': 'ignorado'}],
+            lambda request: 'no debería ejecutarse'
+        )
+        self.assertEqual(mensajes[-1], {'id': 1, 'type': 'bye'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import itertools
+import os
+import sys
+import tempfile
+import shutil
+from unittest import mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.stub_http import StubHTTPServer, respuesta
+from integracion_jira import JiraExporter
+import integracion_testrail
+from transporte_http import TransporteHTTP, LimitadorTasa
+
+
+def jira_bulk(request):
+    """Crea todos los issues del lote salvo los que tengan 'falla' en el resumen"""
+    issues, errores = [], []
+    for posicion, update in enumerate(request.body['issueUpdates']):
+        resumen = update['fields']['summary']
+        if 'falla' in resumen:
+            errores.append({'status': 400, 'failedElementNumber': posicion,
+                            'elementErrors': {'errors': {'summary': 'inválido'}}})
+        else:
+            issues.append({'key': 'QA-' + resumen.split()[-1]})
+    return respuesta(201 if issues else 400, {'issues': issues, 'errors': errores})
+
+
+def responder_testrail(ids):
+    """add_case asigna ids correlativos; update_case devuelve el mismo caso"""
+    def responder(request):
+        accion, _, valor = request.path.split('/api/v2/', 1)[1].partition('/')
+        return respuesta(200, {'id': next(ids) if accion == 'add_case' else int(valor)})
+    return responder
+
+
+class TestExportacionMasiva(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.stub = StubHTTPServer(jira_bulk).start()
+        self.http = TransporteHTTP(read_timeout=5, sleep=lambda s: None)
+        self.env = mock.patch.dict(os.environ, {'JIRA_URL': self.stub.url, 'JIRA_USER': 'qa', 'JIRA_TOKEN': 't',
+                                                'TESTRAIL_URL': self.stub.url, 'TESTRAIL_USER': 'qa',
+                                                'TESTRAIL_TOKEN': 't'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.http.cerrar()
+        self.stub.stop()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_jira_bulk_por_lotes_con_fallas_parciales_y_checkpoint(self):
+        items = [{'resumen': f'Escenario {i}', 'descripcion': 'Feature: x'} for i in range(5)]
+        items.insert(3, {'resumen': 'Escenario que falla 99', 'descripcion': 'Feature: y'})
+        checkpoint = os.path.join(self.dir, 'jira_checkpoint.json')
+        exporter = JiraExporter(self.http)
+
+        resultados = exporter.exportar_features('QA', items, chunk_size=2, paralelo=2, checkpoint=checkpoint)
+        self.assertEqual([r['estado'] for r in resultados], ['creado'] * 3 + ['error'] + ['creado'] * 2)
+        self.assertEqual([r['key'] for r in resultados if r['key']], ['QA-0', 'QA-1', 'QA-2', 'QA-3', 'QA-4'])
+        self.assertEqual(resultados[3]['error'], 'inválido')
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertTrue(all(r.path == '/rest/api/2/issue/bulk' for r in self.stub.requests))
+
+        # Reanudar: solo se reintenta el ítem que falló
+        items[3] = {'resumen': 'Escenario 5', 'descripcion': 'Feature: y'}
+        resultados = exporter.exportar_features('QA', items, chunk_size=2, checkpoint=checkpoint)
+        self.assertEqual([r['estado'] for r in resultados].count('omitido'), 5)
+        self.assertEqual(resultados[3]['key'], 'QA-5')
+        self.assertEqual(len(self.stub.requests[-1].body['issueUpdates']), 1)
+
+    def test_jira_checkpoint_por_defecto_en_la_carpeta_de_salida(self):
+        items = [{'resumen': 'Escenario 7', 'descripcion': 'Feature: x'}]
+        with mock.patch.dict('config.CONFIG', {'CARPETA_SALIDA': self.dir}):
+            self.assertEqual(JiraExporter(self.http).exportar_features('QA', items)[0]['estado'], 'creado')
+            self.assertEqual(JiraExporter(self.http).exportar_features('QA', items)[0]['estado'], 'omitido')
+        self.assertTrue(os.path.exists(os.path.join(self.dir, '.jira_checkpoint.json')))
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_testrail_no_duplica_y_actualiza_los_modificados(self):
+        self.stub.responder = responder_testrail(itertools.count(101))
+        esperas = []
+        reloj = itertools.count(0, 0)  # el tiempo no avanza: solo cuenta la ráfaga del bucket
+        limitador = LimitadorTasa(60, rafaga=2, reloj=lambda: next(reloj), sleep=esperas.append)
+        exporter = integracion_testrail.TestRailExporter(self.http, limitador)
+        items = [{'id': f'f{i}.feature', 'resumen': f'Feature {i}', 'descripcion': 'Scenario: a'} for i in range(3)]
+        checkpoint = os.path.join(self.dir, 'testrail_checkpoint.json')
+
+        resultados = exporter.exportar_features(7, items, paralelo=3, checkpoint=checkpoint)
+        self.assertEqual([r['estado'] for r in resultados], ['creado'] * 3)
+        self.assertEqual(sorted(r['case_id'] for r in resultados), [101, 102, 103])
+        self.assertEqual(len(esperas), 1)  # 3 solicitudes con ráfaga de 2 a 1/s: una espera
+        self.assertAlmostEqual(esperas[0], 1.0)
+
+        items[1] = dict(items[1], descripcion='Scenario: b')
+        resultados = exporter.exportar_features(7, items, checkpoint=checkpoint)
+        self.assertEqual([r['estado'] for r in resultados], ['omitido', 'actualizado', 'omitido'])
+        ultimo = self.stub.requests[-1]
+        self.assertEqual(len(self.stub.requests), 4)
+        self.assertTrue(ultimo.path.endswith(f"update_case/{resultados[1]['case_id']}"))
+        self.assertEqual(ultimo.body['custom_description'], 'Scenario: b')
+
+        # Renombrar un feature con id estable actualiza su caso; el checkpoint por defecto va a la salida
+        items[0] = dict(items[0], resumen='Feature 0 renombrado')
+        with mock.patch.dict('config.CONFIG', {'CARPETA_SALIDA': self.dir}):
+            os.replace(checkpoint, os.path.join(self.dir, '.testrail_checkpoint.json'))
+            resultados = exporter.exportar_features(7, items)
+        self.assertEqual([r['estado'] for r in resultados], ['actualizado', 'omitido', 'omitido'])
+        self.assertTrue(self.stub.requests[-1].path.endswith(f"update_case/{resultados[0]['case_id']}"))
+
+
+if __name__ == '__main__':
+    unittest.main()
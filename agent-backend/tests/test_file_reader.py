@@ -0,0 +1,65 @@
+import unittest
+import mmap
+import os
+import sys
+import tempfile
+import shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'training')))
+from analysis.file_reader import FileReader, SKIP_BINARY, SKIP_MINIFIED, SKIP_TOO_LARGE
+from analysis.indicators import HYBRID_INDICATORS
+from hybrid_trainer import HybridTrainingEngine
+
+
+class TestFileReader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def escribir(self, nombre, contenido):
+        ruta = os.path.join(self.dir, nombre)
+        with open(ruta, 'wb') as f:
+            f.write(contenido)
+        return ruta
+
+    def test_omite_binarios_minificados_y_grandes(self):
+        reader = FileReader(max_bytes=10000)
+        fuente = self.escribir('Login.java', b'public class Login {}\n')
+        binario = self.escribir('Datos.java', b'\x00\x01\x02' * 100)
+        bundle = self.escribir('app.js', b'var a=1;' * 1000)
+        nombre_min = self.escribir('vendor.min.js', b'var a = 1;\n')
+        grande = self.escribir('Grande.java', b'// linea\n' * 2000)
+        self.assertEqual(reader.read(fuente), ('public class Login {}\n', None))
+        self.assertEqual(reader.read(binario), (None, SKIP_BINARY))
+        self.assertEqual(reader.read(bundle), (None, SKIP_MINIFIED))
+        self.assertEqual(reader.read(nombre_min), (None, SKIP_MINIFIED))
+        self.assertEqual(reader.read(grande), (None, SKIP_TOO_LARGE))
+        self.assertEqual(reader.summary(), {SKIP_BINARY: 1, SKIP_MINIFIED: 2, SKIP_TOO_LARGE: 1})
+
+    def test_ventanas_mmap_no_pierden_palabras_en_el_borde(self):
+        window = mmap.ALLOCATIONGRANULARITY
+        # 'selenium' queda partido entre la primera y la segunda ventana
+        contenido = b'x' * (window - 4) + b'selenium\n' + b'y' * window + b'appium\n'
+        ruta = self.escribir('pom.xml', contenido)
+        reader = FileReader(max_bytes=100, window_bytes=window)
+        hits = HYBRID_INDICATORS.scan_windows(reader.iter_windows(ruta, overlap=HYBRID_INDICATORS.overlap))
+        self.assertEqual(hits.counts['Selenium'], 1)
+        self.assertEqual(hits.counts['Appium'], 1)
+
+    def test_entrenador_reporta_omitidos_y_detecta_en_archivos_grandes(self):
+        self.escribir('LoginPage.java', b'import org.openqa.selenium.By;\npublic class LoginPage {}\n')
+        self.escribir('bundle.min.js', b'appium')
+        self.escribir('deps.json', b'{"io.appium": 1,\n' + b'"k": 0,\n' * 300000 + b'}\n')
+        engine = HybridTrainingEngine(self.dir)
+        engine.analyze_project()
+        motivos = dict(engine.skipped_files)
+        self.assertEqual(motivos, {'bundle.min.js': SKIP_MINIFIED, 'deps.json': SKIP_TOO_LARGE})
+        # El JSON grande no se carga entero, pero se escanea por ventanas para la detección
+        self.assertIn('Appium', engine.frameworks)
+        self.assertEqual(engine.project_type, 'hybrid')
+
+
+if __name__ == '__main__':
+    unittest.main()
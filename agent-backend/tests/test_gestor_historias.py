@@ -1,5 +1,5 @@
 import unittest
-from gestor_historias import cargar_historias
+from gestor_historias import cargar_historias, iterar_historias
 
 class TestGestorHistorias(unittest.TestCase):
     def test_cargar_historias_vacia(self):
@@ -17,5 +17,44 @@ class TestGestorHistorias(unittest.TestCase):
         os.remove(f'{carpeta}/HistoriaMock.txt')
         os.rmdir(carpeta)
 
+    def test_iterar_historias_poda_limita_y_decodifica(self):
+        import os
+        import shutil
+        import tempfile
+        carpeta = tempfile.mkdtemp()
+        try:
+            for relativa, datos in [('b/Login.feature', 'Feature: Login'.encode('utf-8')),
+                                    ('a/Cobranza.txt', 'Cobranza en año fiscal'.encode('cp1252')),
+                                    ('node_modules/x/Otra.txt', b'no'), ('target/Gen.java', b'no'),
+                                    ('a/Grande.java', b'x' * 200), ('a/notas.md', b'no')]:
+                os.makedirs(os.path.join(carpeta, os.path.dirname(relativa)), exist_ok=True)
+                with open(os.path.join(carpeta, relativa), 'wb') as f:
+                    f.write(datos)
+            historias = iterar_historias(carpeta, max_bytes=100)
+            primera = next(historias)  # perezoso: entrega antes de recorrer el resto
+            self.assertEqual(primera, {'nombre': os.path.join('a', 'Cobranza.txt'),
+                                       'contenido': 'Cobranza en año fiscal'})
+            self.assertEqual([h['nombre'] for h in historias], [os.path.join('b', 'Login.feature')])
+            # Sin tope explícito no se omite por tamaño
+            self.assertIn(os.path.join('a', 'Grande.java'), [h['nombre'] for h in iterar_historias(carpeta)])
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    def test_historia_de_un_solo_parrafo_largo(self):
+        import os
+        import shutil
+        import tempfile
+        carpeta = tempfile.mkdtemp()
+        try:
+            parrafo = 'Como vendedor quiero registrar la cobranza del cliente para mantener su saldo al día. ' * 60
+            with open(os.path.join(carpeta, 'Historia.txt'), 'w', encoding='utf-8') as f:
+                f.write(parrafo)
+            with open(os.path.join(carpeta, 'Imagen.story'), 'wb') as f:
+                f.write(b'\x89PNG\x00\x00' * 100)
+            self.assertGreater(len(parrafo), 5000)
+            self.assertEqual(cargar_historias(carpeta), [{'nombre': 'Historia.txt', 'contenido': parrafo}])
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,13 @@
 import unittest
+import io
 import os
+import shutil
 import sys
-import os
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import mock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from gestor_historias import generar_artefactos_para_historias
 
@@ -9,6 +15,22 @@ class DummyLLM:
     def analizar_historia(self, historia_usuario):
         return "Feature: LLM\nScenario: LLM generado\nGiven ...\nWhen ...\nThen ..."
 
+class LLMLento:
+    """Responde con demoras decrecientes (la primera historia termina última) y mide la concurrencia"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.activas = 0
+        self.maximo = 0
+
+    def analizar_historia(self, historia_usuario):
+        with self.lock:
+            self.activas += 1
+            self.maximo = max(self.maximo, self.activas)
+        time.sleep(0.2 - 0.03 * int(historia_usuario[-1]))
+        with self.lock:
+            self.activas -= 1
+        return f"Feature: LLM {historia_usuario[-1]}"
+
 class TestGestorHistoriasLLM(unittest.TestCase):
     def setUp(self):
         self.carpeta_historias = "tests/historias"
@@ -32,5 +54,65 @@ class TestGestorHistoriasLLM(unittest.TestCase):
         archivos = os.listdir(self.carpeta_salida)
         self.assertTrue(any(a.endswith('_llm.txt') for a in archivos))
 
+    def test_llm_concurrente_con_salida_en_orden(self):
+        historias = [{'nombre': f'h{i}.txt', 'contenido': f'Historia {i}'} for i in range(5)]
+        llm = LLMLento()
+        salida = io.StringIO()
+        with mock.patch('gestor_historias.iterar_historias', return_value=iter(historias)), redirect_stdout(salida):
+            generar_artefactos_para_historias(self.carpeta_historias, self.carpeta_salida, llm=llm, concurrencia_llm=4)
+        self.assertGreater(llm.maximo, 1)
+        impresos = [linea for linea in salida.getvalue().splitlines() if linea.startswith('ARCHIVO: ')]
+        self.assertEqual([linea for linea in impresos if linea.endswith('_llm.txt')],
+                         [f'ARCHIVO: h{i}.txt_llm.txt' for i in range(5)])
+        with open(os.path.join(self.carpeta_salida, 'h3.txt_llm.txt'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'Feature: LLM 3')
+        self.assertTrue(os.path.exists(os.path.join(self.carpeta_salida, 'h4_gen1_steps.java')))
+
+class TestPipelineConErrores(unittest.TestCase):
+    def ejecutar(self, **kwargs):
+        """Corre el pipeline en otro hilo: si se colgara, el test falla en vez de bloquear la suite"""
+        resultado = {}
+
+        def correr():
+            try:
+                with redirect_stdout(io.StringIO()):
+                    generar_artefactos_para_historias(**kwargs)
+            except Exception as e:
+                resultado['error'] = e
+
+        hilo = threading.Thread(target=correr, daemon=True)
+        hilo.start()
+        hilo.join(timeout=20)
+        self.assertFalse(hilo.is_alive(), 'el pipeline quedó bloqueado')
+        return resultado.get('error')
+
+    def test_historia_malformada_relanza_en_el_llamador(self):
+        salida = tempfile.mkdtemp()
+        try:
+            error = self.ejecutar(ruta_salida=salida, historia_caso={'contenido': 'x'})
+            self.assertIsInstance(error, KeyError)
+        finally:
+            shutil.rmtree(salida, ignore_errors=True)
+
+    def test_render_que_falla_no_bloquea(self):
+        from generador_cucumber import GeneradorCucumber
+        original = GeneradorCucumber.generar_feature
+
+        def generar_feature(generador, nombre):
+            if nombre == 'h7.txt':
+                raise RuntimeError('plantilla rota')
+            return original(generador, nombre)
+
+        historias = [{'nombre': f'h{i}.txt', 'contenido': f'Historia {i}'} for i in range(40)]
+        salida = tempfile.mkdtemp()
+        try:
+            with mock.patch('gestor_historias.iterar_historias', return_value=iter(historias)), \
+                    mock.patch.object(GeneradorCucumber, 'generar_feature', generar_feature):
+                error = self.ejecutar(ruta_carpeta='x', ruta_salida=salida, llm=DummyLLM(), concurrencia_llm=3)
+            self.assertEqual(str(error), 'plantilla rota')
+            self.assertNotIn('h7_gen1.feature', os.listdir(salida))
+        finally:
+            shutil.rmtree(salida, ignore_errors=True)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from analysis.indicators import IndicatorMatcher, HYBRID_INDICATORS, FRAMEWORK_INDICATORS
+
+SCREEN_APPIUM = '''package com.demo.screens;
+import io.appium.java_client.AppiumDriver;
+public class LoginScreen {
+    public TextBox usuario = new TextBox(By.id("com.demo:id/usuario"));
+}
+'''
+
+
+class TestIndicators(unittest.TestCase):
+    def test_cuenta_todas_las_palabras_en_una_pasada(self):
+        matcher = IndicatorMatcher({'movil': ['android', 'androiddriver', 'driver'], 'web': ['chrome']})
+        hits = matcher.scan('AndroidDriver d; android; ChromeDriver c;')
+        # Todas las apariciones: 'androiddriver' también cuenta como 'android' y 'driver'
+        self.assertEqual(hits.keywords['android'], 2)
+        self.assertEqual(hits.keywords['androiddriver'], 1)
+        self.assertEqual(hits.keywords['driver'], 2)
+        self.assertEqual(hits.counts['movil'], 5)
+        self.assertEqual(hits.counts['web'], 1)
+        self.assertEqual(hits.found(), ['movil', 'web'])
+
+    def test_palabras_solapadas(self):
+        hits = HYBRID_INDICATORS.scan('webdriver.get(url)')
+        self.assertEqual(hits.keywords['webdriver'], 1)
+        self.assertEqual(hits.keywords['driver.get'], 1)
+        self.assertEqual(hits.scores['web_file'], 3)
+        # Igual por ventanas: una palabra que cruza el borde se cuenta una sola vez
+        texto = 'x' * 10 + 'webdriver.get(url) ' * 3
+        ventanas = [(texto[i:i + 12 + HYBRID_INDICATORS.overlap], min(12, len(texto) - i))
+                    for i in range(0, len(texto), 12)]
+        por_ventanas = HYBRID_INDICATORS.scan_windows(ventanas)
+        self.assertEqual(por_ventanas.keywords, HYBRID_INDICATORS.scan(texto).keywords)
+        self.assertEqual(por_ventanas.keywords['driver.get'], 3)
+
+    def test_clasificacion_ponderada(self):
+        matcher = IndicatorMatcher({'web': {'by.id': 1}, 'movil': {':id/': 3}})
+        self.assertEqual(matcher.scan('By.id("a:id/b") By.id("c")').best('web', 'movil'), 'movil')
+        self.assertEqual(matcher.scan('By.id("a") By.id("c")').best('web', 'movil'), 'web')
+        self.assertIsNone(matcher.scan('nada').best('web', 'movil'))
+        # Empate: gana la primera categoría indicada
+        empate = IndicatorMatcher({'web': ['x'], 'movil': ['y']}).scan('x y')
+        self.assertEqual(empate.best('web', 'movil'), 'web')
+
+    def test_screen_de_appium_con_by_id_es_movil(self):
+        hits = HYBRID_INDICATORS.scan(SCREEN_APPIUM)
+        self.assertIn('web_file', hits)  # By.id también es indicador web...
+        self.assertEqual(hits.best('web_file', 'mobile_file'), 'mobile_file')  # ...pero pesa más lo móvil
+        self.assertEqual(hits.found(['Cucumber', 'JUnit', 'Appium', 'Selenium']), ['Appium'])
+
+    def test_sensible_a_mayusculas_y_frameworks_por_nombre(self):
+        matcher = IndicatorMatcher({'test': ['@Test']}, ignore_case=False)
+        self.assertNotIn('test', matcher.scan('@test'))
+        self.assertIn('test', matcher.scan('@Test'))
+        self.assertEqual(FRAMEWORK_INDICATORS.scan('login.feature').found(), ['Cucumber'])
+        self.assertEqual(sorted(FRAMEWORK_INDICATORS.scan('login.spec.js').found()), ['Jest'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from analysis.java_lexer import extract_symbols, tokenize
+
+FUENTE = '''package com.demo.pages;
+
+import org.openqa.selenium.By;
+import static org.junit.Assert.assertEquals;
+
+public class LoginPage extends BasePage implements Navegable<String> {
+    // public Button comentado = new Button(By.id("no:id/existe"));
+    /* @Test public void testComentado() {} */
+    private final WebTextBox usuario = new WebTextBox(By.id("com.demo:id/usuario"));
+    public Button ingresar, cancelar;
+    private String texto = "class Falsa { @Test void noEsTest() {} }";
+
+    /**
+     * Valida el ingreso con
+     * credenciales correctas.
+     */
+    @Test(timeout = 10)
+    @DisplayName("login")
+    public void testLogin(final Map<String, List<Integer>> datos, @Nullable String clave) {
+        LoginTask tarea = new LoginTask();
+        assertEquals("ok", tarea.ejecutar());
+        Assert.assertTrue(driver.findElement(By.xpath("//input")).isDisplayed());
+    }
+
+    @Given("el usuario abre la app")
+    public void abrirApp() {
+        if (activo) { navegar(); }
+    }
+}
+'''
+
+
+class TestJavaLexer(unittest.TestCase):
+    def setUp(self):
+        self.simbolos = extract_symbols(FUENTE)
+
+    def test_estructura_de_clase(self):
+        s = self.simbolos
+        self.assertEqual(s.package, 'com.demo.pages')
+        self.assertEqual(s.imports, ['org.openqa.selenium.By', 'org.junit.Assert.assertEquals'])
+        self.assertEqual(s.class_names, ['LoginPage'])
+        self.assertEqual(s.classes[0].extends, 'BasePage')
+        self.assertEqual(s.classes[0].implements, ['Navegable'])
+        campos = [(f.type, f.name) for f in s.fields]
+        self.assertEqual(campos, [('WebTextBox', 'usuario'), ('Button', 'ingresar'), ('Button', 'cancelar'), ('String', 'texto')])
+        self.assertEqual(s.fields[0].new_class, 'WebTextBox')
+
+    def test_metodos_anotaciones_y_javadoc(self):
+        s = self.simbolos
+        tests = s.methods_annotated('Test')
+        self.assertEqual([m.name for m in tests], ['testLogin'])
+        self.assertEqual(tests[0].javadoc, 'Valida el ingreso con credenciales correctas.')
+        self.assertEqual(tests[0].params, [('Map<String,List<Integer>>', 'datos'), ('String', 'clave')])
+        steps = s.methods_annotated('Given')
+        self.assertEqual(steps[0].annotations[0].args, ['el usuario abre la app'])
+        self.assertIsNone(steps[0].javadoc)
+
+    def test_no_busca_dentro_de_comentarios_ni_strings(self):
+        s = self.simbolos
+        self.assertNotIn('Falsa', s.class_names)
+        self.assertNotIn('testComentado', [m.name for m in s.methods])
+        self.assertNotIn('noEsTest', [m.name for m in s.methods])
+        self.assertNotIn('no:id/existe', s.strings)
+        self.assertIn('class Falsa { @Test void noEsTest() {} }', s.strings)
+
+    def test_llamadas_e_instanciaciones(self):
+        s = self.simbolos
+        self.assertEqual([(c.name, c.string_arg) for c in s.calls_to('By')],
+                         [('id', 'com.demo:id/usuario'), ('xpath', '//input')])
+        nombres = [c.name for c in s.calls]
+        self.assertIn('assertEquals', nombres)
+        self.assertIn('assertTrue', nombres)
+        self.assertNotIn('if', nombres)
+        tarea = [i for i in s.instantiations if i.variable == 'tarea'][0]
+        self.assertEqual((tarea.declared_type, tarea.class_name, tarea.has_args), ('LoginTask', 'LoginTask', False))
+
+    def test_entrada_patologica_es_lineal(self):
+        # El regex anterior (@Test[\s\S]*?void) retrocedía sobre todo el archivo por cada @Test
+        fuente = 'class A { ' + '@Test ' * 20000 + ' }'
+        inicio = time.perf_counter()
+        self.assertEqual(len([t for t in tokenize(fuente) if t.kind == 'annotation']), 20000)
+        extract_symbols(fuente)
+        self.assertLess(time.perf_counter() - inicio, 5)
+
+    def test_localizadores_appium_y_calificados(self):
+        s = extract_symbols('''class LoginScreen {
+            By a = AppiumBy.accessibilityId("btnLogin");
+            By b = MobileBy.xpath("//boton");
+            By c = org.openqa.selenium.By.id("com.demo:id/clave");
+            By d = Nearby.id("no");
+            void m() { this.driver.findElement(By.name("usuario")).click(); }
+        }''')
+        self.assertEqual([(c.name, c.string_arg) for c in s.calls_to('By', suffix=True)],
+                         [('accessibilityId', 'btnLogin'), ('xpath', '//boton'), ('id', 'com.demo:id/clave'),
+                          ('name', 'usuario')])
+        self.assertEqual([c.string_arg for c in s.calls_to('By')], ['usuario'])
+        self.assertIn(('this.driver', 'findElement'), [(c.receiver, c.name) for c in s.calls])
+
+    def test_string_sin_cerrar_no_rompe(self):
+        s = extract_symbols('class B { String x = "sin cierre\n; void m() {} }')
+        self.assertEqual(s.class_names, ['B'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,23 @@
 import unittest
 import sys
 import os
+from unittest import mock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.stub_http import StubHTTPServer
 from integracion_llm import LLMClient
+from transporte_http import TransporteHTTP
 
 class TestLLMClient(unittest.TestCase):
     def setUp(self):
-        self.llm = LLMClient()
+        # Endpoint local de mentira: la prueba no depende de red ni de una API key real
+        self.stub = StubHTTPServer().start()
+        self.stub.encolar(200, {'choices': [{'text': 'Scenario: Inicio de sesión exitoso'}]})
+        with mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'clave-prueba',
+                                          'LLM_API_URL': self.stub.url + '/v1/completions'}):
+            self.llm = LLMClient(TransporteHTTP(read_timeout=5))
+
+    def tearDown(self):
+        self.stub.stop()
 
     def test_analizar_historia(self):
         historia = "Como usuario quiero poder iniciar sesión para acceder a mi perfil."
@@ -14,6 +25,7 @@ class TestLLMClient(unittest.TestCase):
         # El resultado puede variar según el modelo, pero debe ser un string no vacío
         self.assertIsInstance(resultado, str)
         self.assertTrue(len(resultado) > 0 or resultado is None)
+        self.assertIn(historia, self.stub.requests[0].body['prompt'])
 
 if __name__ == "__main__":
     unittest.main()
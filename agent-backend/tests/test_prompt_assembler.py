@@ -0,0 +1,39 @@
+import unittest
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model.prompt_assembler import (PromptAssembler, PromptSection, TRIM_MARKER, approximate_tokens,
+                                    split_attachment)
+
+
+class TestPromptAssembler(unittest.TestCase):
+    def test_recorta_por_prioridad_sin_tocar_las_requeridas(self):
+        assembler = PromptAssembler(budget=300, count=approximate_tokens)
+        linea = 'public TextBox campo = new TextBox(By.id("x"));\n'
+        prompt = assembler.assemble([
+            PromptSection('instrucciones', 'Eres AgentestingMIA. ' * 20, 100, True),
+            PromptSection('ejemplo_respuesta', 'Ejemplo fijo. ' * 50, 20),
+            PromptSection('recuperados', linea * 10, 60),
+            PromptSection('pedido', 'automatizar vendedores ' * 10, 100, True, 'user'),
+            PromptSection('adjunto', linea * 40, 70, False, 'user'),
+        ])
+        tamanos = {nombre: (antes, despues) for nombre, antes, despues in prompt.sections}
+        self.assertLessEqual(prompt.total, 300)
+        self.assertEqual(tamanos['ejemplo_respuesta'][1], 0)      # menor prioridad: se quita primero
+        self.assertEqual(tamanos['instrucciones'][0], tamanos['instrucciones'][1])
+        self.assertNotIn('Ejemplo fijo', prompt.system)
+        self.assertTrue(prompt.user.startswith('automatizar vendedores'))
+        self.assertIn(TRIM_MARKER, prompt.user + prompt.system)
+
+    def test_sin_exceso_no_recorta_y_separa_el_adjunto(self):
+        pedido, adjunto = split_attachment('crea la clase Login\n\n📁 **ARCHIVO ADJUNTO: Login.java**\n```java\n```')
+        self.assertEqual(pedido, 'crea la clase Login')
+        self.assertTrue(adjunto.startswith('📁'))
+        prompt = PromptAssembler(budget=1000, count=approximate_tokens).assemble([
+            PromptSection('pedido', pedido, 100, True, 'user'), PromptSection('adjunto', adjunto, 70, False, 'user')])
+        self.assertEqual(prompt.system, '')
+        self.assertEqual(prompt.user, pedido + '\n\n' + adjunto)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model import prompt_similarity as ps
+from model.response_cache import ResponseCache
+
+def firma(texto):
+    return ps.minhash(ps.features(texto))
+
+class TestPromptSimilarity(unittest.TestCase):
+    def test_normalizacion(self):
+        self.assertEqual(ps.tokenize('Automatiza el login'), ps.tokenize('automatizar LOGIN por favor'))
+        self.assertEqual(ps.tokenize('Clientes'), ps.tokenize('cliente'))
+        self.assertEqual(ps.tokenize('automatización'), ps.tokenize('automatizar'))
+
+    def test_similitud(self):
+        self.assertGreaterEqual(ps.similarity(firma('automatiza el login'), firma('automatizar login por favor')), 0.9)
+        self.assertLess(ps.similarity(firma('automatizar login'), firma('automatizar carrito de compras')), 0.5)
+        self.assertIsNone(firma('por favor'))
+
+    def test_no_confunde_entidades_distintas(self):
+        pares = [('automatizar ProductListScreen', 'automatizar ProductDetailScreen'),
+                 ('automatizar productos', 'automatizar productividad'),
+                 ('automatizar LoginScreen', 'automatizar LoginScreenTest'),
+                 ('automatizar login 2', 'automatizar login 3')]
+        for a, b in pares:
+            rasgos_a, rasgos_b = ps.features(a), ps.features(b)
+            self.assertLess(len(rasgos_a & rasgos_b) / len(rasgos_a | rasgos_b), 0.95, (a, b))
+        self.assertNotEqual(ps.tokenize('productos'), ps.tokenize('productividad'))
+        self.assertEqual(ps.anchors('Automatizar LoginScreen 2'), ['2', 'loginscreen'])
+        cache = ResponseCache(':memory:')
+        for a, b in pares:
+            cache.put(a, 'ctx', f'respuesta de {a}')
+            self.assertIsNone(cache.lookup(b, 'ctx'), (a, b))
+        # Con identificadores distintos no se reutiliza ni con un umbral permisivo
+        self.assertIsNone(cache.lookup('automatizar login 3', 'ctx', similarity_threshold=0.5))
+        self.assertEqual(cache.lookup('automatizar el login 2', 'ctx', similarity_threshold=0.5).response,
+                         'respuesta de automatizar login 2')
+        cache.close()
+
+    def test_lookup_similar_en_cache(self):
+        cache = ResponseCache(':memory:')
+        cache.put('automatiza el login', 'ctx', 'LoginScreen')
+        match = cache.lookup('Automatizar login por favor', 'ctx', similarity_threshold=0.8)
+        self.assertEqual(match.response, 'LoginScreen')
+        self.assertEqual(match.prompt, 'automatiza el login')
+        self.assertIsNone(cache.lookup('automatizar login', 'otro-ctx', similarity_threshold=0.8))
+        self.assertIsNone(cache.lookup('automatizar logout', 'ctx', similarity_threshold=0.8))
+        self.assertEqual(cache.stats()['similar_hits'], 1)
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
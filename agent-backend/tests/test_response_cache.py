@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'responses.sqlite3')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persistencia_entre_instancias(self):
+        cache = ResponseCache(self.path)
+        cache.put('Automatizar login', 'ctx', 'LoginScreen...')
+        cache.close()
+        cache = ResponseCache(self.path)
+        self.assertEqual(cache.get('  automatizar   LOGIN ', 'ctx'), 'LoginScreen...')
+        self.assertIsNone(cache.get('automatizar login', 'otro-contexto'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        cache.close()
+
+    def test_ttl(self):
+        cache = ResponseCache(self.path, ttl=0.05)
+        cache.put('carrito', 'ctx', 'respuesta')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('carrito', 'ctx'))
+        self.assertEqual(cache.stats()['entries'], 0)
+        cache.close()
+
+    def test_evict_lru(self):
+        cache = ResponseCache(self.path, max_entries=2)
+        cache.put('login', 'ctx', 'a')
+        cache.put('carrito', 'ctx', 'b')
+        time.sleep(0.01)
+        cache.get('login', 'ctx')  # login pasa a ser el más reciente
+        cache.put('clientes', 'ctx', 'c')
+        self.assertEqual(cache.get('login', 'ctx'), 'a')
+        self.assertIsNone(cache.get('carrito', 'ctx'))
+        self.assertEqual(cache.last_response('ctx'), 'a')
+        cache.close()
+
+    def test_clear(self):
+        cache = ResponseCache(self.path)
+        cache.put('login', 'ctx', 'a')
+        cache.get('login', 'ctx')
+        cache.clear()
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['hits']), (0, 0))
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
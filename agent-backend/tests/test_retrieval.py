@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from training.artifact import TrainingArtifact, write_artifact
+from training.retrieval import build_training_index, select_within_budget, split_identifiers
+
+
+class TestRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.groups = {
+            'training_examples': [
+                {'prompt': "Genera las clases para 'historialVentas'", 'response': 'HistorialVentasScreen'},
+                {'prompt': "Genera las clases para 'vendedores'", 'response': 'VendedorScreen'},
+            ],
+            'page_objects': [
+                {'class_name': 'CobranzaScreen', 'mobile_controls': [{'name': 'montoTextBox', 'type': 'TextBox'}],
+                 'sample_code': 'vendedores vendedores vendedores'},
+                {'class_name': 'CarritoScreen', 'mobile_controls': [{'name': 'agregarButton', 'type': 'Button'}]},
+            ],
+            'step_definitions': [{'file': 'CarritoSteps.java', 'steps': ['el usuario agrega al carrito']}],
+        }
+
+    def test_prioriza_la_entidad_del_prompt(self):
+        index = build_training_index(self.groups)
+        self.assertEqual(split_identifiers('VendedoresScreen.tapIngresar'), 'Vendedores Screen.tap Ingresar')
+        # El código de muestra no se indexa: 'vendedores' solo coincide con su ejemplo
+        self.assertEqual([(kind, i) for _, kind, i in index.search('automatizar vendedores')],
+                         [('training_examples', 1)])
+        self.assertEqual({(kind, i) for _, kind, i in index.search('automatiza el carrito de compras')},
+                         {('page_objects', 1), ('step_definitions', 0)})
+        self.assertEqual(index.search('automatizar login'), [])
+
+    def test_indice_guardado_en_el_artefacto_y_presupuesto(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'training_data.json')
+            write_artifact(path, {'patterns': {k: v for k, v in self.groups.items() if k != 'training_examples'},
+                                  'training_examples': self.groups['training_examples']})
+            artifact = TrainingArtifact.open(path)
+            _, kind, position = artifact.retrieval_index().search('cobranza')[0]
+            self.assertEqual(artifact.item(kind, position)['class_name'], 'CobranzaScreen')
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        selected, used = select_within_budget(['a' * 400, 'b' * 40, 'c' * 40], budget=30)
+        self.assertEqual(selected, ['b' * 40, 'c' * 40])
+        self.assertLessEqual(used, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from training.artifact import TrainingArtifact, write_artifact
+from model.training_loader import TrainingDataLoader
+
+
+class TestTrainingArtifact(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'training_data.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_manifiesto_chico_y_shards_perezosos(self):
+        page_objects = [{'class_name': f'Pantalla{i}Screen', 'sample_code': 'x' * 500} for i in range(200)]
+        write_artifact(self.path, {
+            'patterns': {'page_objects': page_objects, 'utilities': []},
+            'training_prompt': 'Eres un especialista',
+            'project_path': '/proyecto'
+        })
+        # El manifiesto no crece con la cantidad de patrones
+        self.assertLess(os.path.getsize(self.path), 1000)
+        artifact = TrainingArtifact.open(self.path)
+        self.assertEqual(artifact.get('training_prompt'), 'Eres un especialista')
+        self.assertEqual(artifact.counts, {'page_objects': 200, 'utilities': 0})
+        self.assertEqual(artifact.pattern('page_objects', 137)['class_name'], 'Pantalla137Screen')
+        self.assertEqual(len(artifact.patterns('page_objects', limit=4)), 4)
+        self.assertEqual(artifact.to_dict()['patterns']['page_objects'], page_objects)
+
+    def test_reescritura_conserva_ejemplos_y_limpia_generaciones(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'patterns': {'page_objects': [{'class_name': 'LoginScreen'}]},
+                       'training_examples': [{'prompt': 'p', 'response': 'r'}]}, f, indent=2)
+        legacy = TrainingArtifact.open(self.path)
+        self.assertEqual(legacy.version, 1)
+        self.assertEqual(legacy.patterns('page_objects'), [{'class_name': 'LoginScreen'}])
+
+        for run in range(3):
+            write_artifact(self.path, {'page_objects': [{'class_name': f'Run{run}'}],
+                                       'web_pages': [], 'project_type': 'hybrid', 'frameworks': ['Appium']})
+        artifact = TrainingArtifact.open(self.path)
+        self.assertEqual(artifact.get('training_examples'), [{'prompt': 'p', 'response': 'r'}])
+        self.assertEqual(artifact.get('frameworks'), ['Appium'])
+        self.assertEqual(artifact.patterns('page_objects'), [{'class_name': 'Run2'}])
+        self.assertEqual(artifact.count('web_pages'), 0)
+        # Solo quedan la generación actual y la anterior
+        self.assertEqual(len(os.listdir(os.path.join(self.dir, 'training_data.shards'))), 2)
+        self.assertNotIn('.tmp-', ''.join(os.listdir(self.dir)))
+
+    def test_loader_parsea_una_vez_y_recarga_si_cambia(self):
+        write_artifact(self.path, {'patterns': {'page_objects': [{'class_name': 'LoginScreen'}]}})
+        loader = TrainingDataLoader()
+        primero = loader.artifact(self.path)
+        self.assertIs(loader.artifact(self.path), primero)
+        self.assertIs(loader.patterns('page_objects', path=self.path), loader.patterns('page_objects', path=self.path))
+        self.assertEqual(loader.stats['loads'], 1)
+
+        write_artifact(self.path, {'patterns': {'page_objects': [{'class_name': 'CarritoScreen'}] * 2}})
+        self.assertEqual(loader.patterns('page_objects', path=self.path), [{'class_name': 'CarritoScreen'}] * 2)
+        self.assertEqual(loader.stats['loads'], 2)
+        os.remove(self.path)
+        self.assertIsNone(loader.artifact(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
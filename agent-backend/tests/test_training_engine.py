@@ -0,0 +1,129 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'training')))
+from training_engine import QATrainingEngine, java_symbols_for
+from hybrid_trainer import HybridTrainingEngine
+from benchmarks.synthetic_workspace import generate_workspace
+
+SCREEN = '''package com.demo.screens;
+import io.appium.java_client.AppiumDriver;
+public class Pantalla{i}Screen {{
+    public TextBox usuario{i} = new TextBox(By.id("com.demo:id/usuario{i}"));
+    public Button ingresar{i} = new Button(By.id("com.demo:id/ingresar{i}"));
+    public void tapIngresar() {{ ingresar{i}.click(); }}
+}}
+'''
+
+TASK = '''package com.demo.tasks;
+import org.junit.Test;
+public class Login{i}Task {{
+    Pantalla{i}Screen pantalla = new Pantalla{i}Screen();
+    public void withCredentials(String usuario) {{ assertTrue(true); assertEquals(1, 1); }}
+    @Test
+    public void testLogin{i}() {{ verify(pantalla); }}
+}}
+'''
+
+def crear_proyecto(raiz, archivos=90):
+    generate_workspace(raiz, files=archivos)
+    destino = os.path.join(raiz, 'src', 'test', 'java', 'com', 'demo', 'mobile')
+    os.makedirs(destino)
+    for i in range(30):
+        with open(os.path.join(destino, f'Pantalla{i}Screen.java'), 'w', encoding='utf-8') as f:
+            f.write(SCREEN.format(i=i))
+        with open(os.path.join(destino, f'Login{i}Task.java'), 'w', encoding='utf-8') as f:
+            f.write(TASK.format(i=i))
+
+class TestAnalisisParalelo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        crear_proyecto(cls.tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_paralelo_igual_a_serie(self):
+        serie = QATrainingEngine(self.tmp.name)
+        serie.analyze_project()
+        paralelo = QATrainingEngine(self.tmp.name)
+        paralelo.analyze_project(jobs=3)
+        self.assertTrue(serie.patterns['page_objects'])
+        self.assertTrue(serie.patterns['test_methods'])
+        self.assertEqual(serie.patterns, paralelo.patterns)
+
+    def test_hibrido_paralelo_igual_a_serie(self):
+        serie = HybridTrainingEngine(self.tmp.name).analyze_project()
+        paralelo = HybridTrainingEngine(self.tmp.name).analyze_project(jobs=3)
+        self.assertTrue(serie['web_pages'])
+        self.assertEqual(serie['project_type'], 'hybrid')
+        self.assertEqual(serie, paralelo)
+
+class TestEntrenamientoIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        crear_proyecto(self.tmp.name, archivos=30)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reutiliza_archivos_sin_cambios(self):
+        completo = HybridTrainingEngine(self.tmp.name).analyze_project()
+        primero = HybridTrainingEngine(self.tmp.name)
+        self.assertEqual(primero.analyze_project(incremental=True), completo)
+        self.assertEqual(primero.cache_stats['reused'], 0)
+
+        segundo = HybridTrainingEngine(self.tmp.name)
+        self.assertEqual(segundo.analyze_project(incremental=True), completo)
+        self.assertEqual(segundo.cache_stats['analyzed'], 0)
+
+        modificado = os.path.join(self.tmp.name, 'src', 'test', 'java', 'com', 'demo', 'mobile', 'Pantalla0Screen.java')
+        with open(modificado, 'a', encoding='utf-8') as f:
+            f.write('// cambio con selenium webdriver\n')
+        os.remove(os.path.join(self.tmp.name, 'src', 'test', 'java', 'com', 'demo', 'mobile', 'Login3Task.java'))
+        tercero = HybridTrainingEngine(self.tmp.name)
+        resultado = tercero.analyze_project(incremental=True)
+        self.assertEqual((tercero.cache_stats['analyzed'], tercero.cache_stats['removed']), (1, 1))
+        self.assertEqual(resultado, HybridTrainingEngine(self.tmp.name).analyze_project())
+
+class TestLocalizadores(unittest.TestCase):
+    def test_extrae_localizadores_appium_y_calificados(self):
+        fuente = '''public class LoginScreen {
+    public Button ingresar = new Button(AppiumBy.accessibilityId("btnLogin"));
+    public TextBox usuario = new TextBox(MobileBy.xpath("//usuario"));
+    public TextBox clave = new TextBox(org.openqa.selenium.By.id("com.demo:id/clave"));
+}
+'''
+        engine = QATrainingEngine('.')
+        engine._extract_page_object_patterns(fuente, 'LoginScreen.java', java_symbols_for('LoginScreen.java', fuente))
+        engine._extract_page_object_patterns(fuente, 'LoginScreen.java', None)
+        con_simbolos, con_regex = engine.patterns['page_objects']
+        self.assertEqual(con_simbolos['locators'][:3], ['btnLogin', '//usuario', 'com.demo:id/clave'])
+        self.assertEqual(con_simbolos['locators'][:3], con_regex['locators'][:3])
+
+        web = '''public class LoginPage {
+    private WebTextBox correo = new WebTextBox(org.openqa.selenium.By.name("correo"));
+}
+'''
+        hibrido = HybridTrainingEngine('.')
+        hibrido._extract_web_page_patterns(web, 'LoginPage.java', java_symbols_for('LoginPage.java', web))
+        self.assertEqual(hibrido.web_patterns['web_pages'][0]['locators'], ['name=correo'])
+
+class TestArchivosIlegibles(unittest.TestCase):
+    def test_symlink_roto_no_aborta_el_analisis(self):
+        with tempfile.TemporaryDirectory() as raiz:
+            crear_proyecto(raiz, archivos=10)
+            os.symlink(os.path.join(raiz, 'no_existe.java'), os.path.join(raiz, 'Roto.java'))
+            resultado = HybridTrainingEngine(raiz).analyze_project()
+            self.assertTrue(resultado['web_pages'])
+            self.assertEqual(resultado, HybridTrainingEngine(raiz).analyze_project(incremental=True))
+            engine = QATrainingEngine(raiz)
+            engine.analyze_project()
+            self.assertIn(['Roto.java', 'unreadable'], engine.skipped_files)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import socket
+import sys
+import threading
+from unittest import mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.stub_http import StubHTTPServer
+from integracion_jira import JiraExporter
+from integracion_llm import LLMClient
+from transporte_http import TransporteHTTP, retry_after_seconds
+
+
+class TestTransporteHTTP(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubHTTPServer().start()
+        self.esperas = []
+        self.http = TransporteHTTP(connect_timeout=1, read_timeout=0.3, max_retries=3, sleep=self.esperas.append)
+        self.env = mock.patch.dict(os.environ, {
+            'OPENAI_API_KEY': 'clave-prueba', 'LLM_API_URL': self.stub.url + '/v1/completions',
+            'JIRA_URL': self.stub.url, 'JIRA_USER': 'qa', 'JIRA_TOKEN': 'token'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.http.cerrar()
+        self.stub.stop()
+
+    def test_reintenta_429_respetando_retry_after_y_reutiliza_la_conexion(self):
+        self.stub.encolar(429, {'error': 'rate limit'}, headers={'Retry-After': '7'})
+        self.stub.encolar(200, {'choices': [{'text': 'Scenario: login'}]})
+        resultado = LLMClient(self.http).analizar_historia('Como usuario quiero iniciar sesión')
+        self.assertEqual(resultado, 'Scenario: login')
+        self.assertGreaterEqual(self.esperas[0], 7)
+        metricas = self.http.metricas.resumen()['llm.completions']
+        self.assertEqual((metricas['solicitudes'], metricas['reintentos']), (2, 1))
+        self.assertEqual(metricas['estados'], {429: 1, 200: 1})
+        # Keep-alive: las dos solicitudes viajan por la misma conexión
+        self.assertEqual(len({r.client_port for r in self.stub.requests}), 1)
+
+    def test_timeout_de_lectura_se_reintenta_solo_si_es_idempotente(self):
+        self.stub.encolar(200, {'choices': [{'text': 'lento'}]}, delay=1)
+        self.stub.encolar(200, {'choices': [{'text': 'a tiempo'}]})
+        self.assertEqual(LLMClient(self.http).analizar_historia('historia'), 'a tiempo')
+
+        # Crear un issue no es idempotente: un 500 o un timeout no se reintentan (podría duplicarse)
+        self.stub.encolar(500, {'errorMessages': ['boom']})
+        self.assertIsNone(JiraExporter(self.http).exportar_feature('QA', 'Login', 'desc'))
+        self.stub.encolar(503, {}, headers={'Retry-After': '0'})
+        self.stub.encolar(201, {'key': 'QA-1'})
+        self.assertEqual(JiraExporter(self.http).exportar_feature('QA', 'Login', 'desc'), {'key': 'QA-1'})
+        jira = self.http.metricas.resumen()['jira.issue']
+        self.assertEqual((jira['solicitudes'], jira['reintentos']), (3, 1))
+
+    def test_post_no_idempotente_no_se_reenvia_si_el_servidor_corta(self):
+        import requests
+        servidor = socket.socket()
+        servidor.bind(('127.0.0.1', 0))
+        servidor.listen(5)
+        recibidas = []
+
+        def aceptar():
+            # Lee la solicitud completa y cierra sin responder (RemoteDisconnected en el cliente)
+            while True:
+                try:
+                    conexion, _ = servidor.accept()
+                except OSError:
+                    return
+                with conexion:
+                    datos = b''
+                    while b'\r\n\r\n' not in datos:
+                        datos += conexion.recv(4096)
+                    recibidas.append(datos)
+
+        threading.Thread(target=aceptar, daemon=True).start()
+        url = 'http://127.0.0.1:%d/rest/api/2/issue/bulk' % servidor.getsockname()[1]
+        try:
+            with self.assertRaises(requests.ConnectionError):
+                self.http.post(url, json={'issueUpdates': []}, endpoint='jira.issue.bulk')
+            self.assertEqual(len(recibidas), 1)
+            self.assertEqual(self.http.metricas.resumen()['jira.issue.bulk']['reintentos'], 0)
+        finally:
+            servidor.close()
+
+        # Puerto sin servidor: la conexión nunca se abrió, así que el POST sí se reintenta
+        libre = socket.socket()
+        libre.bind(('127.0.0.1', 0))
+        puerto = libre.getsockname()[1]
+        libre.close()
+        with self.assertRaises(requests.ConnectionError):
+            self.http.post('http://127.0.0.1:%d/rest/api/2/issue' % puerto, json={}, endpoint='jira.cerrado')
+        self.assertEqual(self.http.metricas.resumen()['jira.cerrado']['reintentos'], 3)
+
+    def test_retry_after_en_fecha_http(self):
+        self.assertEqual(retry_after_seconds('120'), 120.0)
+        self.assertEqual(retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470.0), 10.0)
+        self.assertIsNone(retry_after_seconds('pronto'))
+
+
+if __name__ == '__main__':
+    unittest.main()
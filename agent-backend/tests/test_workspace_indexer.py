@@ -0,0 +1,119 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from indexer.workspace_indexer import WorkspaceIndexer
+from indexer.workspace_watcher import WorkspaceWatcher
+
+def escribir(ruta, contenido=''):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+
+def envejecer(raiz):
+    """Lleva el mtime de todos los directorios al pasado (fuera de la ventana 'racy')"""
+    antes = time.time() - 60
+    for dirpath, _, _ in os.walk(raiz):
+        os.utime(dirpath, (antes, antes))
+
+def indexar(raiz):
+    indexer = WorkspaceIndexer(raiz)
+    indexer.index_workspace()
+    return indexer
+
+class TestWorkspaceIndexer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raiz = os.path.join(self.tmp.name, 'proyecto')
+        escribir(os.path.join(self.raiz, 'src', 'pages', 'LoginPage.java'), 'import org.openqa.selenium.WebDriver;')
+        escribir(os.path.join(self.raiz, 'src', 'steps', 'LoginSteps.java'), 'import io.cucumber.java.en.Given;')
+        escribir(os.path.join(self.raiz, 'features', 'login.feature'), 'Feature: Login')
+        escribir(os.path.join(self.raiz, 'node_modules', 'x', 'test.js'), '')
+        escribir(os.path.join(self.raiz, 'docs', 'notas.txt'), '')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_indexa_y_omite_directorios_ignorados(self):
+        index = indexar(self.raiz).get_index()
+        nombres = sorted(os.path.basename(f) for f in index['files'])
+        self.assertEqual(nombres, ['LoginPage.java', 'LoginSteps.java', 'login.feature'])
+        self.assertIn('Selenium', index['frameworks'])
+        self.assertIn('Cucumber', index['frameworks'])
+
+    def test_reutiliza_directorios_sin_cambios(self):
+        indexar(self.raiz)
+        envejecer(self.raiz)
+        indexar(self.raiz)  # se reescanean los directorios cuyo mtime cambió
+
+        indexer = indexar(self.raiz)
+        self.assertEqual(indexer.last_refresh['dirs_rescanned'], 0)
+        self.assertFalse(indexer.last_refresh['frameworks_detected'])
+
+        escribir(os.path.join(self.raiz, 'src', 'pages', 'CartPage.java'), 'class CartPage {}')
+        indexer = indexar(self.raiz)
+        self.assertEqual(indexer.last_refresh['dirs_rescanned'], 1)
+        self.assertIn('CartPage.java', [os.path.basename(f) for f in indexer.files])
+
+    def test_huella_cambia_solo_con_cambios(self):
+        primera = indexar(self.raiz)._get_workspace_hash()
+        self.assertEqual(indexar(self.raiz)._get_workspace_hash(), primera)
+        os.remove(os.path.join(self.raiz, 'features', 'login.feature'))
+        self.assertNotEqual(indexar(self.raiz)._get_workspace_hash(), primera)
+
+    def test_eventos_actualizan_el_indice(self):
+        indexer = indexar(self.raiz)
+        generacion = indexer.get_index()['generation']
+        nuevo = os.path.join(self.raiz, 'src', 'tasks', 'AddOrderTest.java')
+        escribir(nuevo, 'class AddOrderTest {}')
+        escribir(os.path.join(self.raiz, 'node_modules', 'y', 'otro.test.js'))
+        self.assertTrue(indexer.refresh([nuevo, os.path.dirname(nuevo), os.path.join(self.raiz, 'node_modules', 'y')]))
+        self.assertIn(nuevo, indexer.files)
+        self.assertEqual(indexer.get_index()['generation'], generacion + 1)
+
+        os.remove(nuevo)
+        self.assertTrue(indexer.refresh([nuevo]))
+        self.assertNotIn(nuevo, indexer.files)
+        # Sin cambios relevantes no se incrementa la generación
+        self.assertFalse(indexer.refresh([os.path.join(self.raiz, 'docs', 'notas.txt')]))
+        self.assertEqual(indexer.generation, generacion + 2)
+
+    def test_watcher_agrupa_rafagas(self):
+        indexer = indexar(self.raiz)
+        generaciones = []
+        aplicado = threading.Event()
+        def al_cambiar(generacion):
+            generaciones.append(generacion)
+            aplicado.set()
+        watcher = WorkspaceWatcher(indexer, debounce=0.1, on_change=al_cambiar, use_watchdog=False, poll_interval=60)
+        watcher.mode = 'test'
+        hilo = threading.Thread(target=watcher._apply_loop, daemon=True)
+        hilo.start()
+        for i in range(20):
+            ruta = os.path.join(self.raiz, 'src', 'pages', f'Page{i}.java')
+            escribir(ruta)
+            watcher.notify([ruta])
+        self.assertTrue(aplicado.wait(5))
+        watcher.stop()
+        hilo.join(5)
+        self.assertEqual(generaciones, [1])
+        self.assertEqual(len(indexer.files), 23)
+
+    def test_watcher_por_sondeo(self):
+        indexer = indexar(self.raiz)
+        aplicado = threading.Event()
+        watcher = WorkspaceWatcher(indexer, use_watchdog=False, poll_interval=0.05,
+                                   on_change=lambda generacion: aplicado.set()).start()
+        try:
+            self.assertEqual(watcher.mode, 'polling')
+            escribir(os.path.join(self.raiz, 'features', 'carrito.feature'), 'Feature: Carrito')
+            self.assertTrue(aplicado.wait(5))
+            self.assertIn('carrito.feature', [os.path.basename(f) for f in indexer.files])
+        finally:
+            watcher.stop()
+
+if __name__ == '__main__':
+    unittest.main()
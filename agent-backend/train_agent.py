@@ -8,8 +8,11 @@ sys.path.append(os.path.dirname(__file__))
 
 from training.training_engine import QATrainingEngine
 
-def train_with_project(project_path, output_path=None):
-    """Entrena el agente con un proyecto específico"""
+def train_with_project(project_path, output_path=None, jobs=1, incremental=True):
+    """
+    Entrena el agente con un proyecto específico (jobs > 1: análisis en paralelo;
+    incremental: solo re-analiza los archivos que cambiaron desde el último entrenamiento)
+    """
     
     if not os.path.exists(project_path):
         print(f"❌ Error: La ruta {project_path} no existe")
@@ -23,7 +26,10 @@ def train_with_project(project_path, output_path=None):
     
     # Analizar proyecto
     print("🔍 Analizando proyecto...")
-    trainer.analyze_project()
+    trainer.analyze_project(jobs=jobs, incremental=incremental)
+    if trainer.cache_stats:
+        stats = trainer.cache_stats
+        print(f"♻️ Archivos reutilizados: {stats['reused']} | re-analizados: {stats['analyzed']} | eliminados: {stats['removed']}")
     
     # Obtener resumen
     summary = trainer.get_patterns_summary()
@@ -70,11 +76,13 @@ def show_usage():
 🤖 ENTRENADOR DE AGENTESTINGMIA
 
 Uso:
-    python train_agent.py <ruta_proyecto> [ruta_salida]
+    python train_agent.py <ruta_proyecto> [ruta_salida] [--jobs N] [--full]
 
 Ejemplos:
     python train_agent.py "C:/mi-proyecto-automation"
     python train_agent.py "/home/user/selenium-project" "./custom_training.json"
+    python train_agent.py "C:/monorepo-automation" --jobs 8   (análisis en paralelo, 0 = todos los núcleos)
+    python train_agent.py "C:/mi-proyecto-automation" --full  (ignora la cache y re-analiza todo)
 
 El agente analizará:
 • Page Objects (*.java, *.py, *.js)
@@ -92,11 +100,22 @@ if __name__ == "__main__":
         show_usage()
         sys.exit(1)
     
-    project_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    args = sys.argv[1:]
+    incremental = '--full' not in args
+    args = [arg for arg in args if arg != '--full']
+    jobs = 1
+    if '--jobs' in args:
+        position = args.index('--jobs')
+        jobs = int(args[position + 1])
+        del args[position:position + 2]
+    if not args:
+        show_usage()
+        sys.exit(1)
+    project_path = args[0]
+    output_path = args[1] if len(args) > 1 else None
     
     try:
-        success = train_with_project(project_path, output_path)
+        success = train_with_project(project_path, output_path, jobs, incremental)
         if success:
             print("\n🎉 ¡Entrenamiento exitoso! El agente está listo para usar.")
         else:
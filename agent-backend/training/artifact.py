@@ -0,0 +1,253 @@
+"""
+artifact.py
+Artefacto de entrenamiento versionado: un manifiesto chico + shards de patrones por tipo.
+
+    training_data.json                      manifiesto (prompt, metadatos, conteos, ejemplos)
+    training_data.shards/gen-XXXX/
+        page_objects.jsonl                  un patrón por línea (JSON compacto)
+        page_objects.idx                    offsets de cada línea (uint64 little-endian)
+        ...
+        retrieval.json                      índice BM25 de ejemplos y patrones (retrieval.py)
+
+El manifiesto conserva `training_prompt`, `project_type`, `frameworks`, `project_path` y
+`training_examples` en el nivel superior, así que quien solo necesita el prompt no toca los
+shards. Cada escritura crea una generación nueva de shards y después reemplaza el manifiesto
+de forma atómica (os.replace); la generación anterior se conserva para lectores en curso.
+Los training_data.json monolíticos (versión 1) se siguen leyendo igual.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+
+try:
+    from training.retrieval import INDEX_VERSION, RetrievalIndex, build_training_index
+except ImportError:
+    # Ejecutado como script desde training/
+    from retrieval import INDEX_VERSION, RetrievalIndex, build_training_index
+
+ARTIFACT_FORMAT = 'agentesting-training'
+ARTIFACT_VERSION = 2  # 1 = JSON monolítico con indent=2
+ARTIFACT_KEY = '_artifact'
+RETRIEVAL_FILE = 'retrieval.json'
+
+# Claves que van en el manifiesto aunque sean listas
+METADATA_KEYS = ('training_prompt', 'project_type', 'frameworks', 'project_path', 'training_examples')
+
+_COMPACT = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def _shards_root(path):
+    return os.path.splitext(path)[0] + '.shards'
+
+
+def _write_shard(directory, kind, values):
+    """Escribe un shard JSONL y su índice de offsets; retorna los bytes escritos"""
+    offsets = array('Q')
+    position = 0
+    with open(os.path.join(directory, f'{kind}.jsonl'), 'wb') as f:
+        for value in values:
+            line = (json.dumps(value, **_COMPACT) + '\n').encode('utf-8')
+            offsets.append(position)
+            f.write(line)
+            position += len(line)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    with open(os.path.join(directory, f'{kind}.idx'), 'wb') as f:
+        offsets.tofile(f)
+    return position
+
+
+def _write_json_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **_COMPACT)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_artifact(path, data):
+    """
+    Guarda `data` (forma de save_training_data: {'patterns': {...}, ...}, o forma plana del
+    entrenador híbrido) como manifiesto + shards. Si `data` no trae training_examples se
+    conservan los del artefacto anterior (son ejemplos curados a mano).
+    """
+    nested = isinstance(data.get('patterns'), dict)
+    groups = data['patterns'] if nested else data
+    manifest = {}
+    shards = {}
+    for key, value in data.items():
+        if key == 'patterns' and nested:
+            continue
+        if not nested and isinstance(value, list) and key not in METADATA_KEYS:
+            continue  # va a un shard
+        manifest[key] = value
+    for key, value in groups.items():
+        if isinstance(value, list) and (nested or key not in METADATA_KEYS):
+            shards[key] = value
+
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = TrainingArtifact.open(path)
+        except (OSError, ValueError):
+            previous = None
+    if 'training_examples' not in manifest and previous is not None:
+        examples = previous.get('training_examples')
+        if examples:
+            manifest['training_examples'] = examples
+
+    root = _shards_root(path)
+    os.makedirs(root, exist_ok=True)
+    generation = tempfile.mkdtemp(dir=root, prefix='gen-')
+    try:
+        shard_info = {}
+        for kind, values in shards.items():
+            shard_info[kind] = {'count': len(values), 'bytes': _write_shard(generation, kind, values)}
+        index = build_training_index(dict(shards, training_examples=manifest.get('training_examples')))
+        with open(os.path.join(generation, RETRIEVAL_FILE), 'w', encoding='utf-8') as f:
+            json.dump(index.to_dict(), f, **_COMPACT)
+        manifest[ARTIFACT_KEY] = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'layout': 'nested' if nested else 'flat',
+            'shards_dir': os.path.relpath(generation, os.path.dirname(os.path.abspath(path))),
+            'shards': shard_info,
+            'retrieval': RETRIEVAL_FILE
+        }
+        _write_json_atomic(path, manifest)
+    except BaseException:
+        shutil.rmtree(generation, ignore_errors=True)
+        raise
+
+    # Se conserva la generación anterior (un lector puede tener abierto el manifiesto viejo)
+    keep = {os.path.basename(generation)}
+    if previous is not None and previous.shards_dir:
+        keep.add(os.path.basename(previous.shards_dir))
+    for name in os.listdir(root):
+        if name not in keep:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return manifest
+
+
+class TrainingArtifact:
+    """Lectura perezosa del artefacto: el manifiesto al abrir, cada shard solo cuando se pide"""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        info = manifest.get(ARTIFACT_KEY)
+        self.version = info['version'] if info else 1
+        self._retrieval_file = info.get('retrieval') if info else None
+        if info:
+            self.shards_dir = os.path.join(os.path.dirname(os.path.abspath(path)), info['shards_dir'])
+            self._shards = info.get('shards', {})
+            self.layout = info.get('layout', 'nested')
+        else:
+            # Versión 1: todo el JSON ya está en memoria
+            self.shards_dir = None
+            self.layout = 'nested' if isinstance(manifest.get('patterns'), dict) else 'flat'
+            groups = manifest.get('patterns', {}) if self.layout == 'nested' else manifest
+            self._legacy = {key: value for key, value in groups.items()
+                            if isinstance(value, list) and (self.layout == 'nested' or key not in METADATA_KEYS)}
+            self._shards = {key: {'count': len(value)} for key, value in self._legacy.items()}
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if not isinstance(manifest, dict):
+            raise ValueError(f"Artefacto de entrenamiento inválido: {path}")
+        return cls(path, manifest)
+
+    def get(self, key, default=None):
+        """Metadatos del manifiesto (training_prompt, project_type, frameworks, ...)"""
+        return self.manifest.get(key, default)
+
+    @property
+    def counts(self):
+        return {kind: info['count'] for kind, info in self._shards.items()}
+
+    def kinds(self):
+        return list(self._shards)
+
+    def count(self, kind):
+        return self._shards.get(kind, {}).get('count', 0)
+
+    def iter_patterns(self, kind):
+        """Recorre un shard línea por línea sin cargarlo completo"""
+        if kind not in self._shards:
+            return
+        if self.shards_dir is None:
+            yield from self._legacy[kind]
+            return
+        with open(os.path.join(self.shards_dir, f'{kind}.jsonl'), 'rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def patterns(self, kind, limit=None):
+        result = []
+        for value in self.iter_patterns(kind):
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(value)
+        return result
+
+    def pattern(self, kind, index):
+        """Un patrón puntual usando el índice de offsets (sin leer el resto del shard)"""
+        if not 0 <= index < self.count(kind):
+            raise IndexError(f"{kind}[{index}] fuera de rango")
+        if self.shards_dir is None:
+            return self._legacy[kind][index]
+        offsets = array('Q')
+        with open(os.path.join(self.shards_dir, f'{kind}.idx'), 'rb') as f:
+            f.seek(index * offsets.itemsize)
+            offsets.frombytes(f.read(offsets.itemsize))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        with open(os.path.join(self.shards_dir, f'{kind}.jsonl'), 'rb') as f:
+            f.seek(offsets[0])
+            return json.loads(f.readline())
+
+    def item(self, kind, index):
+        """Elemento referenciado por el índice de búsqueda (ejemplo del manifiesto o patrón)"""
+        if kind == 'training_examples':
+            return self.get('training_examples', [])[index]
+        return self.pattern(kind, index)
+
+    def retrieval_index(self):
+        """Índice BM25 guardado al entrenar; si falta (artefacto v1) o es de otra versión se arma en memoria"""
+        if self._retrieval_file:
+            with open(os.path.join(self.shards_dir, self._retrieval_file), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return RetrievalIndex(data)
+        groups = {kind: self.patterns(kind) for kind in self._shards}
+        groups['training_examples'] = self.get('training_examples')
+        return build_training_index(groups)
+
+    def to_dict(self):
+        """Reconstruye el JSON completo de la versión 1 (carga todos los shards)"""
+        data = {key: value for key, value in self.manifest.items() if key != ARTIFACT_KEY}
+        if self.shards_dir is None:
+            return data
+        groups = {kind: self.patterns(kind) for kind in self._shards}
+        if self.layout == 'nested':
+            data['patterns'] = groups
+        else:
+            data.update(groups)
+        return data
+
+# Uso:
+# write_artifact('training/training_data.json', {'patterns': engine.patterns, 'training_prompt': prompt})
+# artifact = TrainingArtifact.open('training/training_data.json')
+# artifact.get('training_prompt'); artifact.count('web_pages'); artifact.patterns('page_objects', limit=4)
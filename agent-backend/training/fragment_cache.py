@@ -0,0 +1,111 @@
+"""
+fragment_cache.py
+Cache persistente de fragmentos de patrones por archivo para el entrenamiento incremental.
+Cada archivo se identifica por ruta, tamaño, mtime y hash de contenido: si no cambió se
+reutiliza su fragmento (page_objects, test_methods, step_definitions, utilities, web_pages,
+web_tasks...) y solo se re-analizan los archivos nuevos o modificados.
+"""
+import hashlib
+import json
+import os
+
+CACHE_FILENAME = '.agentesting_training_cache.json'
+
+
+def file_hash(file_path):
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+class FragmentCache:
+    def __init__(self, project_path, engine_name, version, cache_path=None):
+        self.project_path = project_path
+        self.engine_name = engine_name
+        # Cambiar los extractores incrementa la versión e invalida todos los fragmentos
+        self.version = version
+        self.cache_path = cache_path or os.path.join(project_path, CACHE_FILENAME)
+        self.entries = {}
+        self._current = {}
+        self._dirty = False
+        self.stats = {'reused': 0, 'analyzed': 0, 'removed': 0}
+        self._all_engines = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.version:
+            return
+        self._all_engines = data.get('engines', {})
+        self.entries = self._all_engines.get(self.engine_name, {})
+
+    def _key(self, file_path):
+        return os.path.relpath(file_path, self.project_path)
+
+    def lookup(self, file_path):
+        """Fragmento cacheado si el archivo no cambió; None si hay que analizarlo"""
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if entry is None or entry['size'] != stat.st_size:
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            # mtime distinto (checkout, touch): se confirma por contenido antes de descartar
+            try:
+                if file_hash(file_path) != entry['md5']:
+                    return None
+            except OSError:
+                return None
+            entry = dict(entry, mtime_ns=stat.st_mtime_ns)
+            self._dirty = True
+        self._current[key] = entry
+        self.stats['reused'] += 1
+        return {(group, name): values for group, name, values in entry['fragment']}
+
+    def store(self, file_path, fragment):
+        """Registra el fragmento recién calculado de un archivo"""
+        key = self._key(file_path)
+        self.stats['analyzed'] += 1
+        try:
+            stat = os.stat(file_path)
+            md5 = file_hash(file_path)
+        except OSError:
+            return
+        self._dirty = True
+        self._current[key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'md5': md5,
+            'fragment': [[group, name, values] for (group, name), values in fragment.items()]
+        }
+
+    def save(self):
+        """Persiste solo los archivos vistos en esta corrida (los borrados desaparecen)"""
+        self.stats['removed'] = len(set(self.entries) - set(self._current))
+        self._all_engines[self.engine_name] = self._current
+        if not self._dirty and not self.stats['removed']:
+            self.entries, self._current = self._current, {}
+            return  # nada cambió: no se reescribe el archivo
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'engines': self._all_engines}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la cache de entrenamiento: {e}")
+        self.entries = self._current
+        self._current = {}
+        self._dirty = False
+
+# Uso:
+# cache = FragmentCache(project_path, 'QATrainingEngine', version=1)
+# fragment = cache.lookup(file_path)  # None -> analizar y luego cache.store(file_path, fragment)
+# cache.save(); cache.stats -> {'reused': ..., 'analyzed': ..., 'removed': ...}
@@ -6,7 +6,17 @@ import os
 import re
 import json
 from pathlib import Path
-from training_engine import QATrainingEngine
+from training_engine import QATrainingEngine, SOURCE_EXTENSIONS, SKIP_DIRS, AGENT_FILES_PREFIX, java_symbols_for, write_artifact
+from analysis.indicators import HYBRID_INDICATORS, TRAINING_FRAMEWORKS
+from analysis.file_reader import SKIP_TOO_LARGE
+
+# Vocabulario web sobre símbolos Java
+WEB_LOCATOR_STRATEGIES = ('id', 'name', 'xpath', 'css', 'cssSelector', 'className', 'tagName', 'linkText', 'partialLinkText')
+WEB_CONTROL_TYPES = ('WebTextBox', 'WebButton', 'WebDropdown', 'WebCheckBox', 'WebLabel')
+WEB_ACTION_RE = re.compile(r'sendKeys|click|select|navigate|scroll|hover|isDisplayed|isEnabled', re.IGNORECASE)
+
+# Además de las fuentes, la configuración (.xml/.json) aporta a la detección de tipo y frameworks
+DETECTION_EXTENSIONS = SOURCE_EXTENSIONS + ('.xml', '.json')
 
 class HybridTrainingEngine(QATrainingEngine):
     """Motor de entrenamiento que maneja tanto patrones móviles como web"""
@@ -18,63 +28,95 @@ class HybridTrainingEngine(QATrainingEngine):
             'web_tasks': [],
             'web_controls': []
         }
+        self._mobile_indicators = []
+        self._web_indicators = []
         
-    def analyze_project(self):
-        """Analiza proyecto detectando patrones móviles y web"""
+    def analyze_project(self, jobs=1, incremental=False):
+        """
+        Analiza proyecto detectando patrones móviles y web (jobs > 1: pool de procesos).
+        Un solo recorrido: cada archivo se lee y se pasa a minúsculas una vez, y de ahí salen
+        el tipo de proyecto, los frameworks y los patrones.
+        """
         print("🔍 Analizando proyecto híbrido...")
+        self._mobile_indicators = []
+        self._web_indicators = []
+        self.skipped_files = []
         
-        # Detectar tipo de proyecto
-        self._detect_project_type()
+        # Analizar archivos (fuentes) y detectar tipo/frameworks (fuentes + .xml/.json)
+        self._analyze_files(self._source_files(), jobs, incremental)
         
-        # Analizar archivos
-        for root, dirs, files in os.walk(self.project_path):
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__']]
-            
-            for file in files:
-                if file.endswith(('.java', '.py', '.js', '.ts')):
-                    file_path = os.path.join(root, file)
-                    self._analyze_file_hybrid(file_path)
+        # Determinar tipo de proyecto con lo recolectado
+        self._detect_project_type()
+        self._report_skipped()
                     
         return self._merge_patterns()
-    
-    def _detect_project_type(self):
-        """Detecta si es proyecto móvil, web o híbrido"""
-        mobile_indicators = []
-        web_indicators = []
-        
-        # Buscar indicadores en archivos
+
+    def _source_files(self):
+        """Archivos del proyecto en orden de os.walk, con los .xml/.json que solo aportan a la detección"""
+        source_files = []
         for root, dirs, files in os.walk(self.project_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
             for file in files:
-                if file.endswith(('.java', '.py', '.js', '.ts', '.xml', '.json')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            
-                            # Indicadores móviles
-                            if any(keyword in content.lower() for keyword in ['appium', 'android', 'ios', 'mobile', 'device', 'androiddriver']):
-                                mobile_indicators.append(file_path)
-                            
-                            # Indicadores web
-                            if any(keyword in content.lower() for keyword in ['selenium', 'webdriver', 'browser', 'chrome', 'firefox', 'chromedriver']):
-                                web_indicators.append(file_path)
-                                
-                            # Detectar frameworks
-                            if 'cucumber' in content.lower():
-                                if 'Cucumber' not in self.frameworks:
-                                    self.frameworks.append('Cucumber')
-                            if 'junit' in content.lower():
-                                if 'JUnit' not in self.frameworks:
-                                    self.frameworks.append('JUnit')
-                            if 'appium' in content.lower():
-                                if 'Appium' not in self.frameworks:
-                                    self.frameworks.append('Appium')
-                            if 'selenium' in content.lower():
-                                if 'Selenium' not in self.frameworks:
-                                    self.frameworks.append('Selenium')
-                                    
-                    except:
-                        continue
+                if file.endswith(DETECTION_EXTENSIONS) and not file.startswith(AGENT_FILES_PREFIX):
+                    source_files.append(os.path.join(root, file))
+        return source_files
+
+    def _analyze_file(self, file_path):
+        """En el entrenador híbrido cada archivo se clasifica como web o móvil"""
+        try:
+            content, reason = self._read_source(file_path)
+            if content is None:
+                # Demasiado grande para extraer patrones: igual aporta a la detección, por ventanas mmap
+                if reason == SKIP_TOO_LARGE and self.reader.can_scan(reason, os.path.getsize(file_path)):
+                    windows = self.reader.iter_windows(file_path, overlap=HYBRID_INDICATORS.overlap)
+                    self._collect_indicators(file_path, hits=HYBRID_INDICATORS.scan_windows(windows))
+                return
+            # Un solo escaneo de indicadores por archivo: tipo de proyecto, frameworks y web/móvil
+            hits = HYBRID_INDICATORS.scan(content)
+            self._collect_indicators(file_path, hits=hits)
+            if file_path.endswith(SOURCE_EXTENSIONS):
+                self._analyze_file_hybrid(file_path, content, hits=hits)
+        except Exception as e:
+            print(f"Error analizando {file_path}: {e}")
+
+    def _pattern_targets(self):
+        targets = super()._pattern_targets()
+        targets.update({('web_patterns', name): values for name, values in self.web_patterns.items()})
+        targets[('detection', 'mobile')] = self._mobile_indicators
+        targets[('detection', 'web')] = self._web_indicators
+        targets[('detection', 'frameworks')] = self.frameworks
+        return targets
+
+    def _merge_fragment(self, fragment):
+        # Cada fragmento trae los frameworks de su archivo: al fusionar se conserva la primera aparición
+        fragment = dict(fragment)
+        frameworks = fragment.pop(('detection', 'frameworks'), [])
+        super()._merge_fragment(fragment)
+        for framework in frameworks:
+            if framework not in self.frameworks:
+                self.frameworks.append(framework)
+
+    def _collect_indicators(self, file_path, content_lower=None, hits=None):
+        """Indicadores de tipo de proyecto y frameworks de un archivo"""
+        if hits is None:
+            hits = HYBRID_INDICATORS.scan(content_lower, lowered=True)
+        # Indicadores móviles
+        if 'mobile' in hits:
+            self._mobile_indicators.append(file_path)
+        
+        # Indicadores web
+        if 'web' in hits:
+            self._web_indicators.append(file_path)
+            
+        # Detectar frameworks
+        for framework in hits.found(TRAINING_FRAMEWORKS):
+            if framework not in self.frameworks:
+                self.frameworks.append(framework)
+    
+    def _detect_project_type(self):
+        """Determina si es proyecto móvil, web o híbrido a partir de los indicadores recolectados"""
+        mobile_indicators = self._mobile_indicators
+        web_indicators = self._web_indicators
         
         # Determinar tipo de proyecto
         if mobile_indicators and web_indicators:
@@ -94,85 +136,94 @@ class HybridTrainingEngine(QATrainingEngine):
         if web_indicators:
             print(f"   🌐 Archivos web: {len(web_indicators)}")
     
-    def _analyze_file_hybrid(self, file_path):
+    def _analyze_file_hybrid(self, file_path, content=None, content_lower=None, hits=None):
         """Analiza archivo detectando si es móvil o web"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                filename = os.path.basename(file_path)
-                
-                # Detectar si es web o móvil
-                is_web = self._is_web_file(content, filename)
-                is_mobile = self._is_mobile_file(content, filename)
-                
-                if is_web:
-                    self._extract_web_patterns(content, filename)
-                elif is_mobile:
-                    self._extract_mobile_patterns(content, filename)
-                
-                # Analizar step definitions (comunes)
-                if 'step' in filename.lower() or '@Given' in content or '@When' in content:
-                    self._extract_step_patterns(content, filename)
+            if content is None:
+                content = self._read_source(file_path)[0]
+                if content is None:
+                    return
+            if hits is None:
+                hits = HYBRID_INDICATORS.scan(content_lower if content_lower is not None else content,
+                                              lowered=content_lower is not None)
+            filename = os.path.basename(file_path)
+            symbols = java_symbols_for(filename, content)
+            
+            # Web o móvil por puntaje (un Screen de Appium con By.id sigue siendo móvil); empate: web
+            automation_type = hits.best('web_file', 'mobile_file')
+            
+            if automation_type == 'web_file':
+                self._extract_web_patterns(content, filename, symbols)
+            elif automation_type == 'mobile_file':
+                self._extract_mobile_patterns(content, filename, symbols)
+            
+            # Analizar step definitions (comunes)
+            if 'step' in filename.lower() or '@Given' in content or '@When' in content:
+                self._extract_step_patterns(content, filename, symbols)
                     
         except Exception as e:
             print(f"Error analizando {file_path}: {e}")
     
-    def _is_web_file(self, content, filename):
+    def _is_web_file(self, content, filename, content_lower=None):
         """Detecta si el archivo es de automatización web"""
-        web_indicators = [
-            'webdriver', 'selenium', 'browser', 'chrome', 'firefox',
-            'page.java', 'webpage', 'webelement', 'by.id', 'by.xpath',
-            'driver.get', 'driver.navigate'
-        ]
-        return any(indicator in content.lower() for indicator in web_indicators)
+        if content_lower is None:
+            return 'web_file' in HYBRID_INDICATORS.scan(content)
+        return 'web_file' in HYBRID_INDICATORS.scan(content_lower, lowered=True)
     
-    def _is_mobile_file(self, content, filename):
+    def _is_mobile_file(self, content, filename, content_lower=None):
         """Detecta si el archivo es de automatización móvil"""
-        mobile_indicators = [
-            'appium', 'android', 'ios', 'mobile', 'screen.java',
-            'com.', ':id/', 'androiddriver', 'iosdriver',
-            'appiumdriver', 'mobileelement'
-        ]
-        return any(indicator in content.lower() for indicator in mobile_indicators)
+        if content_lower is None:
+            return 'mobile_file' in HYBRID_INDICATORS.scan(content)
+        return 'mobile_file' in HYBRID_INDICATORS.scan(content_lower, lowered=True)
     
-    def _extract_web_patterns(self, content, filename):
+    def _extract_web_patterns(self, content, filename, symbols=None):
         """Extrae patrones específicos de web"""
         # Detectar Web Pages
         if 'page' in filename.lower() or 'Page' in content:
-            self._extract_web_page_patterns(content, filename)
+            self._extract_web_page_patterns(content, filename, symbols)
         
         # Detectar Web Tasks
         if ('task' in filename.lower() or filename in ['LoginTask.java', 'SearchTask.java'] or
             'withCredentials' in content or 'withSearchCriteria' in content):
-            self._extract_web_task_patterns(content, filename)
+            self._extract_web_task_patterns(content, filename, symbols)
     
-    def _extract_mobile_patterns(self, content, filename):
+    def _extract_mobile_patterns(self, content, filename, symbols=None):
         """Extrae patrones específicos de móvil (usar método existente)"""
         if ('screen' in filename.lower() or 'activity' in filename.lower() or 
             'page' in filename.lower() or 'Screen' in content or 'Activity' in content):
-            self._extract_page_object_patterns(content, filename)
+            self._extract_page_object_patterns(content, filename, symbols)
     
-    def _extract_web_page_patterns(self, content, filename):
+    def _extract_web_page_patterns(self, content, filename, symbols=None):
         """Extrae patrones de Web Pages"""
         # Buscar locators web
         web_locators = []
         
-        # By.id, By.name, By.xpath, etc.
-        by_locators = re.findall(r'By\.(id|name|xpath|css|className|tagName)\s*\(\s*["\']([^"\']+)["\']\s*\)', content)
+        if symbols is not None:
+            by_locators = [(call.name, call.string_arg) for call in symbols.calls_to('By', suffix=True)
+                           if call.name in WEB_LOCATOR_STRATEGIES and call.string_arg]
+            web_controls = [(f.type, f.name) for f in symbols.fields if f.type in WEB_CONTROL_TYPES]
+            web_actions = [m.name for m in symbols.methods
+                           if 'private' not in m.modifiers and WEB_ACTION_RE.search(m.name)]
+            class_name = next((name for name in symbols.class_names
+                               if name.endswith(('Page', 'PageObject'))), None)
+        else:
+            # By.id, By.name, By.xpath, etc.
+            by_locators = re.findall(r'By\.(id|name|xpath|css|className|tagName)\s*\(\s*["\']([^"\']+)["\']\s*\)', content)
+            
+            # Buscar controles web
+            web_controls = re.findall(r'(?:public|private)\s+(WebTextBox|WebButton|WebDropdown|WebCheckBox|WebLabel)\s+(\w+)', content)
+            
+            # Buscar métodos de acción web
+            web_actions = re.findall(
+                r'(?:public|def)\s+(?:void\s+)?(\w*(?:sendKeys|click|select|navigate|scroll|hover|isDisplayed|isEnabled)\w*)\s*\(', 
+                content, re.IGNORECASE
+            )
+            
+            # Buscar clase
+            class_pattern = re.search(r'(?:public\s+)?class\s+(\w+(?:Page|PageObject))', content)
+            class_name = class_pattern.group(1) if class_pattern else None
         web_locators.extend([f"{loc[0]}={loc[1]}" for loc in by_locators])
-        
-        # Buscar controles web
-        web_controls = re.findall(r'(?:public|private)\s+(WebTextBox|WebButton|WebDropdown|WebCheckBox|WebLabel)\s+(\w+)', content)
-        
-        # Buscar métodos de acción web
-        web_actions = re.findall(
-            r'(?:public|def)\s+(?:void\s+)?(\w*(?:sendKeys|click|select|navigate|scroll|hover|isDisplayed|isEnabled)\w*)\s*\(', 
-            content, re.IGNORECASE
-        )
-        
-        # Buscar clase
-        class_pattern = re.search(r'(?:public\s+)?class\s+(\w+(?:Page|PageObject))', content)
-        class_name = class_pattern.group(1) if class_pattern else filename.replace('.java', '')
+        class_name = class_name or filename.replace('.java', '')
         
         if web_locators or web_controls or web_actions:
             pattern = {
@@ -198,16 +249,24 @@ class HybridTrainingEngine(QATrainingEngine):
             
             self.web_patterns['web_pages'].append(pattern)
     
-    def _extract_web_task_patterns(self, content, filename):
+    def _extract_web_task_patterns(self, content, filename, symbols=None):
         """Extrae patrones de Web Tasks"""
-        # Buscar métodos de negocio web
-        business_methods = re.findall(
-            r'public\s+void\s+(with\w*|navigate\w*|perform\w*|execute\w*)\s*\([^}]*\)', 
-            content
-        )
-        
-        # Buscar uso de pages
-        page_usage = re.findall(r'(\w+Page)\s+(\w+)\s*=\s*new\s+\w+Page\s*\(\s*\)', content)
+        if symbols is not None:
+            business_methods = [m.name for m in symbols.methods
+                                if 'public' in m.modifiers and m.return_type == 'void'
+                                and m.name.startswith(('with', 'navigate', 'perform', 'execute'))]
+            page_usage = [(i.declared_type, i.variable) for i in symbols.instantiations
+                          if i.declared_type and i.declared_type.endswith('Page')
+                          and i.class_name.endswith('Page') and not i.has_args]
+        else:
+            # Buscar métodos de negocio web
+            business_methods = re.findall(
+                r'public\s+void\s+(with\w*|navigate\w*|perform\w*|execute\w*)\s*\([^}]*\)', 
+                content
+            )
+            
+            # Buscar uso de pages
+            page_usage = re.findall(r'(\w+Page)\s+(\w+)\s*=\s*new\s+\w+Page\s*\(\s*\)', content)
         
         if business_methods or page_usage:
             pattern = {
@@ -258,6 +317,12 @@ class HybridTrainingEngine(QATrainingEngine):
         
         return hybrid_patterns
     
+    def save_hybrid_training_data(self, patterns, output_file):
+        """Agrega el prompt híbrido a los patrones y los guarda como artefacto con shards"""
+        patterns['training_prompt'] = self.generate_hybrid_training_prompt(patterns)
+        patterns['project_path'] = self.project_path
+        write_artifact(output_file, patterns)
+    
     def generate_hybrid_training_prompt(self, patterns):
         """Genera prompt híbrido para móvil y web"""
         mobile_prompt = super().generate_training_prompt()
@@ -327,11 +392,13 @@ if __name__ == "__main__":
         print("🤖 ENTRENADOR HÍBRIDO - MÓVIL & WEB")
         print()
         print("Uso:")
-        print("    python hybrid_trainer.py <ruta_proyecto> [ruta_salida]")
+        print("    python hybrid_trainer.py <ruta_proyecto> [ruta_salida] [--jobs N] [--full]")
         print()
         print("Ejemplos:")
         print("    python hybrid_trainer.py \"C:/mi-proyecto-automation\"")
         print("    python hybrid_trainer.py \"/home/user/selenium-project\" \"./custom_training.json\"")
+        print("    python hybrid_trainer.py \"C:/monorepo-automation\" --jobs 8   (análisis en paralelo)")
+        print("    python hybrid_trainer.py \"C:/mi-proyecto-automation\" --full  (ignora la cache incremental)")
         print()
         print("El entrenador analizará:")
         print("• 📱 Patrones móviles (Appium)")
@@ -342,8 +409,16 @@ if __name__ == "__main__":
         print("Generará entrenamiento híbrido manteniendo arquitectura consistente.")
         sys.exit(1)
     
-    project_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    args = sys.argv[1:]
+    incremental = '--full' not in args
+    args = [arg for arg in args if arg != '--full']
+    jobs = 1
+    if '--jobs' in args:
+        position = args.index('--jobs')
+        jobs = int(args[position + 1])
+        del args[position:position + 2]
+    project_path = args[0]
+    output_path = args[1] if len(args) > 1 else None
     
     if not os.path.exists(project_path):
         print(f"❌ Error: El directorio {project_path} no existe")
@@ -356,7 +431,10 @@ if __name__ == "__main__":
     engine = HybridTrainingEngine(project_path)
     
     # Analizar proyecto
-    patterns = engine.analyze_project()
+    patterns = engine.analyze_project(jobs=jobs, incremental=incremental)
+    if engine.cache_stats:
+        stats = engine.cache_stats
+        print(f"♻️ Archivos reutilizados: {stats['reused']} | re-analizados: {stats['analyzed']} | eliminados: {stats['removed']}")
     
     # Contar patrones
     mobile_pages = len(patterns.get('page_objects', []))
@@ -374,19 +452,12 @@ if __name__ == "__main__":
     print(f"   • 🛠️ Tipo: {patterns.get('project_type', 'unknown')}")
     print(f"   • 🔧 Frameworks: {patterns.get('frameworks', [])}")
     
-    # Generar prompt híbrido
-    training_prompt = engine.generate_hybrid_training_prompt(patterns)
-    patterns['training_prompt'] = training_prompt
-    patterns['project_path'] = project_path
-    
-    # Guardar
+    # Generar prompt híbrido y guardar
     if output_path:
         save_path = output_path
     else:
         save_path = os.path.join(os.path.dirname(__file__), 'training_data.json')
-    
-    with open(save_path, 'w', encoding='utf-8') as f:
-        json.dump(patterns, f, indent=2, ensure_ascii=False)
+    engine.save_hybrid_training_data(patterns, save_path)
     
     print(f"\\n✅ Datos de entrenamiento híbrido guardados en: {os.path.abspath(save_path)}")
     print("✅ ENTRENAMIENTO HÍBRIDO COMPLETADO")
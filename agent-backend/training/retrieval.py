@@ -0,0 +1,157 @@
+"""
+retrieval.py
+Índice invertido BM25 sobre los ejemplos de entrenamiento y los patrones del proyecto
+(page objects, pages web, tasks y step definitions) para elegir, por prompt, los elementos
+más relevantes a la entidad pedida ("vendedores", "cobranza", "carrito") dentro de un
+presupuesto de tokens, en lugar de mandar siempre los mismos.
+
+Los términos usan la misma normalización que la cache de respuestas (prompt_similarity.tokenize)
+y además separan identificadores: VendedoresScreen -> vendedores screen.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+
+from model.prompt_similarity import stem, tokenize
+
+INDEX_VERSION = 2  # cambia con la normalización de términos (prompt_similarity.stem)
+# Tipos que se indexan al entrenar (training_examples viene del manifiesto, el resto de los shards)
+INDEXED_KINDS = ('training_examples', 'page_objects', 'web_pages', 'utilities', 'web_tasks', 'step_definitions')
+# Campos con código completo: agregan ruido y no nombran la entidad mejor que el resto
+SKIP_FIELDS = {'sample_code', 'sample_implementation', 'content', 'usage'}
+MAX_DOCUMENT_CHARS = 4000
+
+# Raíces de verbos del pedido que no nombran ninguna entidad ("automatizar", "genera las clases")
+QUERY_STOPWORDS = {stem(word) for word in ('automatizar', 'generar', 'genera', 'crear', 'crea', 'clase',
+                                           'archivo', 'necesario', 'prueba', 'test', 'codigo', 'hacer',
+                                           'haz', 'implementar', 'implementa')}
+MIN_SCORE_RATIO = 0.25  # descarta coincidencias marginales frente al mejor resultado
+
+K1 = 1.5
+B = 0.75
+
+_CAMEL_RE = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+def split_identifiers(text):
+    """LoginScreen.tapIngresar -> Login Screen tap Ingresar; campo_usuario -> campo usuario"""
+    return _CAMEL_RE.sub(' ', text).replace('_', ' ')
+
+
+def tokenize_document(text):
+    return tokenize(split_identifiers(text))
+
+
+def estimate_tokens(text):
+    """Aproximación de tokens (~4 caracteres por token)"""
+    return len(text) // 4 + 1
+
+
+def document_text(item):
+    """Texto indexable de un patrón o ejemplo: todos sus strings salvo el código de muestra"""
+    parts = []
+    size = 0
+    stack = [item]
+    while stack and size < MAX_DOCUMENT_CHARS:
+        value = stack.pop()
+        if isinstance(value, str):
+            parts.append(value)
+            size += len(value)
+        elif isinstance(value, dict):
+            stack.extend(v for k, v in reversed(list(value.items())) if k not in SKIP_FIELDS)
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+    return ' '.join(parts)[:MAX_DOCUMENT_CHARS]
+
+
+def render_item(kind, item):
+    """Texto compacto de un elemento recuperado para el mensaje system"""
+    if kind == 'training_examples':
+        return f"### Ejemplo\nUsuario: {item['prompt']}\nAsistente: {item['response']}\n"
+    if kind == 'history':
+        return f"Prompt: {item['prompt']}\nRespuesta: {item['response']}"
+    if kind in ('page_objects', 'web_pages'):
+        controls = item.get('mobile_controls') or item.get('web_controls') or []
+        names = ', '.join(f"{c.get('name', '')} ({c.get('type', '')})" for c in controls[:8])
+        return f"- {item.get('class_name', item.get('file', ''))}: {names or 'sin controles'}"
+    if kind in ('utilities', 'web_tasks'):
+        methods = item.get('utility_methods') or item.get('methods') or []
+        return f"- {item.get('class_name', item.get('file', ''))}: {', '.join(methods[:6])}"
+    if kind == 'step_definitions':
+        return f"- {item.get('file', '')}: {'; '.join(item.get('steps', [])[:4])}"
+    return f"- {document_text(item)[:200]}"
+
+
+class RetrievalIndex:
+    """BM25 con postings planos [doc, tf, doc, tf, ...] (serializable a JSON compacto)"""
+
+    def __init__(self, data):
+        self.docs = data['docs']            # [[kind, index, largo], ...]
+        self.postings = data['postings']    # término -> [doc, tf, ...]
+        self.avgdl = data['avgdl'] or 1.0
+
+    @classmethod
+    def build(cls, documents):
+        """documents: iterable de (kind, index, texto)"""
+        docs = []
+        postings = {}
+        for kind, index, text in documents:
+            terms = Counter(tokenize_document(text))
+            doc_id = len(docs)
+            docs.append([kind, index, sum(terms.values())])
+            for term, tf in terms.items():
+                postings.setdefault(term, []).extend((doc_id, tf))
+        total = sum(doc[2] for doc in docs)
+        return cls({'docs': docs, 'postings': postings, 'avgdl': total / len(docs) if docs else 0})
+
+    def to_dict(self):
+        return {'version': INDEX_VERSION, 'docs': self.docs, 'postings': self.postings, 'avgdl': self.avgdl}
+
+    def search(self, query, k=5, kinds=None):
+        """Top-k [(score, kind, index)] para el prompt; solo documentos con algún término en común"""
+        n = len(self.docs)
+        scores = {}
+        for term in set(tokenize_document(query)) - QUERY_STOPWORDS:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting) // 2
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i in range(0, len(posting), 2):
+                doc_id, tf = posting[i], posting[i + 1]
+                length = self.docs[doc_id][2]
+                score = idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / self.avgdl))
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        if kinds is not None:
+            scores = {d: s for d, s in scores.items() if self.docs[d][0] in kinds}
+        best = heapq.nlargest(k, scores.items(), key=lambda pair: (pair[1], -pair[0]))
+        floor = best[0][1] * MIN_SCORE_RATIO if best else 0
+        return [(score, self.docs[d][0], self.docs[d][1]) for d, score in best if score >= floor]
+
+
+def build_training_index(groups):
+    """Índice de entrenamiento a partir de {kind: [items]} (solo INDEXED_KINDS)"""
+    return RetrievalIndex.build(
+        (kind, index, document_text(item))
+        for kind in INDEXED_KINDS
+        for index, item in enumerate(groups.get(kind) or [])
+    )
+
+
+def select_within_budget(texts, budget, count=estimate_tokens):
+    """Toma textos en orden de relevancia mientras entren en el presupuesto de tokens"""
+    selected = []
+    used = 0
+    for text in texts:
+        cost = count(text)
+        if used + cost > budget:
+            continue  # uno más chico todavía puede entrar
+        selected.append(text)
+        used += cost
+    return selected, used
+
+# Uso:
+# index = build_training_index({'training_examples': [...], 'page_objects': [...]})
+# index.search('automatizar vendedores', k=6)  -> [(score, 'page_objects', 3), ...]
+# select_within_budget([render_item(kind, item) ...], budget=1200)
@@ -5,10 +5,59 @@ Extrae patrones, estructuras y buenas prácticas del código base.
 """
 import os
 import re
-import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from analysis.file_reader import FileReader
+from analysis.java_lexer import extract_symbols
+
+try:
+    from training.artifact import write_artifact
+    from training.fragment_cache import FragmentCache
+except ImportError:
+    # Ejecutado como script desde training/ (hybrid_trainer.py importa `training_engine`)
+    from artifact import write_artifact
+    from fragment_cache import FragmentCache
+
+SOURCE_EXTENSIONS = ('.java', '.py', '.js', '.ts')
+SKIP_DIRS = ['node_modules', '__pycache__']
+# Caches propias escritas en el proyecto (índice y fragmentos): no son código del proyecto
+AGENT_FILES_PREFIX = '.agentesting'
+
+# Vocabulario de los extractores sobre símbolos Java (analysis/java_lexer.py)
+MOBILE_LOCATOR_STRATEGIES = ('id', 'name', 'xpath', 'className', 'accessibilityId')
+MOBILE_CONTROL_TYPES = ('TextBox', 'Button', 'Label', 'CheckBox', 'ComboBox', 'AppiumControl')
+MOBILE_ACTION_RE = re.compile(r'click|setText|getText|tap|swipe|scroll|isDisplayed|isEnabled|clear|findControl', re.IGNORECASE)
+ANDROID_LOCATOR_RE = re.compile(r'[\w\.]+:id/\w+')
+ASSERTION_RE = re.compile(r'assert\w*|expect|should|verify', re.IGNORECASE)
+STEP_ANNOTATIONS = ('Given', 'When', 'Then', 'And', 'But')
+SETUP_METHODS = ('setUp', 'tearDown', 'beforeEach', 'afterEach')
+
+
+def java_symbols_for(filename, content):
+    """Símbolos del archivo si es Java (una sola pasada); None para .py/.js/.ts"""
+    return extract_symbols(content) if filename.endswith('.java') else None
+
+
+def _analyze_files_worker(engine_class, project_path, file_paths):
+    """Proceso del pool: analiza un bloque de archivos y retorna un fragmento por archivo"""
+    engine = engine_class(project_path)
+    return [engine.analyze_file_fragment(file_path) for file_path in file_paths]
+
+
 class QATrainingEngine:
+    # Con menos archivos que esto el costo de levantar procesos supera la ganancia
+    PARALLEL_MIN_FILES = 64
+    # Bloques por proceso: varios por worker para repartir carga desigual entre archivos
+    CHUNKS_PER_JOB = 4
+    # Incrementar al cambiar cualquier extractor: invalida la cache de fragmentos por archivo
+    FRAGMENT_VERSION = 5
+
     def __init__(self, project_path):
         self.project_path = project_path
         self.patterns = {
@@ -20,74 +69,172 @@ class QATrainingEngine:
         }
         self.project_type = 'unknown'  # 'mobile', 'web', 'hybrid'
         self.frameworks = []
-        
-    def analyze_project(self):
-        """Analiza el proyecto de automatización para extraer patrones"""
-        
+        self.cache_stats = None  # {'reused', 'analyzed', 'removed'} en modo incremental
+        # Binarios, minificados y archivos sobre el tope no se cargan: [ruta relativa, motivo]
+        self.reader = FileReader()
+        self.skipped_files = []
+        
+    def analyze_project(self, jobs=1, incremental=False):
+        """
+        Analiza el proyecto de automatización para extraer patrones.
+        jobs > 1 reparte los archivos en un pool de procesos (None/0 = todos los núcleos);
+        el resultado es idéntico al análisis en serie. Con incremental=True solo se analizan
+        los archivos que cambiaron desde el último entrenamiento (ver fragment_cache.py).
+        """
+        self._analyze_files(self._source_files(), jobs, incremental)
+        self._report_skipped()
+
+    def _report_skipped(self):
+        if self.skipped_files:
+            reasons = {}
+            for _, reason in self.skipped_files:
+                reasons[reason] = reasons.get(reason, 0) + 1
+            detail = ', '.join(f"{reason}={count}" for reason, count in sorted(reasons.items()))
+            print(f"⏭️ Archivos omitidos: {len(self.skipped_files)} ({detail})")
+
+    def _read_source(self, file_path):
+        """(contenido, motivo): contenido None si el archivo se omite (queda en skipped_files)"""
+        content, reason = self.reader.read(file_path)
+        if reason is not None:
+            self.skipped_files.append([os.path.relpath(file_path, self.project_path), reason])
+        return content, reason
+
+    def _source_files(self):
+        """Archivos fuente en el orden de os.walk (el orden de los patrones depende de él)"""
+        source_files = []
         for root, dirs, files in os.walk(self.project_path):
             # Skip directorios innecesarios
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__']]
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
             
             for file in files:
-                if file.endswith(('.java', '.py', '.js', '.ts')):
-                    file_path = os.path.join(root, file)
-                    self._analyze_file(file_path)
+                if file.endswith(SOURCE_EXTENSIONS) and not file.startswith(AGENT_FILES_PREFIX):
+                    source_files.append(os.path.join(root, file))
+        return source_files
+
+    def _analyze_files(self, file_paths, jobs=1, incremental=False):
+        """Analiza en serie o en paralelo; los fragmentos se fusionan en el orden de file_paths"""
+        cache = None
+        fragments = [None] * len(file_paths)
+        if incremental:
+            cache = FragmentCache(self.project_path, type(self).__name__, self.FRAGMENT_VERSION)
+            fragments = [cache.lookup(file_path) for file_path in file_paths]
+        pending = [i for i, fragment in enumerate(fragments) if fragment is None]
+
+        jobs = jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(pending) < self.PARALLEL_MIN_FILES:
+            for i in pending:
+                fragments[i] = self.analyze_file_fragment(file_paths[i])
+        else:
+            paths = [file_paths[i] for i in pending]
+            chunk_size = max(1, -(-len(paths) // (jobs * self.CHUNKS_PER_JOB)))
+            chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                # map conserva el orden de los bloques: la fusión es determinista
+                results = executor.map(
+                    _analyze_files_worker,
+                    [type(self)] * len(chunks), [self.project_path] * len(chunks), chunks
+                )
+                computed = [fragment for chunk_fragments in results for fragment in chunk_fragments]
+            for i, fragment in zip(pending, computed):
+                fragments[i] = fragment
+
+        for fragment in fragments:
+            self._merge_fragment(fragment)
+        if cache is not None:
+            for i in pending:
+                cache.store(file_paths[i], fragments[i])
+            cache.save()
+            self.cache_stats = cache.stats
+
+    def _pattern_targets(self):
+        """Listas de patrones que llena el análisis de un archivo (clave -> lista)"""
+        targets = {('patterns', name): values for name, values in self.patterns.items()}
+        targets[('reader', 'skipped')] = self.skipped_files
+        return targets
+
+    def analyze_file_fragment(self, file_path):
+        """
+        Analiza un archivo y retorna sus patrones: {(grupo, categoría): [...]}.
+        Usa un motor vacío, así el fragmento no depende de los demás archivos y se puede cachear.
+        """
+        engine = type(self)(self.project_path)
+        engine._analyze_file(file_path)
+        return {key: values for key, values in engine._pattern_targets().items() if values}
+
+    def _merge_fragment(self, fragment):
+        targets = self._pattern_targets()
+        for key, values in fragment.items():
+            targets[key].extend(values)
     
     def _analyze_file(self, file_path):
         """Analiza archivo individual para extraer patrones"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self._read_source(file_path)[0]
+            if content is not None:
                 filename = os.path.basename(file_path)
+                # Java se tokeniza una vez y todos los extractores leen la misma estructura
+                symbols = java_symbols_for(filename, content)
                 
                 # Detectar Page Objects/Screens - Móvil
                 if ('screen' in filename.lower() or 'activity' in filename.lower() or 
                     'page' in filename.lower() or 'Screen' in content or 'Activity' in content):
-                    self._extract_page_object_patterns(content, filename)
+                    self._extract_page_object_patterns(content, filename, symbols)
                 
                 # Detectar métodos de test
                 if 'test' in filename.lower() or '@Test' in content or 'def test_' in content:
-                    self._extract_test_patterns(content, filename)
+                    self._extract_test_patterns(content, filename, symbols)
                 
                 # Detectar step definitions
                 if 'step' in filename.lower() or '@Given' in content or '@When' in content:
-                    self._extract_step_patterns(content, filename)
+                    self._extract_step_patterns(content, filename, symbols)
                 
                 # Detectar utilities/tasks
                 if ('util' in filename.lower() or 'helper' in filename.lower() or 
                     'task' in filename.lower() or filename in ['Login.java', 'SearchCustomer.java', 
                     'AddOrder.java', 'Synchronization.java']):
-                    self._extract_utility_patterns(content, filename)
+                    self._extract_utility_patterns(content, filename, symbols)
                     
         except Exception as e:
             print(f"Error analizando {file_path}: {e}")
     
-    def _extract_page_object_patterns(self, content, filename):
+    def _extract_page_object_patterns(self, content, filename, symbols=None):
         """Extrae patrones de Page Objects específicos para automatización móvil"""
         
         # Buscar declaraciones de localizadores móviles
         mobile_locators = []
         
-        # Pattern para By.id() con package específico de móvil
-        by_locators = re.findall(r'By\.(id|name|xpath|className|accessibilityId)\s*\(\s*["\']([^"\']+)["\']\s*\)', content)
+        if symbols is not None:
+            # By.id("...") (también AppiumBy/MobileBy o calificado) y strings "package:id/elemento" fuera de comentarios
+            by_locators = [(call.name, call.string_arg) for call in symbols.calls_to('By', suffix=True)
+                           if call.name in MOBILE_LOCATOR_STRATEGIES and call.string_arg]
+            android_locators = [s for s in symbols.strings if ANDROID_LOCATOR_RE.fullmatch(s)]
+            mobile_controls = [(f.type, f.name) for f in symbols.fields if f.type in MOBILE_CONTROL_TYPES]
+            mobile_actions = [m.name for m in symbols.methods
+                              if 'private' not in m.modifiers and MOBILE_ACTION_RE.search(m.name)]
+            class_name = next((name for name in symbols.class_names
+                               if name.endswith(('Screen', 'Activity', 'Page'))), None)
+        else:
+            # Pattern para By.id() con package específico de móvil
+            by_locators = re.findall(r'By\.(id|name|xpath|className|accessibilityId)\s*\(\s*["\']([^"\']+)["\']\s*\)', content)
+            
+            # Pattern para strings de locators de Android (package:id/elemento)
+            android_locators = re.findall(r'"([\w\.]+:id/\w+)"', content)
+            
+            # Buscar controles móviles específicos
+            mobile_controls = re.findall(r'(?:public|private)\s+(TextBox|Button|Label|CheckBox|ComboBox|AppiumControl)\s+(\w+)', content)
+            
+            # Buscar métodos de acción específicos para móvil
+            mobile_actions = re.findall(
+                r'(?:public|def)\s+(?:void\s+)?(\w*(?:click|setText|getText|tap|swipe|scroll|isDisplayed|isEnabled|clear|findControl)\w*)\s*\(', 
+                content, re.IGNORECASE
+            )
+            
+            # Buscar estructura de clase (Screen, Activity, Page)
+            class_pattern = re.search(r'(?:public\s+)?class\s+(\w+(?:Screen|Activity|Page))', content)
+            class_name = class_pattern.group(1) if class_pattern else None
         mobile_locators.extend([loc[1] for loc in by_locators])
-        
-        # Pattern para strings de locators de Android (package:id/elemento)
-        android_locators = re.findall(r'"([\w\.]+:id/\w+)"', content)
         mobile_locators.extend(android_locators)
-        
-        # Buscar controles móviles específicos
-        mobile_controls = re.findall(r'(?:public|private)\s+(TextBox|Button|Label|CheckBox|ComboBox|AppiumControl)\s+(\w+)', content)
-        
-        # Buscar métodos de acción específicos para móvil
-        mobile_actions = re.findall(
-            r'(?:public|def)\s+(?:void\s+)?(\w*(?:click|setText|getText|tap|swipe|scroll|isDisplayed|isEnabled|clear|findControl)\w*)\s*\(', 
-            content, re.IGNORECASE
-        )
-        
-        # Buscar estructura de clase (Screen, Activity, Page)
-        class_pattern = re.search(r'(?:public\s+)?class\s+(\w+(?:Screen|Activity|Page))', content)
-        class_name = class_pattern.group(1) if class_pattern else filename.replace('.java', '')
+        class_name = class_name or filename.replace('.java', '')
         
         # Solo agregar si tiene elementos relevantes para móvil
         if mobile_locators or mobile_controls or ('Screen' in filename) or ('Activity' in filename):
@@ -113,47 +260,74 @@ class QATrainingEngine:
             
             self.patterns['page_objects'].append(pattern)
     
-    def _extract_test_patterns(self, content, filename):
+    def _extract_test_patterns(self, content, filename, symbols=None):
         """Extrae patrones de métodos de test"""
         
-        # Buscar métodos de test
-        test_methods = re.findall(
-            r'(?:@Test|def test_|it\()\s*["\']?([^"\'()]+)?["\']?\s*', 
-            content, re.IGNORECASE
-        )
-        
-        # Buscar assertions
-        assertions = re.findall(
-            r'(assert\w*|expect|should|verify)\s*\(', 
-            content, re.IGNORECASE
-        )
-        
-        # Buscar setup/teardown
-        setup_patterns = re.findall(
-            r'(?:@Before|@After|setUp|tearDown|beforeEach|afterEach)', 
-            content, re.IGNORECASE
-        )
+        if symbols is not None:
+            test_methods = [m.name for m in symbols.methods_annotated('Test')]
+            assertions = [call.name for call in symbols.calls if ASSERTION_RE.fullmatch(call.name)]
+            setup_patterns = ['@' + a.name for a in symbols.annotations if a.name.startswith(('Before', 'After'))]
+            setup_patterns += [m.name for m in symbols.methods if m.name in SETUP_METHODS]
+        else:
+            # Buscar métodos de test
+            test_methods = re.findall(
+                r'(?:@Test|def test_|it\()\s*["\']?([^"\'()]+)?["\']?\s*', 
+                content, re.IGNORECASE
+            )
+            
+            # Buscar assertions
+            assertions = re.findall(
+                r'(assert\w*|expect|should|verify)\s*\(', 
+                content, re.IGNORECASE
+            )
+            
+            # Buscar setup/teardown
+            setup_patterns = re.findall(
+                r'(?:@Before|@After|setUp|tearDown|beforeEach|afterEach)', 
+                content, re.IGNORECASE
+            )
         
         if test_methods or assertions:
             self.patterns['test_methods'].append({
                 'file': filename,
                 'test_methods': test_methods[:5],
-                'assertions': list(set(assertions))[:5],
+                'assertions': list(dict.fromkeys(assertions))[:5],  # sin duplicados, en orden de aparición
                 'setup_teardown': setup_patterns,
                 'sample_code': content[:500]
             })
     
-    def _extract_step_patterns(self, content, filename):
+    def _extract_step_patterns(self, content, filename, symbols=None):
         """Extrae patrones de Step Definitions con más detalles"""
         
         # Buscar steps de Cucumber con anotaciones completas
         cucumber_steps = []
         
-        # Pattern mejorado para capturar Given/When/Then/And
-        step_patterns = re.findall(
-            r'@(Given|When|Then|And)\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\n\s*public\s+void\s+(\w+)\s*\([^)]*\)', 
-            content, re.MULTILINE
-        )
+        if symbols is not None:
+            # Anotación de step sobre el método que la implementa (sin depender del formato)
+            step_patterns = [(a.name, a.args[0], m.name) for m in symbols.methods_annotated(*STEP_ANNOTATIONS)
+                             for a in m.annotations if a.name in STEP_ANNOTATIONS and a.args]
+            basic_steps = [a.args[0] for a in symbols.annotations if a.name in STEP_ANNOTATIONS and a.args]
+            imports = symbols.imports
+            task_instances = [(i.declared_type, i.variable, i.class_name) for i in symbols.instantiations
+                              if i.declared_type and not i.has_args]
+        else:
+            # Pattern mejorado para capturar Given/When/Then/And
+            step_patterns = re.findall(
+                r'@(Given|When|Then|And)\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\n\s*public\s+void\s+(\w+)\s*\([^)]*\)', 
+                content, re.MULTILINE
+            )
+            
+            # Buscar steps básicos (solo texto)
+            basic_steps = re.findall(
+                r'@(?:Given|When|Then|And)\s*\(\s*["\']([^"\']+)["\']', 
+                content
+            )
+            
+            # Buscar imports para detectar frameworks
+            imports = re.findall(r'import\s+([\w\.]+);', content)
+            
+            # Buscar instancias de tasks/screens
+            task_instances = re.findall(r'(\w+)\s+(\w+)\s*=\s*new\s+(\w+)\s*\(\s*\)', content)
         
         for step_type, step_text, method_name in step_patterns:
             cucumber_steps.append({
@@ -162,14 +336,6 @@ class QATrainingEngine:
                 'method': method_name
             })
         
-        # Buscar steps básicos (solo texto)
-        basic_steps = re.findall(
-            r'@(?:Given|When|Then|And)\s*\(\s*["\']([^"\']+)["\']', 
-            content
-        )
-        
-        # Buscar imports para detectar frameworks
-        imports = re.findall(r'import\s+([\w\.]+);', content)
         frameworks = []
         if any('cucumber' in imp.lower() for imp in imports):
             frameworks.append('Cucumber')
@@ -178,9 +344,6 @@ class QATrainingEngine:
         if any('appium' in imp.lower() for imp in imports):
             frameworks.append('Appium')
         
-        # Buscar instancias de tasks/screens
-        task_instances = re.findall(r'(\w+)\s+(\w+)\s*=\s*new\s+(\w+)\s*\(\s*\)', content)
-        
         if cucumber_steps or basic_steps:
             pattern = {
                 'file': filename,
@@ -205,17 +368,36 @@ class QATrainingEngine:
             
             self.patterns['step_definitions'].append(pattern)
     
-    def _extract_utility_patterns(self, content, filename):
+    def _extract_utility_patterns(self, content, filename, symbols=None):
         """Extrae patrones de utilities y tasks"""
         
-        # Buscar métodos públicos
-        utility_methods = re.findall(
-            r'public\s+(?:static\s+)?(?:\w+\s+)?(\w+)\s*\([^}]*\)', 
-            content
-        )
-        
-        # Buscar imports para detectar tipo de utility
-        imports = re.findall(r'import\s+([\w\.]+);', content)
+        if symbols is not None:
+            public_methods = [m for m in symbols.methods if 'public' in m.modifiers]
+            utility_methods = [m.name for m in public_methods]
+            imports = symbols.imports
+            business_methods = [m.name for m in public_methods if m.return_type == 'void'
+                                and m.name.startswith(('with', 'execute', 'perform', 'do'))]
+            screen_usage = [(i.declared_type, i.variable) for i in symbols.instantiations
+                            if i.declared_type and i.declared_type.endswith('Screen')
+                            and i.class_name.endswith('Screen') and not i.has_args]
+        else:
+            # Buscar métodos públicos
+            utility_methods = re.findall(
+                r'public\s+(?:static\s+)?(?:\w+\s+)?(\w+)\s*\([^}]*\)', 
+                content
+            )
+            
+            # Buscar imports para detectar tipo de utility
+            imports = re.findall(r'import\s+([\w\.]+);', content)
+            
+            # Buscar patrones específicos para tasks de negocio
+            business_methods = re.findall(
+                r'public\s+void\s+(with\w*|execute\w*|perform\w*|do\w*)\s*\([^}]*\)', 
+                content
+            )
+            
+            # Buscar uso de screens/activities
+            screen_usage = re.findall(r'(\w+Screen)\s+(\w+)\s*=\s*new\s+\w+Screen\s*\(\s*\)', content)
         utility_type = 'utility'
         
         if any('appium' in imp.lower() for imp in imports):
@@ -225,15 +407,6 @@ class QATrainingEngine:
         if filename.endswith('Task.java') or filename in ['Login.java', 'AddOrder.java', 'SearchCustomer.java']:
             utility_type = 'task'
         
-        # Buscar patrones específicos para tasks de negocio
-        business_methods = re.findall(
-            r'public\s+void\s+(with\w*|execute\w*|perform\w*|do\w*)\s*\([^}]*\)', 
-            content
-        )
-        
-        # Buscar uso de screens/activities
-        screen_usage = re.findall(r'(\w+Screen)\s+(\w+)\s*=\s*new\s+\w+Screen\s*\(\s*\)', content)
-        
         if utility_methods or business_methods:
             pattern = {
                 'file': filename,
@@ -315,7 +488,7 @@ RECUERDA: Eres un especialista en ESTE proyecto específico, no un experto gené
         return training_prompt
     
     def save_training_data(self, output_file='training_data.json'):
-        """Guarda datos de entrenamiento en JSON"""
+        """Guarda el artefacto de entrenamiento (manifiesto + shards por tipo, ver artifact.py)"""
         training_data = {
             'patterns': self.patterns,
             'training_prompt': self.generate_training_prompt(),
@@ -323,8 +496,7 @@ RECUERDA: Eres un especialista en ESTE proyecto específico, no un experto gené
         }
         
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(training_data, f, indent=2, ensure_ascii=False)
+            write_artifact(output_file, training_data)
             print(f"✅ Datos de entrenamiento guardados en: {output_file}")
         except Exception as e:
             print(f"❌ Error guardando entrenamiento: {e}")
@@ -0,0 +1,258 @@
+"""
+transporte_http.py
+Transporte HTTP compartido por LLMClient, JiraExporter y TestRailExporter.
+
+- Una requests.Session por host (pool de conexiones keep-alive: sin handshake TCP+TLS por llamada).
+- Timeouts de conexión y de lectura en todas las solicitudes (un endpoint colgado no bloquea el lote).
+- Reintentos con backoff exponencial + jitter que respetan `Retry-After` en 429/5xx.
+  Los POST que crean recursos (idempotente=False) solo se reintentan cuando es seguro que el
+  servidor no los procesó: 429, 503 o conexiones que no se llegaron a abrir.
+- Métricas por endpoint: solicitudes, reintentos, errores, códigos de estado y latencias p50/p95.
+- LimitadorTasa: token bucket para no pasar el límite de solicitudes por minuto de una API.
+
+`requests` se importa al crear la primera sesión, no al importar el módulo.
+"""
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+CONNECT_TIMEOUT = float(os.getenv('AGENTESTING_HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('AGENTESTING_HTTP_READ_TIMEOUT', '60'))
+MAX_RETRIES = int(os.getenv('AGENTESTING_HTTP_RETRIES', '4'))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+MAX_RETRY_AFTER = 120.0        # un Retry-After mayor se acota (no se espera una hora en medio de un lote)
+POOL_SIZE = 10                 # conexiones por host
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Códigos con los que el servidor no procesó la solicitud: seguros de reintentar aunque no sea idempotente
+SAFE_RETRY_STATUS = {429, 503}
+LATENCY_SAMPLES = 1000
+
+
+def retry_after_seconds(value, now=None):
+    """Retry-After en segundos (acepta segundos o fecha HTTP); None si no se puede interpretar"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        fecha = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if fecha is None:
+        return None
+    return max(0.0, fecha.timestamp() - (now if now is not None else time.time()))
+
+
+def sin_conexion(error):
+    """
+    True si la solicitud nunca llegó al servidor (no se pudo abrir la conexión). Un ConnectionError
+    por 'Connection aborted' (el servidor cortó tras recibirla) no cuenta: un POST ya pudo crear algo.
+    """
+    import requests
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.ConnectionError):
+        return False
+    causa = error.args[0] if error.args else None
+    causa = getattr(causa, 'reason', causa)  # MaxRetryError envuelve la causa real
+    return isinstance(causa, (NewConnectionError, ConnectTimeoutError))
+
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+class MetricasHTTP:
+    """Contadores y latencias por endpoint (seguros entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _endpoint(self, nombre):
+        datos = self._endpoints.get(nombre)
+        if datos is None:
+            datos = {'solicitudes': 0, 'reintentos': 0, 'errores': 0, 'estados': Counter(),
+                     'latencias': deque(maxlen=LATENCY_SAMPLES)}
+            self._endpoints[nombre] = datos
+        return datos
+
+    def registrar(self, nombre, latencia, estado=None, error=False):
+        with self._lock:
+            datos = self._endpoint(nombre)
+            datos['solicitudes'] += 1
+            datos['latencias'].append(latencia)
+            if estado is not None:
+                datos['estados'][estado] += 1
+            if error:
+                datos['errores'] += 1
+
+    def reintento(self, nombre):
+        with self._lock:
+            self._endpoint(nombre)['reintentos'] += 1
+
+    def resumen(self):
+        """{endpoint: {'solicitudes', 'reintentos', 'errores', 'estados', 'p50_ms', 'p95_ms'}}"""
+        with self._lock:
+            resultado = {}
+            for nombre, datos in self._endpoints.items():
+                latencias = list(datos['latencias'])
+                p50, p95 = _percentil(latencias, 0.5), _percentil(latencias, 0.95)
+                resultado[nombre] = {
+                    'solicitudes': datos['solicitudes'],
+                    'reintentos': datos['reintentos'],
+                    'errores': datos['errores'],
+                    'estados': dict(datos['estados']),
+                    'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                    'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                }
+            return resultado
+
+
+class LimitadorTasa:
+    """
+    Token bucket compartido entre hilos: `por_minuto` solicitudes sostenidas con ráfagas de hasta
+    `rafaga`. adquirir() reserva un turno y duerme lo necesario fuera del lock, así los hilos salen
+    en orden de llegada sin sobrepasar la tasa.
+    """
+
+    def __init__(self, por_minuto, rafaga=None, reloj=time.monotonic, sleep=time.sleep):
+        self.tasa = por_minuto / 60.0
+        self.capacidad = float(rafaga if rafaga is not None else max(1, int(self.tasa)))
+        self._tokens = self.capacidad
+        self._reloj = reloj
+        self._sleep = sleep
+        self._ultimo = reloj()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Retorna los segundos que hubo que esperar"""
+        with self._lock:
+            ahora = self._reloj()
+            self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+            self._ultimo = ahora
+            self._tokens -= 1
+            espera = -self._tokens / self.tasa if self._tokens < 0 else 0.0
+        if espera:
+            self._sleep(espera)
+        return espera
+
+
+class TransporteHTTP:
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, pool_size=POOL_SIZE, sleep=time.sleep):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.metricas = MetricasHTTP()
+        self._sleep = sleep
+        self._sesiones = {}  # 'https://host:puerto' -> requests.Session
+        self._lock = threading.Lock()
+
+    def _sesion(self, url):
+        partes = urlsplit(url)
+        clave = f"{partes.scheme}://{partes.netloc}"
+        with self._lock:
+            sesion = self._sesiones.get(clave)
+            if sesion is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                sesion = requests.Session()
+                # Los reintentos los maneja este módulo (Retry-After, métricas): el adapter no reintenta
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                sesion.mount(clave + '/', adapter)
+                self._sesiones[clave] = sesion
+            return sesion
+
+    def _espera(self, intento, respuesta=None):
+        """Backoff exponencial con jitter completo; Retry-After manda si el servidor lo envía"""
+        if respuesta is not None:
+            indicado = retry_after_seconds(respuesta.headers.get('Retry-After'))
+            if indicado is not None:
+                return min(indicado, MAX_RETRY_AFTER) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** intento)))
+
+    def request(self, metodo, url, endpoint=None, idempotente=None, **kwargs):
+        """
+        Como requests.request, con timeout, pool por host y reintentos. Retorna la última respuesta
+        (el llamador revisa status_code) o relanza la última excepción de red.
+        """
+        import requests
+
+        metodo = metodo.upper()
+        if idempotente is None:
+            idempotente = metodo in ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+        if endpoint is None:
+            partes = urlsplit(url)
+            endpoint = f"{metodo} {partes.netloc}{partes.path}"
+        kwargs.setdefault('timeout', self.timeout)
+        sesion = self._sesion(url)
+
+        intento = 0
+        while True:
+            inicio = time.perf_counter()
+            try:
+                respuesta = sesion.request(metodo, url, **kwargs)
+            except requests.RequestException as e:
+                self.metricas.registrar(endpoint, time.perf_counter() - inicio, error=True)
+                seguro = sin_conexion(e)
+                if intento >= self.max_retries or not (idempotente or seguro):
+                    raise
+                self.metricas.reintento(endpoint)
+                self._sleep(self._espera(intento))
+                intento += 1
+                continue
+
+            estado = respuesta.status_code
+            self.metricas.registrar(endpoint, time.perf_counter() - inicio, estado, error=estado >= 400)
+            reintentable = estado in RETRY_STATUS and (idempotente or estado in SAFE_RETRY_STATUS)
+            if not reintentable or intento >= self.max_retries:
+                return respuesta
+            self.metricas.reintento(endpoint)
+            self._sleep(self._espera(intento, respuesta))
+            respuesta.close()  # devuelve la conexión al pool
+            intento += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def cerrar(self):
+        with self._lock:
+            for sesion in self._sesiones.values():
+                sesion.close()
+            self._sesiones.clear()
+
+
+_transporte = None
+_transporte_lock = threading.Lock()
+
+
+def get_transporte():
+    """Transporte compartido del proceso (un pool por host para todas las integraciones)"""
+    global _transporte
+    with _transporte_lock:
+        if _transporte is None:
+            _transporte = TransporteHTTP()
+        return _transporte
+
+# Uso:
+# http = get_transporte()
+# respuesta = http.post(url, json=datos, auth=auth, endpoint='jira.issue')
+# http.metricas.resumen()  -> {'jira.issue': {'solicitudes': 3, 'reintentos': 1, 'p95_ms': ...}}